@@ -0,0 +1,274 @@
+"""Process-wide cache of loaded and derived data with dependency-tracked invalidation.
+
+Every entry records the sources it was built from: a spreadsheet's worksheet
+titles, one competitor's worksheet, a published CSV, and any other cached
+entry read while building it (derived totals, projections), whose sources it
+inherits. A write publishes the sources it changed with ``invalidate`` and
+only the entries built from them are evicted, for every session in the
+process; entries also expire after a TTL, and their rebuild reads the sources
+again, to pick up changes made outside the app (a builder reading through a
+cache of its own, like ``SheetPool``'s title list, must refresh it). Cached
+values are shared between sessions and must not be mutated.
+"""
+import contextvars
+import functools
+import threading
+import time
+
+import data_sources
+
+TITLES, WORKSHEET, CSV, ENTRY = "titles", "worksheet", "csv", "entry"
+COUNTERS = ("hits", "misses", "evictions", "expirations", "discarded")
+
+# Sources collected by the entry being built in this context (None outside a build)
+_building = contextvars.ContextVar("ata_cache_building", default=None)
+
+
+# ======================
+# SOURCES
+# ======================
+def titles(spreadsheet) -> tuple:
+    return (TITLES, spreadsheet)
+
+
+def spreadsheet(spreadsheet) -> tuple:
+    """Every worksheet of ``spreadsheet`` (a prefix of each ``worksheet`` source)."""
+    return (WORKSHEET, spreadsheet)
+
+
+def worksheet(spreadsheet, title) -> tuple:
+    return (WORKSHEET, spreadsheet, title)
+
+
+def csv(url) -> tuple:
+    return (CSV, url)
+
+
+def entry(key) -> tuple:
+    return (ENTRY, key)
+
+
+class _Entry:
+    __slots__ = ("value", "sources", "stored_at", "ttl")
+
+    def __init__(self, value, sources, stored_at, ttl):
+        self.value = value
+        self.sources = sources
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+
+# ======================
+# CACHE
+# ======================
+class ArtifactCache:
+    """Entries keyed by ``(kind, *args)`` with the set of sources each was built from.
+
+    ``invalidate(*sources)`` evicts every entry built from any of them; a
+    shorter source tuple also matches every source it prefixes, so
+    ``spreadsheet(key)`` covers all of that spreadsheet's worksheets. An
+    entry whose sources are invalidated while it is being built is returned
+    to its caller but not stored.
+    """
+
+    def __init__(self, ttl=data_sources.DEFAULT_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = {}
+        self._dependents = {}   # source -> entry keys built from it
+        self._invalidated = {}  # source -> generation of its last invalidation
+        self._generation = 0
+        self._cleared_at = 0
+        self._swept_at = clock()
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    # --- public API ---
+    def get_or_compute(self, key, compute, sources=(), ttl=None):
+        """The cached value of ``key``, or ``compute()`` stored under ``sources``
+        plus the sources of every entry it read."""
+        ttl = self.ttl if ttl is None else ttl
+        with self._key_lock(key):
+            with self._lock:
+                found = self._entries.get(key)
+                if found is not None and self._clock() - found.stored_at < found.ttl:
+                    self._count(key, "hits")
+                    self._report(key, found.sources)
+                    return found.value
+                if found is not None:
+                    self._drop(key)
+                    self._count(key, "expirations")
+                self._count(key, "misses")
+                generation = self._generation
+
+            used = set(sources)
+            token = _building.set(used)
+            try:
+                value = compute()
+            finally:
+                _building.reset(token)
+
+            with self._lock:
+                now = self._clock()
+                if self._cleared_at > generation or any(
+                    self._invalidated.get(s, -1) > generation for s in self._matching(used)
+                ):
+                    self._count(key, "discarded")
+                else:
+                    self._entries[key] = _Entry(value, frozenset(used), now, ttl)
+                    for source in used:
+                        self._dependents.setdefault(source, set()).add(key)
+                if now - self._swept_at >= self.ttl:
+                    self._sweep(now)
+            self._report(key, used)
+            return value
+
+    def invalidate(self, *sources) -> int:
+        """Evict the entries built from ``sources`` (and the entries built from
+        those); returns how many were evicted."""
+        evicted = 0
+        with self._lock:
+            self._generation += 1
+            pending = list(sources)
+            while pending:
+                source = pending.pop()
+                self._invalidated[source] = self._generation
+                for matched in self._matching([source], prefixes=False):
+                    for key in list(self._dependents.get(matched, ())):
+                        if key in self._entries:
+                            self._drop(key)
+                            self._count(key, "evictions")
+                            evicted += 1
+                            pending.append(entry(key))
+        return evicted
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._cleared_at = self._generation
+            for key in list(self._entries):
+                self._drop(key)
+                self._count(key, "evictions")
+
+    def stats(self) -> dict:
+        """Counters over every kind, plus ``entries`` and ``hit_rate``."""
+        with self._lock:
+            stats = {name: sum(c[name] for c in self._stats.values()) for name in COUNTERS}
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else None
+        return stats
+
+    def breakdown(self) -> list:
+        """One row per entry kind: entries, hits, misses, hit rate, evictions and expirations."""
+        with self._lock:
+            sizes = {}
+            for key in self._entries:
+                sizes[key[0]] = sizes.get(key[0], 0) + 1
+            rows = []
+            for kind, c in sorted(self._stats.items()):
+                lookups = c["hits"] + c["misses"]
+                rows.append({
+                    "Kind": kind,
+                    "Entries": sizes.get(kind, 0),
+                    "Hits": c["hits"],
+                    "Misses": c["misses"],
+                    "Hit rate": round(c["hits"] / lookups, 3) if lookups else None,
+                    "Evictions": c["evictions"],
+                    "Expirations": c["expirations"],
+                })
+        return rows
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+    # --- bookkeeping ---
+    def _matching(self, sources, prefixes=True):
+        """``sources`` plus, with ``prefixes``, every shorter source prefixing one
+        of them; without, every known source that one of them prefixes."""
+        matched = set(sources)
+        for source in sources:
+            if prefixes:
+                matched.update(source[:n] for n in range(1, len(source)))
+            elif source[0] != ENTRY:
+                matched.update(s for s in self._dependents if len(s) > len(source) and s[:len(source)] == source)
+        return matched
+
+    def _drop(self, key):
+        found = self._entries.pop(key)
+        for source in found.sources:
+            keys = self._dependents.get(source)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._dependents[source]
+
+    def _sweep(self, now):
+        for key in [k for k, e in self._entries.items() if now - e.stored_at >= e.ttl]:
+            self._drop(key)
+            self._count(key, "expirations")
+        self._swept_at = now
+
+    def _report(self, key, sources):
+        # An entry read while building another one makes that one depend on it too
+        parent = _building.get()
+        if parent is not None:
+            parent.add(entry(key))
+            parent.update(sources)
+
+    def _count(self, key, name):
+        counts = self._stats.get(key[0])
+        if counts is None:
+            counts = self._stats[key[0]] = dict.fromkeys(COUNTERS, 0)
+        counts[name] += 1
+
+    def _key_lock(self, key):
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+
+def depends_on(*sources):
+    """Record ``sources`` as read by the entry being built in this context, if any."""
+    building = _building.get()
+    if building is not None:
+        building.update(sources)
+
+
+def cached(kind, ttl=None):
+    """Decorator caching ``fn(*args)`` in the process-wide cache under
+    ``(kind, *args)``; the sources are whatever ``fn`` reports through
+    ``depends_on`` or reads from other cached functions."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args):
+            return get_cache().get_or_compute((kind,) + args, lambda: fn(*args), ttl=ttl)
+        return wrapper
+    return decorate
+
+
+# ======================
+# PROCESS-WIDE INSTANCE
+# ======================
+_default_cache = ArtifactCache()
+
+
+def get_cache() -> ArtifactCache:
+    return _default_cache
+
+
+def set_cache(cache: ArtifactCache):
+    global _default_cache
+    _default_cache = cache
+
+
+def invalidate(*sources) -> int:
+    return _default_cache.invalidate(*sources)
+
+
+def cache_stats() -> dict:
+    return _default_cache.stats()
@@ -0,0 +1,195 @@
+"""The pre-optimization implementations, kept verbatim as benchmark references."""
+import pandas as pd
+
+from placements import EVENT_COLS, POINTS_MAP
+from scoring import norm_type
+
+
+# ======================
+# update_totals (seven sequential gspread calls)
+# ======================
+def update_totals(ws, events):
+    all_values = ws.get_all_values()
+    col_a = [row[0] for row in all_values if row]
+
+    if "Totals" in col_a:
+        idx = col_a.index("Totals") + 1
+        ws.delete_rows(idx)
+
+    df = pd.DataFrame(ws.get_all_records())
+    df = df[~df["Date"].isin(["Totals"])]
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df = df[df["Date"].notna()]
+    df = df.sort_values("Date").reset_index(drop=True)
+
+    for event in events:
+        df[event] = pd.to_numeric(df[event], errors="coerce").fillna(0)
+
+    totals_by_event = []
+    for event in events:
+        aaa_score = df[df["Type"] == "Class AAA"][event].nlargest(1).sum()
+        aa_score = df[df["Type"] == "Class AA"][event].nlargest(2).sum()
+        ab_score = df[df["Type"].isin(["Class A", "Class B"])][event].nlargest(5).sum()
+        c_score = df[df["Type"] == "Class C"][event].nlargest(3).sum()
+        total = aaa_score + aa_score + ab_score + c_score
+        totals_by_event.append(float(total))
+
+    df["Date"] = df["Date"].dt.strftime("%m/%d/%Y")
+    rows = df.fillna("").astype(str).values.tolist()
+
+    ws.clear()
+    ws.append_row(df.columns.tolist())
+    ws.append_rows(rows)
+    ws.append_row(["Totals", "", ""] + totals_by_event)
+    return totals_by_event
+
+
+def save_result(ws, new_row, events):
+    # Enter Tournament Scores: append, re-sort, rewrite, then update_totals
+    ws.append_row(new_row)
+    df = pd.DataFrame(ws.get_all_records())
+    if "Date" in df.columns:
+        df = df.sort_values("Date").reset_index(drop=True)
+        ws.clear()
+        ws.append_row(df.columns.tolist())
+        ws.append_rows(df.values.tolist())
+    return update_totals(ws, events)
+
+
+# ======================
+# View Tournament Results placement loop
+# ======================
+def placement_table(results_df, tourney_type, selected_tourney, event_cols=EVENT_COLS):
+    df = results_df[results_df["Tournament"] == selected_tourney].copy()
+    for col in event_cols:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+
+    table = pd.DataFrame(index=df["Name"].unique(), columns=event_cols)
+    for event in event_cols:
+        scores = df[["Name", event]].copy()
+        scores[event] = pd.to_numeric(scores[event], errors="coerce").fillna(0)
+
+        placed = {}
+        for _, row in scores.iterrows():
+            score = row[event]
+            name = row["Name"]
+            if score == POINTS_MAP[tourney_type]["1st"]:
+                placed[name] = "1st"
+            elif score == POINTS_MAP[tourney_type]["2nd"]:
+                placed[name] = "2nd"
+            elif score == POINTS_MAP[tourney_type]["3rd"]:
+                placed[name] = "3rd"
+            else:
+                placed[name] = "DNP"
+
+        for name in table.index:
+            table.at[name, event] = placed.get(name, "DNP")
+    return table
+
+
+# ======================
+# Maximum Points Projection (per competitor, per event)
+# ======================
+def assign_weekend_ids(dates: pd.Series) -> pd.Series:
+    s = pd.to_datetime(dates, errors="coerce").dropna().dt.normalize().sort_values().unique()
+    if len(s) == 0:
+        return pd.Series(index=dates.index, dtype="Int64")
+    cluster_id = 0
+    mapping = {}
+    prev = None
+    for d in s:
+        if prev is None or (d - prev).days > 1:
+            cluster_id += 1
+        mapping[d] = cluster_id
+        prev = d
+    normalized = pd.to_datetime(dates, errors="coerce").dt.normalize()
+    return normalized.map(mapping)
+
+
+def bestN_sum(values, N):
+    return sum(sorted(values, reverse=True)[:N])
+
+
+def weekend_values(frame: pd.DataFrame, event_col: str) -> list:
+    if frame.empty:
+        return []
+    frame = frame.copy()
+    frame["WeekendID"] = assign_weekend_ids(frame["Date"])
+    return list(frame.groupby("WeekendID")[event_col].max().values)
+
+
+def future_aa_weekend_values(fut_df: pd.DataFrame) -> list:
+    if fut_df.empty:
+        return []
+    f = fut_df.copy()
+    f["WeekendID"] = assign_weekend_ids(f["Date"])
+    return [15] * f["WeekendID"].nunique()
+
+
+def future_ab_weekend_values(fut_df: pd.DataFrame) -> list:
+    if fut_df.empty:
+        return []
+    f = fut_df.copy()
+    f["WeekendID"] = assign_weekend_ids(f["Date"])
+    vals = []
+    for _, wk_df in f.groupby("WeekendID"):
+        if (wk_df["TypeNorm"] == "A").any():
+            vals.append(8)
+        elif (wk_df["TypeNorm"] == "B").any():
+            vals.append(5)
+    return vals
+
+
+def calc_event(cdf_event, event_col, future_tournaments):
+    cdf_event[event_col] = pd.to_numeric(cdf_event[event_col], errors="coerce").fillna(0)
+
+    aaa_current = min(cdf_event.loc[cdf_event["TypeNorm"]=="AAA", event_col].sum(), 20)
+
+    aa_df = cdf_event.loc[cdf_event["TypeNorm"]=="AA", ["Date", event_col]].copy()
+    aa_current_vals = weekend_values(aa_df, event_col)
+    aa_current = min(sum(sorted(aa_current_vals, reverse=True)[:2]), 30)
+    future_aa_vals = future_aa_weekend_values(future_tournaments[future_tournaments["TypeNorm"]=="AA"])
+    aa_projected_best2 = min(sum(sorted(aa_current_vals + future_aa_vals, reverse=True)[:2]), 30)
+
+    ab_df = cdf_event.loc[cdf_event["TypeNorm"].isin(["A","B"]), ["Date", event_col]].copy()
+    ab_current_vals = weekend_values(ab_df, event_col)
+    ab_current_total = min(bestN_sum(ab_current_vals, 5), 40)
+    future_ab_vals = future_ab_weekend_values(future_tournaments[future_tournaments["TypeNorm"].isin(["A","B"])])
+    ab_projected_best5 = min(bestN_sum(ab_current_vals + future_ab_vals, 5), 40)
+
+    c_scores = cdf_event.loc[cdf_event["TypeNorm"]=="C", event_col].sort_values(ascending=False)
+    c_current = min(c_scores.head(3).sum(), 9)
+
+    current_total = aaa_current + aa_current + ab_current_total + c_current
+    projected_max = aaa_current + aa_projected_best2 + ab_projected_best5 + c_current
+    return current_total, projected_max
+
+
+def project_competitor(df, competitor, future_tournaments, event_cols=EVENT_COLS):
+    cdf = df[df["Name"].str.strip().eq(competitor)].copy()
+    rows = []
+    for event in event_cols:
+        cur, proj = calc_event(cdf.copy(), event, future_tournaments)
+        rows.append({"Event": event, "Current Points": cur, "Projected Max": proj})
+    return pd.DataFrame(rows)
+
+
+# ======================
+# projection.division_rows (object columns, row-wise norm_type)
+# ======================
+def division_rows(frames) -> pd.DataFrame:
+    parts = []
+    for frame in frames:
+        frame = frame.copy()
+        frame.columns = frame.columns.str.strip()
+        frame["Date"] = pd.to_datetime(frame["Date"], errors="coerce")
+        parts.append(frame)
+    df = pd.concat(parts, ignore_index=True)
+
+    dedupe_keys = [c for c in ["Name","Date","Type","Tournament Name"] if c in df.columns]
+    if dedupe_keys:
+        df = df.drop_duplicates(subset=dedupe_keys)
+
+    if "TypeNorm" not in df.columns and "Type" in df.columns:
+        df["TypeNorm"] = df["Type"].apply(norm_type)
+    return df
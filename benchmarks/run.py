@@ -0,0 +1,626 @@
+"""Offline benchmark harness.
+
+Each scenario runs against a synthetic league and the in-memory fake Sheets
+backend and reports wall time, peak traced memory and simulated API calls.
+Before timing, the new totals, projections and placements are checked against
+the legacy implementations on the same league.
+
+    python -m benchmarks.run                          # compare with benchmarks/baseline.json
+    python -m benchmarks.run --sizes 10,100,1000,10000 --seasons 3
+    python -m benchmarks.run --save-baseline          # record a new baseline
+
+Exits 1 when a result regresses past the baseline tolerance or a check
+fails. Wall times are medians of several runs and are compared in units of a
+fixed calibration workload timed on each machine, so a baseline recorded on
+other hardware still applies; re-record it when the code changes on purpose.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import artifact_cache
+from benchmarks import legacy
+from benchmarks.synthetic import SPREADSHEET_KEY, entry_row, make_league
+from fake_sheets import FakeWorksheet
+import history
+from identity import IdentityIndex
+import ingest
+from placements import placement_cube, tournament_placements
+from projection import project_division, season_totals, standings
+from scoring import EVENT_COLS, POINTS_MAP, norm_type
+from season_calendar import SeasonCalendar
+from seasons import SEASONS
+from simulation import simulate_division
+import sheet_writer
+from sheets_client import SheetPool
+from totals_engine import TotalsEngine
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = (10, 100, 1000)
+SAVE_SAMPLE = 25        # worksheets saved per save scenario
+LEGACY_LIMIT = 1000     # largest league the per-row legacy paths are run on
+PROJECTION_SAMPLE = 20  # competitors the legacy projection loop is timed on
+SIMULATIONS = 100_000   # seasons per simulation run
+SIMULATION_LIMIT = 100  # largest division simulated
+DIVISIONS = 4           # division sheets the league is split into for the history loads
+QUERY_SAMPLE = 20       # history queries per query scenario
+TIME_TOLERANCE = 0.75   # allowed relative slowdown, after scaling by the calibration
+MEMORY_TOLERANCE = 0.25
+MIN_WALL = 0.01         # scaled wall-time differences under this many seconds are noise
+MIN_SAMPLE = 0.25       # short scenarios are re-run until their runs add up to this many seconds
+MAX_RUNS = 25
+
+
+# ======================
+# SCENARIOS
+# ======================
+# Each scenario is ``setup(league) -> run()``; ``run`` returns the simulated
+# API-call count (0 for compute-only work).
+
+def _save(save_fn):
+    def setup(league):
+        names = league.competitors[:SAVE_SAMPLE]
+        client = league.client(names)
+        sh = client.open_by_key(SPREADSHEET_KEY)
+        rng = np.random.default_rng(1)
+        targets = [(sh.worksheet(name), entry_row(league, rng)) for name in names]
+        client.reset_calls()
+
+        def run():
+            for ws, row in targets:
+                save_fn(ws, row, sheet_writer.EVENTS)
+            return client.api_calls
+        return run
+    return setup
+
+
+def _update_totals(totals_fn):
+    def setup(league):
+        names = league.competitors[:SAVE_SAMPLE]
+        client = league.client(names)
+        sh = client.open_by_key(SPREADSHEET_KEY)
+        targets = [sh.worksheet(name) for name in names]
+        client.reset_calls()
+
+        def run():
+            for ws in targets:
+                totals_fn(ws, sheet_writer.EVENTS)
+            return client.api_calls
+        return run
+    return setup
+
+
+def _edit(save_fn):
+    """One score cell edited per worksheet; runs alternate between the edit and its undo."""
+    def setup(league):
+        names = league.competitors[:SAVE_SAMPLE]
+        client = league.client(names)
+        sh = client.open_by_key(SPREADSHEET_KEY)
+        engine = TotalsEngine()
+        targets = []
+        for name in names:
+            ws = sh.worksheet(name)
+            header, *rows = ws.get_all_values()
+            loaded = pd.DataFrame(rows[:-1], columns=header)  # without the Totals row
+            edited = loaded.copy()
+            event = header.index(sheet_writer.EVENTS[0])
+            edited.iloc[len(edited) // 2, event] = str(int(float(edited.iloc[len(edited) // 2, event])) + 1)
+            engine.load_competitor(name, loaded)
+            targets.append((ws, [(loaded, edited), (edited, loaded)]))
+        client.reset_calls()
+        turn = [0]
+
+        def run():
+            for ws, edits in targets:
+                before, after = edits[turn[0] % 2]
+                save_fn(ws, before, after, engine)
+            turn[0] += 1
+            return client.api_calls
+        return run
+    return setup
+
+
+def _edit_replace(ws, before, after, engine):
+    sheet_writer.replace_rows(ws, list(after.columns), after.values.tolist())
+
+
+def _edit_patch(ws, before, after, engine):
+    old = sheet_writer.read_values(ws)
+    values, _ = sheet_writer.apply_patch(old, sheet_writer.frame_patch(before, after))
+    sheet_writer.commit(ws, old, sheet_writer.patched_sheet(values, engine, ws.title))
+
+
+def _ingest(bulk):
+    """One new tournament for ``SAVE_SAMPLE`` competitors per run: Enter-mode saves one
+    by one (legacy) or one bulk ingest."""
+    def setup(league):
+        names = league.competitors[:SAVE_SAMPLE]
+        client = league.client(names)
+        pool = SheetPool(lambda: client)
+        rng = np.random.default_rng(2)
+        rows = [entry_row(league, rng, "Class AA")[3:] for _ in names]
+        client.reset_calls()
+        turn = [0]
+
+        def run():
+            turn[0] += 1
+            date = (pd.Timestamp("2030-01-01") + pd.Timedelta(days=turn[0])).strftime("%m/%d/%Y")
+            entries = pd.DataFrame(
+                [[name, date, "Class AA", f"Bulk Open {turn[0]}"] + row for name, row in zip(names, rows)],
+                columns=["Name"] + sheet_writer.HEADERS,
+            )
+            if bulk:
+                ingest.ingest(pool, SPREADSHEET_KEY, entries)
+            else:
+                for record in entries.itertuples(index=False):
+                    legacy.save_result(pool.worksheet(SPREADSHEET_KEY, record[0]), list(record[1:]),
+                                       sheet_writer.EVENTS)
+            return client.api_calls
+        return run
+    return setup
+
+
+def _cache_writes(evict):
+    """Sessions viewing ``SAVE_SAMPLE`` competitors' season totals while each of
+    them is written once; ``evict(cache, title)`` runs after every write."""
+    def setup(league):
+        names = league.competitors[:SAVE_SAMPLE]
+        client = league.client(names)
+        pool = SheetPool(lambda: client)
+        cache = artifact_cache.ArtifactCache()
+
+        def records(name):
+            return cache.get_or_compute(
+                ("worksheet_records", name), pool.worksheet(SPREADSHEET_KEY, name).get_all_records,
+                [artifact_cache.worksheet(SPREADSHEET_KEY, name)],
+            )
+
+        def totals(name):
+            def build():
+                engine = TotalsEngine()
+                engine.load_competitor(name, pd.DataFrame(records(name)))
+                return engine.season_totals(name)
+            return cache.get_or_compute(("season_totals", name), build)
+
+        for name in names:
+            totals(name)
+        client.reset_calls()
+
+        def run():
+            for written in names:
+                evict(cache, written)
+                for name in names:
+                    totals(name)
+            return client.api_calls
+        return run
+    return setup
+
+
+def _evict_all(cache, title):
+    cache.clear()
+
+
+def _evict_written(cache, title):
+    cache.invalidate(artifact_cache.worksheet(SPREADSHEET_KEY, title))
+
+
+def totals_engine_build(league):
+    histories = {
+        name: pd.DataFrame(values[1:], columns=values[0]) for name, values in league.worksheets.items()
+    }
+
+    def run():
+        TotalsEngine.build(histories)
+        return 0
+    return run
+
+
+def _division_frame(league):
+    df = pd.concat(league.divisions(), ignore_index=True)
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df["TypeNorm"] = df["Type"].map(norm_type)
+    return df
+
+
+def _division_csvs(league, count=DIVISIONS):
+    """Division frames as ``data_sources`` parses the published CSVs (text, not typed)."""
+    return [pd.read_csv(io.StringIO(frame.to_csv(index=False))) for frame in league.divisions(count)]
+
+
+def _history(load):
+    def setup(league):
+        frames = _division_csvs(league)
+
+        def run():
+            load(frames)
+            return 0
+        return run
+    return setup
+
+
+def identity_resolve(league):
+    """Every division row's competitor id, from an empty index."""
+    frames = _division_csvs(league)
+
+    def run():
+        identities = IdentityIndex()
+        for frame in frames:
+            identities.ids(frame["Name"])
+        return 0
+    return run
+
+
+def history_partition(league):
+    df = history.division_rows(_division_csvs(league))
+
+    def run():
+        history.SeasonHistory(df)
+        return 0
+    return run
+
+
+def _history_query(query):
+    def setup(league):
+        rows = history.SeasonHistory(history.division_rows(_division_csvs(league)))
+        calendar = SeasonCalendar(league.tournaments)
+        dates = league.tournaments["Date"].sample(QUERY_SAMPLE, replace=True, random_state=0)
+        names = league.competitors[:QUERY_SAMPLE]
+
+        def run():
+            for date, name in zip(dates, names):
+                query(rows, calendar, date, name)
+            return 0
+        return run
+    return setup
+
+
+def _standings(rows, calendar, date, name):
+    standings(rows, date, calendar)
+
+
+def _season_totals(rows, calendar, date, name):
+    season_totals(rows, name, calendar)
+
+
+def _season_window(league):
+    dates = league.tournaments["Date"]
+    return dates.quantile(0.75), dates.max()
+
+
+def projection_legacy(league):
+    df = _division_frame(league)
+    tournaments = league.tournaments.copy()
+    tournaments["TypeNorm"] = tournaments["Type"].map(norm_type)
+    today, season_end = _season_window(league)
+    future = tournaments[(tournaments["Date"] > today) & (tournaments["Date"] <= season_end)]
+    names = league.competitors[:PROJECTION_SAMPLE]
+
+    def run():
+        for name in names:
+            legacy.project_competitor(df, name, future)
+        return 0
+    return run
+
+
+def _active_rows(league):
+    return history.SeasonHistory(history.division_rows(league.divisions())).season()
+
+
+def projection_division(league):
+    df = _active_rows(league)
+    today, season_end = _season_window(league)
+
+    def run():
+        calendar = SeasonCalendar(league.tournaments)
+        project_division(df, calendar, today, season_end, EVENT_COLS)
+        return 0
+    return run
+
+
+def _placed_tournaments(league):
+    # View Tournament Results only lists classes with a points map (not Class C)
+    types = league.tournaments.set_index("Tournament Name")["Type"]
+    return types[types.isin(list(POINTS_MAP))]
+
+
+def placements_legacy(league):
+    results = league.results
+    types = _placed_tournaments(league)
+
+    def run():
+        for t, tourney_type in types.items():
+            legacy.placement_table(results, tourney_type, t)
+        return 0
+    return run
+
+
+def placements_cube(league):
+    results = league.results
+    names = _placed_tournaments(league).index
+    names = names[names.isin(results["Tournament"])]
+
+    def run():
+        cube = placement_cube(results, league.tournaments)
+        for t in names:
+            tournament_placements(cube, t)
+        return 0
+    return run
+
+
+def simulation_division(league):
+    df = _active_rows(league)
+    today, season_end = _season_window(league)
+    calendar = SeasonCalendar(league.tournaments)
+
+    def run():
+        simulate_division(df, calendar, today, season_end, n_sims=SIMULATIONS, seed=0)
+        return 0
+    return run
+
+
+def calendar_build(league):
+    def run():
+        SeasonCalendar(league.tournaments)
+        return 0
+    return run
+
+
+# name: (setup, largest size it runs on)
+SCENARIOS = {
+    "save_result.legacy": (_save(legacy.save_result), None),
+    "save_result.batched": (_save(sheet_writer.save_result), None),
+    "update_totals.legacy": (_update_totals(legacy.update_totals), None),
+    "update_totals.batched": (_update_totals(sheet_writer.update_totals), None),
+    "ingest.legacy": (_ingest(False), LEGACY_LIMIT),
+    "ingest.bulk": (_ingest(True), None),
+    "edit.replace": (_edit(_edit_replace), None),
+    "edit.patch": (_edit(_edit_patch), None),
+    "totals_engine.build": (totals_engine_build, None),
+    "cache.clear_all": (_cache_writes(_evict_all), None),
+    "cache.tracked": (_cache_writes(_evict_written), None),
+    "history.legacy": (_history(legacy.division_rows), None),
+    "history.compact": (_history(history.division_rows), None),
+    "identity.resolve": (identity_resolve, None),
+    "history.partition": (history_partition, None),
+    "history.standings": (_history_query(_standings), None),
+    "history.season_totals": (_history_query(_season_totals), None),
+    "projection.legacy": (projection_legacy, LEGACY_LIMIT),
+    "projection.division": (projection_division, None),
+    "placements.legacy": (placements_legacy, LEGACY_LIMIT),
+    "placements.cube": (placements_cube, None),
+    "simulation.division": (simulation_division, SIMULATION_LIMIT),
+    "calendar.build": (calendar_build, None),
+}
+
+
+# ======================
+# CORRECTNESS CHECKS
+# ======================
+# Each check is ``check(league) -> [mismatch, ...]`` comparing the new code with
+# ``benchmarks.legacy`` on the active season's rows.
+
+def _in_active_season(dates):
+    return (SEASONS.labels(pd.to_datetime(pd.Series(dates), errors="coerce")) == SEASONS.active().name).to_numpy()
+
+
+def check_totals(league):
+    """Batched and engine Totals against ``legacy.update_totals``."""
+    engine = TotalsEngine()
+    mismatches = []
+    for name in league.competitors[:SAVE_SAMPLE]:
+        header, *rows = league.sheet_values(name, with_totals=False)
+        active = [row for row, keep in zip(rows, _in_active_season([r[0] for r in rows])) if keep]
+        ws = FakeWorksheet(name, [header] + active, rows=len(active) + 10)
+        expected = legacy.update_totals(ws, sheet_writer.EVENTS)
+
+        built = sheet_writer.build_sheet([header] + rows)
+        batched = [float(built[-1][built[0].index(e)]) for e in sheet_writer.EVENTS]
+        engine.load_competitor(name, pd.DataFrame(rows, columns=header))
+        for label, totals in (("batched", batched), ("engine", engine.totals(name))):
+            if not np.allclose(totals, expected):
+                mismatches.append(f"totals.{label} {name}: {totals} != legacy {expected}")
+    return mismatches
+
+
+def check_projection(league):
+    """``project_division`` against ``legacy.project_competitor``."""
+    today, season_end = _season_window(league)
+    calendar = SeasonCalendar(league.tournaments)
+    projected = project_division(_active_rows(league), calendar, today, season_end, EVENT_COLS)
+    projected = projected.set_index(["Name", "Event"])[["Current Points", "Projected Max"]]
+
+    df = _division_frame(league)
+    df = df[_in_active_season(df["Date"])]
+    future = calendar.tournaments
+    future = future[(future["Date"] > today) & (future["Date"] <= season_end)].astype({"TypeNorm": object})
+    names = projected.index.get_level_values("Name")
+    mismatches = []
+    for name in [n for n in league.competitors[:PROJECTION_SAMPLE] if n in names]:
+        expected = legacy.project_competitor(df, name, future).set_index("Event")
+        got = projected.loc[name].reindex(expected.index)
+        if not np.allclose(got.to_numpy(dtype=float), expected.to_numpy(dtype=float)):
+            mismatches.append(f"projection {name}: {got.to_dict('index')} != legacy {expected.to_dict('index')}")
+    return mismatches
+
+
+def placement_mismatches(results, tournaments, types):
+    """``placement_cube`` against ``legacy.placement_table`` for ``{tournament: class}`` ``types``."""
+    cube = placement_cube(results, tournaments, identities=IdentityIndex())
+    mismatches = []
+    for tournament, tourney_type in types.items():
+        if tournament not in results["Tournament"].values:
+            continue
+        expected = legacy.placement_table(results, tourney_type, tournament)
+        got = tournament_placements(cube, tournament).reindex(index=expected.index, columns=expected.columns)
+        if not (got.to_numpy(dtype=object) == expected.to_numpy(dtype=object)).all():
+            mismatches.append(f"placements {tournament}: {got.to_dict('index')} != legacy {expected.to_dict('index')}")
+    return mismatches
+
+
+def check_placements(league):
+    """``placement_cube`` against the legacy per-tournament loop."""
+    return placement_mismatches(league.results, league.tournaments, _placed_tournaments(league))
+
+
+CHECKS = {"totals": check_totals, "projection": check_projection, "placements": check_placements}
+
+
+def run_checks(sizes, seasons=2, seed=0, log=print) -> list:
+    """Mismatches of every check on each league up to ``LEGACY_LIMIT`` competitors."""
+    mismatches = []
+    for size in sizes:
+        if size > LEGACY_LIMIT:
+            continue
+        league = make_league(size, seasons, seed=seed)
+        for name, check in CHECKS.items():
+            found = check(league)
+            log(f"check {name:<18}{size:>7}  {'ok' if not found else f'{len(found)} mismatches'}")
+            mismatches.extend(f"@{size} {line}" for line in found)
+    return mismatches
+
+
+# ======================
+# MEASUREMENT
+# ======================
+def calibrate(repeat=5) -> float:
+    """Median seconds of a fixed pandas / numpy / pure-Python workload."""
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({"key": rng.integers(0, 1000, 200_000), "value": rng.random(200_000)})
+    walls = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        frame.sort_values("value").groupby("key").tail(3).groupby("key")["value"].sum()
+        np.sort(frame["value"].to_numpy())
+        sorted(str(v) for v in range(100_000))
+        walls.append(time.perf_counter() - start)
+    return round(float(np.median(walls)), 6)
+
+
+def measure(setup, league, repeat=5) -> dict:
+    """Median wall time of at least ``repeat`` runs, then one traced run for peak memory."""
+    walls = []
+    api_calls = 0
+    while len(walls) < repeat or (sum(walls) < MIN_SAMPLE and len(walls) < MAX_RUNS):
+        run = setup(league)
+        gc.collect()
+        start = time.perf_counter()
+        api_calls = run()
+        walls.append(time.perf_counter() - start)
+
+    run = setup(league)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"wall_s": round(float(np.median(walls)), 6), "peak_kib": round(peak / 1024, 1),
+            "api_calls": int(api_calls)}
+
+
+def run_suite(sizes, seasons=2, scenarios=None, repeat=5, seed=0, log=print) -> dict:
+    results = {}
+    for size in sizes:
+        league = make_league(size, seasons, seed=seed)
+        for name in scenarios or SCENARIOS:
+            setup, limit = SCENARIOS[name]
+            if limit is not None and size > limit:
+                continue
+            result = measure(setup, league, repeat)
+            results[f"{name}@{size}"] = result
+            log(f"{name:<24}{size:>7}  {result['wall_s']:>9.4f}s  {result['peak_kib']:>10.1f} KiB"
+                f"  {result['api_calls']:>6} calls")
+    return results
+
+
+def compare(results, baseline, time_tol=TIME_TOLERANCE, memory_tol=MEMORY_TOLERANCE, scale=1.0) -> list:
+    """Human-readable regressions of ``results`` against ``baseline``; baseline wall
+    times are multiplied by ``scale`` (this machine's calibration over the baseline's)."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result["api_calls"] > base["api_calls"]:
+            regressions.append(f"{key}: api_calls {base['api_calls']} -> {result['api_calls']}")
+        expected = base["wall_s"] * scale
+        if result["wall_s"] > expected * (1 + time_tol) and result["wall_s"] - expected > MIN_WALL:
+            regressions.append(f"{key}: wall {expected:.4f}s (scaled baseline) -> {result['wall_s']:.4f}s")
+        if result["peak_kib"] > base["peak_kib"] * (1 + memory_tol) and result["peak_kib"] - base["peak_kib"] > 64:
+            regressions.append(f"{key}: peak {base['peak_kib']:.0f} KiB -> {result['peak_kib']:.0f} KiB")
+    return regressions
+
+
+def load_baseline(path) -> tuple:
+    """``(results, meta)`` of the baseline at ``path`` (empty when there is none)."""
+    if not os.path.exists(path):
+        return {}, {}
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    return baseline["results"], baseline.get("meta", {})
+
+
+def save_baseline(path, results, meta):
+    merged, _ = load_baseline(path)
+    merged.update(results)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": dict(sorted(merged.items()))}, f, indent=2)
+        f.write("\n")
+
+
+# ======================
+# CLI
+# ======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated competitor counts")
+    parser.add_argument("--seasons", type=int, default=2)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="run only these scenarios")
+    parser.add_argument("--repeat", type=int, default=5, help="minimum timed runs per scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="merge these results into the baseline")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument("--json", metavar="PATH", help="also write the results to PATH")
+    parser.add_argument("--no-check", action="store_true", help="skip the legacy correctness checks")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    mismatches = [] if args.no_check else run_checks(sizes, args.seasons, args.seed)
+    for line in mismatches:
+        print(f"MISMATCH {line}")
+    calibration = calibrate()
+    print(f"calibration {calibration:.4f}s")
+    results = run_suite(sizes, args.seasons, args.scenario, args.repeat, args.seed)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        meta = {"seasons": args.seasons, "seed": args.seed, "calibration_s": calibration,
+                "python": sys.version.split()[0], "pandas": pd.__version__, "numpy": np.__version__}
+        save_baseline(args.baseline, results, meta)
+        print(f"Baseline written to {args.baseline}")
+        return 1 if mismatches else 0
+
+    baseline, meta = load_baseline(args.baseline)
+    scale = calibration / meta["calibration_s"] if meta.get("calibration_s") else 1.0
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance, scale)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions or mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
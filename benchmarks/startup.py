@@ -0,0 +1,281 @@
+"""Cold-start benchmark for the Streamlit app.
+
+    python -m benchmarks.startup                     # every mode, eager vs lazy
+    python -m benchmarks.startup --competitors 500 --latency 0.15 --json startup.json
+
+Streamlit is not needed: each measurement starts a fresh interpreter and
+replays what the app script resolves before the menu is drawn (first paint)
+and before the selected mode can render (mode ready), against the
+file-backed fake Sheets backend and a local tournament-list CSV. ``eager`` is
+the old script order (every module imported, the tournament list, worksheet
+list and competitor worksheet loaded on every rerun); ``lazy`` is the
+current per-mode order, read from the script itself (``script_imports``) so
+it follows the app as it changes. Each mode's own division fetches are the
+same in both and are left out.
+
+Remote calls cost nothing offline; ``--latency`` adds that many seconds per
+Sheets API call or CSV fetch to give an estimated ready time. The fake client
+is created through the same imports as ``google_client_factory``, so with
+gspread installed ``gspread_at_paint`` shows whether first paint waits for it.
+"""
+import argparse
+import ast
+import importlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPREADSHEET_KEY = "bench-main"  # benchmarks.synthetic.SPREADSHEET_KEY, kept import-free here
+DEFAULT_LATENCY = 0.1           # seconds per remote call for the estimate
+HEAVY_MODULES = ("pandas", "gspread")  # reported as loaded or not at first paint
+
+SCRIPT = os.path.join(ROOT, "tournament_score_tracker.py")
+PAINT_MARKER = "app.first_paint"  # tracing.record(...) right after the menu is drawn
+
+# --- What the app resolves, in order ---
+# The old script imported everything up front; the current order comes from SCRIPT
+EAGER_IMPORTS = [
+    "pandas", "artifact_cache", "data_sources", "divisions", "mirror", "placements", "projection", "scoring",
+    "season_calendar", "simulation", "sheets_client", "tracing", "write_queue",
+]
+
+# mode -> data resolved by the mode before it can render
+MODES = {
+    "Enter Tournament Scores": ["names", "worksheet", "tournaments"],
+    "View Tournament Scores": ["names", "worksheet"],
+    "Edit Tournament Scores": ["names", "worksheet"],
+    "View Tournament Results": [],
+    "Maximum Points Projection (All Events)": [],
+    "Season Simulation": [],
+    "Bulk Tournament Ingest": [],
+}
+
+
+def _imported(nodes) -> list:
+    """Modules named by the import statements among ``nodes`` that the benchmark replays."""
+    local = {name[:-3] for name in os.listdir(ROOT) if name.endswith(".py")}
+    names = []
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names.append(node.module)
+    return [n for n in names if n.split(".")[0] in local or n in HEAVY_MODULES]
+
+
+def _is_paint(node) -> bool:
+    return (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call) and node.value.args
+            and isinstance(node.value.args[0], ast.Constant) and node.value.args[0].value == PAINT_MARKER)
+
+
+def script_imports(path=SCRIPT) -> tuple:
+    """``(before_paint, after_paint, {mode: imports})`` as the app script runs them.
+
+    Only unconditional module-level imports count before and after the paint; a
+    mode adds the imports of its ``if mode ...`` branch and of the module-level
+    functions that branch calls, directly or through one another.
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    functions = {n.name: n for n in tree.body if isinstance(n, ast.FunctionDef)}
+    constants = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            try:
+                constants[node.targets[0].id] = ast.literal_eval(node.value)
+            except ValueError:
+                pass
+
+    paint = next(i for i, node in enumerate(tree.body) if _is_paint(node))
+    before, after = _imported(tree.body[:paint]), _imported(tree.body[paint:])
+    menu = next(n.value for n in tree.body[:paint] if isinstance(n, ast.Assign)
+                and isinstance(n.targets[0], ast.Name) and n.targets[0].id == "mode")
+    modes = ast.literal_eval(menu.args[1])
+
+    def reached(nodes, seen):
+        imports = _imported(n for node in nodes for n in ast.walk(node))
+        for node in nodes:
+            for call in ast.walk(node):
+                name = getattr(getattr(call, "func", None), "id", None)
+                if isinstance(call, ast.Call) and name in functions and name not in seen:
+                    seen.add(name)
+                    imports += reached(functions[name].body, seen)
+        return imports
+
+    per_mode = {}
+    for mode in modes:
+        imports = []
+        for node in tree.body[paint:]:
+            while isinstance(node, ast.If) and "mode" in {n.id for n in ast.walk(node.test) if isinstance(n, ast.Name)}:
+                test = compile(ast.Expression(node.test), path, "eval")
+                if eval(test, {}, {**constants, "mode": mode}):
+                    imports += reached(node.body, set())
+                    break
+                node = node.orelse[0] if len(node.orelse) == 1 else None
+        per_mode[mode] = list(dict.fromkeys(i for i in imports if i not in before + after))
+    return before, after, per_mode
+
+
+LAZY_IMPORTS, AFTER_PAINT_IMPORTS, MODE_IMPORTS = script_imports()
+
+
+def plan(variant, mode) -> tuple:
+    """``(before_paint, after_paint)`` steps: module names and data keys."""
+    if variant == "eager":
+        return EAGER_IMPORTS + ["tournaments"], ["names", "worksheet"]
+    return list(LAZY_IMPORTS), AFTER_PAINT_IMPORTS + MODE_IMPORTS[mode] + MODES[mode]
+
+
+# ======================
+# CHILD (one cold start)
+# ======================
+def _client_factory(client):
+    """``client``, after the imports ``sheets_client.google_client_factory`` makes (when installed)."""
+    def factory():
+        for module in ("gspread", "google.oauth2.service_account"):
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass
+        return client
+    return factory
+
+
+def _child(variant, mode, directory, tournaments_csv, competitor):
+    from fake_sheets import FakeClient
+
+    client = FakeClient.from_directory(directory)  # loading the fake's files is not app time
+    preloaded = [m for m in HEAVY_MODULES if m in sys.modules]
+    if preloaded:
+        raise RuntimeError(f"The benchmark itself imported {', '.join(preloaded)} before the app")
+    csv_reads = 0
+    resources = {}
+
+    def step(name):
+        nonlocal csv_reads
+        if name == "tournaments":
+            import data_sources
+
+            cache = resources.setdefault("csv", data_sources.CsvSourceCache(snapshot_dir=None))
+            frame = cache.read_csv(tournaments_csv)
+            frame = frame.dropna(subset=["Tournament Name"])
+            frame["Tournament Name"].astype(str).unique().tolist()
+            csv_reads += 1
+        elif name in ("names", "worksheet"):
+            import sheets_client
+
+            pool = resources.setdefault("pool", sheets_client.SheetPool(_client_factory(client)))
+            if name == "names":
+                pool.worksheet_titles(SPREADSHEET_KEY)
+            else:
+                pool.worksheet(SPREADSHEET_KEY, competitor)
+        else:
+            __import__(name)
+
+    start = time.perf_counter()
+    before, after = plan(variant, mode)
+    for name in before:
+        step(name)
+    first_paint = time.perf_counter() - start
+    at_paint = {f"{m}_at_paint": m in sys.modules for m in HEAVY_MODULES}
+    for name in after:
+        step(name)
+    ready = time.perf_counter() - start
+    print(json.dumps({
+        "first_paint_s": first_paint,
+        "ready_s": ready,
+        "api_calls": client.api_calls,
+        "csv_reads": csv_reads,
+        **at_paint,
+        "gspread_installed": importlib.util.find_spec("gspread") is not None,
+    }))
+
+
+def cold_start(variant, mode, directory, tournaments_csv, competitor) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", variant, mode, directory, tournaments_csv, competitor],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# ======================
+# SUITE
+# ======================
+def write_fixture(root, competitors, seasons, seed) -> tuple:
+    """Competitor worksheets as ``root/<key>/<title>.csv`` plus the tournament list CSV."""
+    import csv
+
+    from benchmarks.synthetic import make_league
+
+    league = make_league(competitors, seasons, seed=seed)
+    directory = os.path.join(root, SPREADSHEET_KEY)
+    os.makedirs(directory)
+    for name in league.competitors:
+        with open(os.path.join(directory, name + ".csv"), "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(league.sheet_values(name))
+    tournaments_csv = os.path.join(root, "tournaments.csv")
+    league.tournaments.to_csv(tournaments_csv, index=False)
+    return root, tournaments_csv, league.competitors[0]
+
+
+def run_suite(competitors, seasons, repeat, latency, seed=0, modes=None) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        directory, tournaments_csv, competitor = write_fixture(tmp, competitors, seasons, seed)
+        for mode in modes or MODES:
+            for variant in ("eager", "lazy"):
+                runs = [cold_start(variant, mode, directory, tournaments_csv, competitor) for _ in range(repeat)]
+                best = min(runs, key=lambda r: r["ready_s"])
+                remote = best["api_calls"] + best["csv_reads"]
+                results[f"{mode}|{variant}"] = {
+                    "first_paint_s": round(min(r["first_paint_s"] for r in runs), 4),
+                    "ready_s": round(best["ready_s"], 4),
+                    "api_calls": best["api_calls"],
+                    "csv_reads": best["csv_reads"],
+                    "est_ready_s": round(best["ready_s"] + latency * remote, 4),
+                    "pandas_at_paint": best["pandas_at_paint"],
+                    "gspread_at_paint": best["gspread_at_paint"] if best["gspread_installed"] else None,
+                }
+                r = results[f"{mode}|{variant}"]
+                print(f"{mode:<40} {variant:<6} paint {1000 * r['first_paint_s']:8.1f} ms  "
+                      f"ready {1000 * r['ready_s']:8.1f} ms  {r['api_calls']:>2} calls  {r['csv_reads']} csv  "
+                      f"~{1000 * r['est_ready_s']:8.1f} ms at {latency:g}s/call  "
+                      f"at paint: pandas {'yes' if r['pandas_at_paint'] else 'no'}, gspread "
+                      f"{'n/a' if r['gspread_at_paint'] is None else 'yes' if r['gspread_at_paint'] else 'no'}")
+    return results
+
+
+# ======================
+# CLI
+# ======================
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--child"]:
+        _child(*argv[1:])
+        return 0
+
+    parser = argparse.ArgumentParser(description="Measure the app's cold start, eager vs lazy, per mode.")
+    parser.add_argument("--competitors", type=int, default=100)
+    parser.add_argument("--seasons", type=int, default=2)
+    parser.add_argument("--mode", action="append", choices=sorted(MODES), help="run only these modes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="seconds per remote call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="also write the results to PATH")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.competitors, args.seasons, args.repeat, args.latency, args.seed, args.mode)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,128 @@
+"""Seeded synthetic leagues: tournament lists, competitor worksheets and division CSVs."""
+import numpy as np
+import pandas as pd
+
+from fake_sheets import FakeClient, FakeWorksheet
+from scoring import EVENT_COLS, EVENTS, HEADERS, POINTS_MAP
+from seasons import SEASONS
+from sheet_writer import build_sheet
+
+SPREADSHEET_KEY = "bench-main"
+CLASSES = ["Class AAA", "Class AA", "Class A", "Class B", "Class C"]
+CLASS_WEIGHTS = [0.05, 0.15, 0.35, 0.30, 0.15]
+TOURNAMENTS_PER_SEASON = 40
+SEASON_START = "06/01"
+
+
+class League:
+    """One synthetic league: ``tournaments`` (Tournament Name, Date, Type),
+    ``results`` (one division row per competitor per tournament attended) and
+    ``worksheets`` (per-competitor sheet values, header first)."""
+
+    def __init__(self, tournaments, results, worksheets):
+        self.tournaments = tournaments
+        self.results = results
+        self.worksheets = worksheets
+        self._with_totals = {}
+
+    @property
+    def competitors(self):
+        return list(self.worksheets)
+
+    def divisions(self, count=2) -> list:
+        """Split ``results`` into ``count`` division frames, as published."""
+        names = self.results["Name"].unique()
+        return [
+            self.results[self.results["Name"].isin(names[i::count])].reset_index(drop=True)
+            for i in range(count)
+        ]
+
+    def sheet_values(self, name, with_totals=True) -> list:
+        if not with_totals:
+            return self.worksheets[name]
+        values = self._with_totals.get(name)
+        if values is None:
+            values = self._with_totals[name] = build_sheet(self.worksheets[name])
+        return values
+
+    def client(self, names=None, with_totals=True, key=SPREADSHEET_KEY) -> FakeClient:
+        """A fresh fake gspread client holding ``names`` (default: every competitor worksheet)."""
+        sheets = []
+        for name in self.worksheets if names is None else names:
+            values = self.sheet_values(name, with_totals)
+            sheets.append(FakeWorksheet(name, values, rows=len(values) + 10))
+        client = FakeClient()
+        client.add_spreadsheet(key, sheets)
+        return client
+
+
+def tournament_list(seasons=1, first_year=None, per_season=TOURNAMENTS_PER_SEASON, seed=0) -> pd.DataFrame:
+    """Weekend tournaments from June through May; some weekends run back-to-back days.
+    The last season is the active one unless ``first_year`` is given."""
+    rng = np.random.default_rng(seed)
+    if first_year is None:
+        first_year = SEASONS.active().start.year - seasons + 1
+    rows = []
+    for season in range(seasons):
+        start = pd.Timestamp(f"{SEASON_START}/{first_year + season}")
+        saturdays = pd.date_range(start, periods=52, freq="W-SAT")
+        picked = np.sort(rng.choice(len(saturdays), size=min(per_season, 52), replace=False))
+        for i, week in enumerate(picked):
+            date = saturdays[week] + pd.Timedelta(days=int(rng.integers(0, 2)))
+            rows.append({
+                "Tournament Name": f"S{season + 1} Open {i + 1:02d}",
+                "Date": date,
+                "Type": CLASSES[rng.choice(len(CLASSES), p=CLASS_WEIGHTS)],
+            })
+    return pd.DataFrame(rows)
+
+
+def _scores(rng, tourney_type, size):
+    if tourney_type == "Class C":
+        return rng.integers(0, 4, size=size)
+    points = POINTS_MAP[tourney_type]
+    choices = np.array([points["1st"], points["2nd"], points["3rd"], 0, 0])
+    return choices[rng.integers(0, len(choices), size=size)]
+
+
+def make_league(competitors=100, seasons=1, attendance=0.2, seed=0) -> League:
+    """``competitors`` each attend roughly ``attendance`` of every season's tournaments."""
+    rng = np.random.default_rng(seed)
+    tournaments = tournament_list(seasons, seed=seed)
+    names = [f"Competitor {i:05d}" for i in range(competitors)]
+
+    attended = rng.random((competitors, len(tournaments))) < attendance
+    comp_idx, t_idx = np.nonzero(attended)
+    t_rows = tournaments.iloc[t_idx].reset_index(drop=True)
+
+    scores = np.zeros((len(t_idx), len(EVENT_COLS)), dtype=int)
+    for tourney_type in CLASSES:
+        mask = (t_rows["Type"] == tourney_type).to_numpy()
+        scores[mask] = _scores(rng, tourney_type, (int(mask.sum()), len(EVENT_COLS)))
+
+    dates = t_rows["Date"].dt.strftime("%m/%d/%Y")
+    results = pd.DataFrame({
+        "Name": np.asarray(names, dtype=object)[comp_idx],
+        "Date": dates,
+        "Type": t_rows["Type"],
+        "Tournament": t_rows["Tournament Name"],
+    })
+    for j, event in enumerate(EVENT_COLS):
+        results[event] = scores[:, j]
+
+    worksheets = {name: [list(HEADERS)] for name in names}
+    body = np.column_stack([dates, t_rows["Type"], t_rows["Tournament Name"], scores]).tolist()
+    for c, row in zip(comp_idx, body):
+        worksheets[names[c]].append(row[:3] + [int(v) for v in row[3:3 + len(EVENTS)]])
+
+    return League(tournaments, results, worksheets)
+
+
+def entry_row(league, rng=None, tourney_type="Class A") -> list:
+    """A new Enter-mode row for one of the league's tournaments."""
+    rng = rng or np.random.default_rng(0)
+    pool = league.tournaments[league.tournaments["Type"] == tourney_type]
+    t = pool.iloc[int(rng.integers(0, len(pool)))]
+    return [t["Date"].strftime("%m/%d/%Y"), t["Type"], t["Tournament Name"]] + [
+        int(v) for v in _scores(rng, tourney_type, len(EVENTS))
+    ]
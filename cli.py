@@ -0,0 +1,309 @@
+"""Batch recompute of totals, placements and projections, and bulk result ingest, without Streamlit.
+
+    python cli.py totals --spreadsheet KEY --offline DIR [--write] [--out totals.csv]
+    python cli.py totals --spreadsheet KEY --credentials service_account.json
+    python cli.py placements [--division NAME=URL_OR_PATH ...] [--tournaments URL_OR_PATH] [--today YYYY-MM-DD]
+    python cli.py projection [--division NAME=URL_OR_PATH ...] [--tournaments URL_OR_PATH] [--leaderboard]
+    python cli.py simulate [--division NAME=URL_OR_PATH ...] [--sims 10000] [--seed 0]
+    python cli.py history [--division NAME=URL_OR_PATH ...] [--today YYYY-MM-DD | --competitor NAME]
+    python cli.py ingest --spreadsheet KEY --tournament NAME [--source URL_OR_PATH ...] [--write]
+    python cli.py merge --alias "J. Doe" --competitor "Jane Doe" --identities identities.json
+    python cli.py all --spreadsheet KEY --offline DIR --out-dir results/
+
+Division and tournament sources default to the registry in ``divisions``.
+Projections count the active season (``seasons``) unless ``--season`` names
+another; ``history`` prints division standings as of ``--today`` or one
+competitor's points per season.
+Competitors are matched across division sheets and worksheets by their id
+in the identity index (``identity``); ``--identities`` (default:
+ATA_IDENTITY_FILE) keeps the ids and the aliases ``merge`` adds in a file.
+Competitor sheets are rebuilt in worker processes once there are more than
+``--parallel-min`` of them.
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import data_sources
+import divisions
+import history
+import identity
+import ingest
+import placements
+import projection
+import scoring
+import seasons
+import sheet_writer
+import sheets_client
+import simulation
+from season_calendar import SeasonCalendar
+
+PARALLEL_MIN = 200
+
+
+# ======================
+# TOTALS
+# ======================
+def _rebuild(item):
+    name, values = item
+    return name, sheet_writer.build_sheet(values)
+
+
+def rebuild_sheets(sheets: dict, workers=None, parallel_min=PARALLEL_MIN) -> dict:
+    """``{title: values}`` -> ``{title: rebuilt values}`` (sorted rows plus Totals row)."""
+    items = list(sheets.items())
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or len(items) <= parallel_min:
+        return dict(map(_rebuild, items))
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(_rebuild, items, chunksize=chunksize))
+
+
+def totals_frame(rebuilt: dict, events=scoring.EVENTS) -> pd.DataFrame:
+    rows = []
+    for name, values in rebuilt.items():
+        header, totals = values[0], values[-1]
+        rows.append([name] + [totals[header.index(e)] for e in events])
+    return pd.DataFrame(rows, columns=["Name"] + list(events))
+
+
+def read_worksheets(pool, key) -> dict:
+    return {title: sheet_writer.read_values(pool.worksheet(key, title)) for title in pool.worksheet_titles(key)}
+
+
+def write_worksheets(pool, key, old: dict, new: dict) -> int:
+    """Commit every rebuilt sheet that differs; returns the number of sheets written."""
+    written = 0
+    for title, values in new.items():
+        if sheet_writer.commit(pool.worksheet(key, title), old[title], values):
+            written += 1
+    return written
+
+
+# ======================
+# DIVISION SOURCES
+# ======================
+def _read_all(urls) -> dict:
+    frames, errors = data_sources.read_many(urls)
+    if errors:
+        url, exc = next(iter(errors.items()))
+        raise RuntimeError(f"Failed to read {url}: {exc}")
+    return frames
+
+
+def placements_frame(division_urls: dict, tournaments_url, today) -> pd.DataFrame:
+    """Every placement of every completed tournament, one row per (division, tournament, name)."""
+    frames = _read_all(list(division_urls.values()) + [tournaments_url])
+    parts = []
+    for division, url in division_urls.items():
+        _, cube = placements.completed_placements(frames[url], frames[tournaments_url], today)
+        part = cube.reset_index()
+        part.insert(0, "Division", division)
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+
+def _season_history(frames) -> history.SeasonHistory:
+    return history.SeasonHistory(history.division_rows(frames))
+
+
+def projection_frame(division_urls: dict, tournaments_url, today, season) -> pd.DataFrame:
+    """Current and projected-max points for ``season`` (a ``seasons.Season``) up to its end."""
+    frames = _read_all(list(division_urls.values()) + [tournaments_url])
+    rows = _season_history([frames[url] for url in division_urls.values()]).season(season.name)
+    calendar = SeasonCalendar(frames[tournaments_url])
+    return projection.project_division(rows, calendar, today, season.end, scoring.EVENT_COLS)
+
+
+def simulation_frame(division_urls: dict, tournaments_url, today, season, n_sims, seed) -> pd.DataFrame:
+    """Monte Carlo summary per division (ranks are within each division)."""
+    frames = _read_all(list(division_urls.values()) + [tournaments_url])
+    calendar = SeasonCalendar(frames[tournaments_url])
+    parts = []
+    for division, url in division_urls.items():
+        rows = _season_history([frames[url]]).season(season.name)
+        summary = simulation.simulate_division(rows, calendar, today, season.end, n_sims=n_sims, seed=seed)["summary"]
+        summary.insert(0, "Division", division)
+        parts.append(summary)
+    return pd.concat(parts, ignore_index=True)
+
+
+def history_frame(division_urls: dict, tournaments_url, today, competitor=None) -> pd.DataFrame:
+    """Division standings as of ``today`` or, for ``competitor``, their points per season."""
+    frames = _read_all(list(division_urls.values()) + [tournaments_url])
+    rows = _season_history([frames[url] for url in division_urls.values()])
+    calendar = SeasonCalendar(frames[tournaments_url])
+    if competitor:
+        return projection.season_totals(rows, competitor, calendar, scoring.EVENT_COLS).reset_index()
+    return projection.standings(rows, today, calendar, scoring.EVENT_COLS)
+
+
+# ======================
+# CLI
+# ======================
+def _pool(args):
+    if args.offline:
+        from fake_sheets import FakeClient
+        return sheets_client.SheetPool(lambda: FakeClient.from_directory(args.offline))
+    if args.credentials:
+        with open(args.credentials) as f:
+            return sheets_client.SheetPool(sheets_client.google_client_factory(json.load(f)))
+    raise SystemExit(f"{args.command} needs --offline DIR or --credentials FILE")
+
+
+def _divisions(args) -> dict:
+    if not args.division:
+        return dict(divisions.DIVISIONS)
+    parsed = {}
+    for spec in args.division:
+        name, sep, source = spec.partition("=")
+        if not sep:
+            raise SystemExit(f"--division expects NAME=URL_OR_PATH, got {spec!r}")
+        parsed[name] = source
+    return parsed
+
+
+def _emit(frame, path, out_dir=None, default_name=None):
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, default_name)
+    if path:
+        frame.to_csv(path, index=False)
+        print(f"Wrote {len(frame)} rows to {path}", file=sys.stderr)
+    else:
+        frame.to_csv(sys.stdout, index=False)
+
+
+def run_totals(args):
+    if not args.spreadsheet:
+        raise SystemExit("totals needs --spreadsheet KEY")
+    pool = _pool(args)
+    sheets = read_worksheets(pool, args.spreadsheet)
+    rebuilt = rebuild_sheets(sheets, args.workers, args.parallel_min)
+    if args.write:
+        written = write_worksheets(pool, args.spreadsheet, sheets, rebuilt)
+        print(f"Updated {written} of {len(rebuilt)} worksheet(s)", file=sys.stderr)
+    _emit(totals_frame(rebuilt), args.out, args.out_dir, "totals.csv")
+
+
+def run_placements(args):
+    tournaments = args.tournaments or divisions.TOURNAMENT_METADATA_URL
+    frame = placements_frame(_divisions(args), tournaments, pd.to_datetime(args.today))
+    _emit(frame, args.out, args.out_dir, "placements.csv")
+
+
+def _season(args) -> seasons.Season:
+    season = seasons.SEASONS.get(args.season) if args.season else seasons.SEASONS.active(args.today)
+    if args.season_end:
+        season = season._replace(end=pd.to_datetime(args.season_end))
+    return season
+
+
+def run_projection(args):
+    tournaments = args.tournaments or divisions.TOURNAMENT_LIST_URL
+    frame = projection_frame(_divisions(args), tournaments, pd.to_datetime(args.today), _season(args))
+    if args.leaderboard:
+        frame = projection.leaderboard(frame)
+    _emit(frame, args.out, args.out_dir, "leaderboard.csv" if args.leaderboard else "projection.csv")
+
+
+def run_simulation(args):
+    tournaments = args.tournaments or divisions.TOURNAMENT_LIST_URL
+    frame = simulation_frame(
+        _divisions(args), tournaments, pd.to_datetime(args.today), _season(args), args.sims, args.seed,
+    )
+    _emit(frame, args.out, args.out_dir, "simulation.csv")
+
+
+def run_history(args):
+    tournaments = args.tournaments or divisions.TOURNAMENT_LIST_URL
+    frame = history_frame(_divisions(args), tournaments, pd.to_datetime(args.today), args.competitor)
+    _emit(frame, args.out, args.out_dir, "season_totals.csv" if args.competitor else "standings.csv")
+
+
+def run_ingest(args):
+    if not args.spreadsheet:
+        raise SystemExit("ingest needs --spreadsheet KEY")
+    if not args.tournament:
+        raise SystemExit("ingest needs --tournament NAME")
+    sources = args.source or list(_divisions(args).values())
+    tournaments_url = args.tournaments or divisions.TOURNAMENT_LIST_URL
+    frames = _read_all(sources + [tournaments_url])
+    entries = pd.concat(
+        [ingest.tournament_entries(frames[url], args.tournament, frames[tournaments_url]) for url in sources],
+        ignore_index=True,
+    ).drop_duplicates(subset=["Name", "Tournament Name"], keep="last")
+    report = ingest.ingest(_pool(args), args.spreadsheet, entries, write=args.write,
+                           workers=args.workers or ingest.DEFAULT_WORKERS)
+    counts = report["Status"].value_counts().to_dict()
+    print(f"{len(entries)} result(s) for {len(report)} competitor(s): {counts}", file=sys.stderr)
+    _emit(report, args.out, args.out_dir, "ingest.csv")
+
+
+def run_merge(args):
+    if not args.alias or not args.competitor:
+        raise SystemExit("merge needs --alias NAME and --competitor NAME")
+    index = identity.default_index()
+    if not index.path:
+        raise SystemExit("merge needs --identities PATH (or ATA_IDENTITY_FILE) to keep the alias")
+    competitor_id = index.merge(args.alias, args.competitor)
+    print(f"{args.alias!r} is now {index.names([competitor_id])[0]!r} (id {competitor_id})", file=sys.stderr)
+    _emit(pd.DataFrame(list(index.aliases().items()), columns=["Alias", "Name"]), args.out, args.out_dir, "aliases.csv")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute ATA totals, placements and projections in batch.")
+    parser.add_argument("command", choices=["totals", "placements", "projection", "simulate", "history", "ingest", "merge", "all"])
+    parser.add_argument("--spreadsheet", default=os.environ.get("ATA_SPREADSHEET_ID"),
+                        help="competitor spreadsheet key (totals)")
+    parser.add_argument("--offline", metavar="DIR", help="use the file-backed fake sheets in DIR")
+    parser.add_argument("--credentials", help="service-account JSON file for the live backend")
+    parser.add_argument("--write", action="store_true",
+                        help="write rebuilt sheets and Totals rows back (ingest: add the new rows)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--parallel-min", type=int, default=PARALLEL_MIN,
+                        help="use worker processes above this many competitors")
+    parser.add_argument("--division", action="append", metavar="NAME=URL_OR_PATH",
+                        help="division result source (repeatable; default: registry)")
+    parser.add_argument("--tournaments", metavar="URL_OR_PATH", help="tournament list source")
+    parser.add_argument("--tournament", action="append", metavar="NAME", help="ingest: tournament to add (repeatable)")
+    parser.add_argument("--source", action="append", metavar="URL_OR_PATH",
+                        help="ingest: results CSV (repeatable; default: every division)")
+    parser.add_argument("--today", default=pd.Timestamp.today().strftime("%Y-%m-%d"))
+    parser.add_argument("--season", help="projection/simulate: season name (default: the active season)")
+    parser.add_argument("--season-end", help="projection/simulate: last day counted (default: the season's end)")
+    parser.add_argument("--competitor", metavar="NAME",
+                        help="history: points per season for this competitor; merge: the name to merge into")
+    parser.add_argument("--alias", metavar="NAME", help="merge: another spelling of --competitor")
+    parser.add_argument("--identities", metavar="PATH", help="competitor identity file (default: ATA_IDENTITY_FILE)")
+    parser.add_argument("--leaderboard", action="store_true", help="projection: one ranked row per competitor")
+    parser.add_argument("--sims", type=int, default=simulation.DEFAULT_SIMS, help="simulate: seasons per division")
+    parser.add_argument("--seed", type=int, help="simulate: random seed for reproducible runs")
+    parser.add_argument("--out", help="CSV output path (default: stdout)")
+    parser.add_argument("--out-dir", help="write each result as a CSV in this directory")
+    args = parser.parse_args(argv)
+    if args.identities:
+        identity.set_index(identity.IdentityIndex(args.identities))
+
+    if args.command == "all":
+        if not args.out_dir:
+            raise SystemExit("all needs --out-dir")
+        if args.spreadsheet:
+            run_totals(args)
+        run_placements(args)
+        run_projection(args)
+    else:
+        commands = {"totals": run_totals, "placements": run_placements, "projection": run_projection,
+                    "simulate": run_simulation, "history": run_history, "ingest": run_ingest,
+                    "merge": run_merge}
+        commands[args.command](args)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
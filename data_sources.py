@@ -0,0 +1,279 @@
+"""Shared, cached loader for the published-CSV Google Sheets sources.
+
+pandas and requests are imported on first parse / first HTTP fetch, so
+importing this module (e.g. for ``DEFAULT_TTL``) costs nothing at app start.
+"""
+import contextvars
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+import tracing
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# ======================
+# SETTINGS
+# ======================
+DEFAULT_TTL = int(os.environ.get("ATA_CSV_TTL", "300"))
+DEFAULT_TIMEOUT = 20
+DEFAULT_WORKERS = 8
+SNAPSHOT_DIR = os.environ.get(
+    "ATA_SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".snapshots"),
+)
+
+
+class _Entry:
+    __slots__ = ("frame", "digest", "etag", "last_modified", "mtime", "fetched_at")
+
+    def __init__(self):
+        self.frame = None
+        self.digest = None
+        self.etag = None
+        self.last_modified = None
+        self.mtime = None
+        self.fetched_at = 0.0
+
+
+def _is_local(url):
+    return urlparse(url).scheme in ("", "file")
+
+
+def _local_path(url):
+    parsed = urlparse(url)
+    return parsed.path if parsed.scheme == "file" else url
+
+
+# ======================
+# CACHE
+# ======================
+class CsvSourceCache:
+    """Process-wide TTL cache of parsed CSV sources keyed by URL.
+
+    Expired entries are re-validated (ETag / Last-Modified for HTTP, mtime for
+    local files) and only re-parsed when the body actually changed. Every good
+    download is written to a disk snapshot that is served when the source is
+    unreachable.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, snapshot_dir=SNAPSHOT_DIR, session=None, timeout=DEFAULT_TIMEOUT):
+        self.ttl = ttl
+        self.snapshot_dir = snapshot_dir
+        self.timeout = timeout
+        self._session = session
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "parses": 0,
+            "stale_served": 0,
+            "snapshot_fallbacks": 0,
+        }
+
+    # --- public API ---
+    def read_csv(self, url, ttl=None, timeout=None) -> "pd.DataFrame":
+        ttl = self.ttl if ttl is None else ttl
+        with self._url_lock(url):
+            entry = self._entries.get(url)
+            if entry is not None and entry.frame is not None and time.time() - entry.fetched_at < ttl:
+                self._count("hits")
+                return entry.frame.copy()
+
+            self._count("misses")
+            if entry is None:
+                entry = _Entry()
+            try:
+                self._refresh(url, entry, timeout)
+            except Exception:
+                if entry.frame is not None:
+                    self._count("stale_served")
+                    return entry.frame.copy()
+                body = self._read_snapshot(url)
+                if body is None:
+                    raise
+                self._count("snapshot_fallbacks")
+                entry.frame = self._parse(body)
+                entry.digest = hashlib.sha1(body).hexdigest()
+                entry.fetched_at = time.time()
+            self._entries[url] = entry
+            return entry.frame.copy()
+
+    @tracing.traced("csv.read_many")
+    def read_many(self, urls, max_workers=DEFAULT_WORKERS, timeout=None, ttl=None) -> tuple:
+        """Fetch and parse ``urls`` concurrently.
+
+        Returns ``(frames, errors)`` keyed by url; a source that fails or
+        exceeds ``timeout`` seconds lands in ``errors`` without affecting the rest.
+        """
+        urls = list(dict.fromkeys(urls))
+        frames, errors = {}, {}
+        if not urls:
+            return frames, errors
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(urls)), thread_name_prefix="csv-fetch")
+        try:
+            # Each worker runs in a copy of this context so its spans reach the caller's session
+            futures = {
+                executor.submit(contextvars.copy_context().run, self.read_csv, url, ttl, timeout): url
+                for url in urls
+            }
+            done, not_done = wait(futures, timeout=(timeout or self.timeout) + 5)
+            for future in done:
+                url = futures[future]
+                try:
+                    frames[url] = future.result()
+                except Exception as e:
+                    errors[url] = e
+            for future in not_done:
+                errors[futures[future]] = TimeoutError(f"Timed out fetching {futures[future]}")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return frames, errors
+
+    def invalidate(self, url=None):
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(url, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0
+
+    # --- fetching ---
+    def _refresh(self, url, entry, timeout=None):
+        if _is_local(url):
+            path = _local_path(url)
+            mtime = os.path.getmtime(path)
+            if entry.frame is not None and entry.mtime == mtime:
+                self._count("revalidated")
+                entry.fetched_at = time.time()
+                return
+            with tracing.span("csv.fetch"), open(path, "rb") as f:
+                body = f.read()
+            entry.mtime = mtime
+            self._store(url, entry, body)
+            return
+
+        headers = {}
+        if entry.frame is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        with tracing.span("csv.fetch"):
+            resp = self._get_session().get(url, headers=headers, timeout=timeout or self.timeout)
+        if resp.status_code == 304 and entry.frame is not None:
+            self._count("revalidated")
+            entry.fetched_at = time.time()
+            return
+        resp.raise_for_status()
+        entry.etag = resp.headers.get("ETag")
+        entry.last_modified = resp.headers.get("Last-Modified")
+        self._store(url, entry, resp.content)
+
+    def _store(self, url, entry, body):
+        digest = hashlib.sha1(body).hexdigest()
+        if entry.frame is None or digest != entry.digest:
+            entry.frame = self._parse(body)
+            entry.digest = digest
+            self._write_snapshot(url, body)
+        else:
+            self._count("revalidated")
+        entry.fetched_at = time.time()
+
+    def _parse(self, body):
+        self._count("parses")
+        import pandas as pd
+
+        with tracing.span("csv.parse"):
+            return pd.read_csv(io.BytesIO(body))
+
+    def _get_session(self):
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+        return self._session
+
+    # --- disk snapshots ---
+    def _snapshot_path(self, url):
+        return os.path.join(self.snapshot_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".csv")
+
+    def _write_snapshot(self, url, body):
+        if not self.snapshot_dir:
+            return
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            path = self._snapshot_path(url)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def _read_snapshot(self, url):
+        if not self.snapshot_dir:
+            return None
+        try:
+            with open(self._snapshot_path(url), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    # --- bookkeeping ---
+    def _url_lock(self, url):
+        with self._lock:
+            lock = self._locks.get(url)
+            if lock is None:
+                lock = self._locks[url] = threading.Lock()
+            return lock
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+
+# ======================
+# PROCESS-WIDE INSTANCE
+# ======================
+_default_cache = CsvSourceCache()
+
+
+def get_cache() -> CsvSourceCache:
+    return _default_cache
+
+
+def set_cache(cache: CsvSourceCache):
+    global _default_cache
+    _default_cache = cache
+
+
+def read_csv(url, ttl=None, timeout=None) -> "pd.DataFrame":
+    return _default_cache.read_csv(url, ttl=ttl, timeout=timeout)
+
+
+def read_many(urls, max_workers=DEFAULT_WORKERS, timeout=None, ttl=None) -> tuple:
+    return _default_cache.read_many(urls, max_workers=max_workers, timeout=timeout, ttl=ttl)
+
+
+def cache_stats() -> dict:
+    return _default_cache.stats()
@@ -0,0 +1,42 @@
+"""Division registry: the one place published division sheets are configured.
+
+Set ATA_DIVISIONS_FILE to a JSON file of ``{"Division name": {"sheet_id": ..., "gid": 0}}``
+(or ``{"Division name": "sheet_id"}``) to override the built-in list.
+"""
+import json
+import os
+
+TOURNAMENT_LIST_ID = "16ORyU9066rDdQCeUTjWYlIVtEYLdncs5EG89IoANOeE"
+TOURNAMENT_METADATA_GID = 327661053
+
+DEFAULT_DIVISIONS = {
+    "50–59 1st Degree Black Belt": {"sheet_id": "1tCWIc-Zeog8GFH6fZJJR-85GHbC1Kjhx50UvGluZqdg", "gid": 0},
+    "40–49 2nd/3rd Degree Black Belt": {"sheet_id": "1W7q6YjLYMqY9bdv5G77KdK2zxUKET3NZMQb9Inu2F8w", "gid": 0},
+}
+
+
+def csv_url(sheet_id, gid=None):
+    url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
+    return url if gid is None else f"{url}&gid={gid}"
+
+
+TOURNAMENT_LIST_URL = csv_url(TOURNAMENT_LIST_ID)
+TOURNAMENT_METADATA_URL = csv_url(TOURNAMENT_LIST_ID, TOURNAMENT_METADATA_GID)
+
+
+def load_divisions(path=None) -> dict:
+    """``{division name: result CSV url}`` in display order."""
+    path = path or os.environ.get("ATA_DIVISIONS_FILE")
+    config = DEFAULT_DIVISIONS
+    if path:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    divisions = {}
+    for name, entry in config.items():
+        if isinstance(entry, str):
+            entry = {"sheet_id": entry, "gid": 0}
+        divisions[name] = entry.get("url") or csv_url(entry["sheet_id"], entry.get("gid", 0))
+    return divisions
+
+
+DIVISIONS = load_divisions()
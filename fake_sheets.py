@@ -0,0 +1,288 @@
+"""In-memory stand-ins for gspread clients, spreadsheets and worksheets that count API calls."""
+import csv
+import os
+import re
+from collections import Counter
+
+# Named like gspread's exceptions, which callers match by name (see SheetPool.worksheet);
+# gspread itself is not imported so the startup benchmark sees when the app loads it
+class WorksheetNotFound(Exception):
+    pass
+
+
+class SpreadsheetNotFound(Exception):
+    pass
+
+
+_A1_RANGE = re.compile(r"^(?:'?[^!]*'?!)?([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?$")
+
+
+class _FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeAPIError(Exception):
+    """Shaped like ``gspread.exceptions.APIError``: carries ``response.status_code``."""
+
+    def __init__(self, status_code, message="injected failure"):
+        super().__init__(f"{status_code}: {message}")
+        self.response = _FakeResponse(status_code)
+        self.code = status_code
+
+
+def _col_index(letters):
+    n = 0
+    for ch in letters:
+        n = n * 26 + (ord(ch) - 64)
+    return n
+
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class FakeWorksheet:
+    """Mimics the subset of ``gspread.Worksheet`` the tracker uses.
+
+    Every method that would be a network round-trip increments ``calls``.
+    """
+
+    def __init__(self, title="Sheet1", values=None, rows=200, cols=20):
+        self.title = title
+        self._values = [list(map(_cell_text, r)) for r in (values or [])]
+        self.row_count = max(rows, len(self._values))
+        self.col_count = cols
+        self.calls = Counter()
+        self.version = 0
+        self._failures = []
+
+    # --- bookkeeping ---
+    @property
+    def api_calls(self):
+        return sum(self.calls.values())
+
+    def reset_calls(self):
+        self.calls.clear()
+
+    def fail_next(self, status_code=429, times=1):
+        """Make the next ``times`` API calls raise ``FakeAPIError(status_code)``."""
+        self._failures.extend([status_code] * times)
+
+    def _call(self, name):
+        self.calls[name] += 1
+        if self._failures:
+            raise FakeAPIError(self._failures.pop(0))
+
+    def _trim(self):
+        while self._values and not any(self._values[-1]):
+            self._values.pop()
+        for row in self._values:
+            while row and row[-1] == "":
+                row.pop()
+
+    def _written(self):
+        self.version += 1
+
+    def _set_row(self, idx, row):
+        while len(self._values) <= idx:
+            self._values.append([])
+        self._values[idx] = [_cell_text(v) for v in row]
+
+    # --- reads ---
+    def get_all_values(self):
+        self._call("get_all_values")
+        width = max((len(r) for r in self._values), default=0)
+        return [r + [""] * (width - len(r)) for r in self._values]
+
+    def get_all_records(self):
+        # Imported on first use: the fakes stay free of pandas, which the startup benchmark relies on
+        from sheet_writer import numericise
+
+        self._call("get_all_records")
+        if not self._values:
+            return []
+        header = self._values[0]
+        records = []
+        for row in self._values[1:]:
+            row = row + [""] * (len(header) - len(row))
+            records.append({h: numericise(v) for h, v in zip(header, row)})
+        return records
+
+    # --- writes ---
+    def append_row(self, values, **kwargs):
+        self._call("append_row")
+        self._trim()
+        self._values.append([_cell_text(v) for v in values])
+        self.row_count = max(self.row_count, len(self._values))
+        self._written()
+
+    def append_rows(self, values, **kwargs):
+        self._call("append_rows")
+        self._trim()
+        for row in values:
+            self._values.append([_cell_text(v) for v in row])
+        self.row_count = max(self.row_count, len(self._values))
+        self._written()
+
+    def delete_rows(self, start_index, end_index=None):
+        self._call("delete_rows")
+        end_index = start_index if end_index is None else end_index
+        del self._values[start_index - 1:end_index]
+        self.row_count -= end_index - start_index + 1
+        self._written()
+
+    def clear(self):
+        self._call("clear")
+        self._values = []
+        self._written()
+
+    def add_rows(self, rows):
+        self._call("add_rows")
+        self.row_count += rows
+
+    def add_cols(self, cols):
+        self._call("add_cols")
+        self.col_count += cols
+
+    def update(self, range_name, values=None, **kwargs):
+        self._call("update")
+        self._write_range(range_name, values or [])
+        self._written()
+
+    def batch_update(self, data, **kwargs):
+        self._call("batch_update")
+        for item in data:
+            self._write_range(item["range"], item["values"])
+        self._written()
+
+    def _write_range(self, range_name, values):
+        m = _A1_RANGE.match(range_name)
+        if not m:
+            raise ValueError(f"Unsupported range: {range_name}")
+        col0, row0 = _col_index(m.group(1)) - 1, int(m.group(2)) - 1
+        if row0 + len(values) > self.row_count:
+            raise ValueError(f"Range {range_name} exceeds grid limits")
+        for i, row in enumerate(values):
+            current = self._values[row0 + i] if row0 + i < len(self._values) else []
+            current = current + [""] * (col0 + len(row) - len(current))
+            current[col0:col0 + len(row)] = [_cell_text(v) for v in row]
+            self._set_row(row0 + i, current)
+        self._trim()
+
+
+class FileWorksheet(FakeWorksheet):
+    """FakeWorksheet persisted as a CSV file after every write."""
+
+    def __init__(self, path, title=None, rows=200, cols=20):
+        values = []
+        if os.path.exists(path):
+            with open(path, newline="", encoding="utf-8") as f:
+                values = list(csv.reader(f))
+        title = title or os.path.splitext(os.path.basename(path))[0]
+        super().__init__(title, values, rows=rows, cols=cols)
+        self.path = path
+
+    def _written(self):
+        super()._written()
+        self._trim()
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(self._values)
+        os.replace(tmp, self.path)
+
+
+# ======================
+# SPREADSHEETS / CLIENT
+# ======================
+class FakeSpreadsheet:
+    def __init__(self, key, worksheets=(), calls=None, directory=None):
+        self.id = key
+        self.directory = directory
+        self.calls = calls if calls is not None else Counter()
+        self._worksheets = {}
+        for ws in worksheets:
+            self._attach(ws)
+
+    def _attach(self, ws):
+        ws.calls = self.calls
+        self._worksheets[ws.title] = ws
+
+    def worksheets(self):
+        self.calls["worksheets"] += 1
+        return list(self._worksheets.values())
+
+    def worksheet(self, title):
+        self.calls["worksheet"] += 1
+        try:
+            return self._worksheets[title]
+        except KeyError:
+            raise WorksheetNotFound(title) from None
+
+    def add_worksheet(self, title, rows=200, cols=20, **kwargs):
+        self.calls["add_worksheet"] += 1
+        if title in self._worksheets:
+            raise FakeAPIError(400, f'A sheet with the name "{title}" already exists.')
+        if self.directory:
+            ws = FileWorksheet(os.path.join(self.directory, title + ".csv"), title, rows=rows, cols=cols)
+            ws._written()
+        else:
+            ws = FakeWorksheet(title, rows=rows, cols=cols)
+        self._attach(ws)
+        return ws
+
+    def del_worksheet(self, worksheet):
+        self.calls["del_worksheet"] += 1
+        del self._worksheets[worksheet.title]
+
+    def get_lastUpdateTime(self):
+        self.calls["get_lastUpdateTime"] += 1
+        return f"{len(self._worksheets)}-{sum(ws.version for ws in self._worksheets.values())}"
+
+
+class FakeClient:
+    """Stand-in for ``gspread.Client``; all spreadsheets share one call counter."""
+
+    def __init__(self, spreadsheets=None):
+        self.calls = Counter()
+        self._spreadsheets = {}
+        for key, sheets in (spreadsheets or {}).items():
+            self.add_spreadsheet(key, sheets)
+
+    @property
+    def api_calls(self):
+        return sum(self.calls.values())
+
+    def reset_calls(self):
+        self.calls.clear()
+
+    def add_spreadsheet(self, key, worksheets=(), directory=None):
+        sh = FakeSpreadsheet(key, worksheets, calls=self.calls, directory=directory)
+        self._spreadsheets[key] = sh
+        return sh
+
+    @classmethod
+    def from_directory(cls, root):
+        """File-backed client: ``root/<spreadsheet key>/<worksheet title>.csv``."""
+        client = cls()
+        for key in sorted(os.listdir(root)):
+            directory = os.path.join(root, key)
+            if not os.path.isdir(directory):
+                continue
+            sheets = [
+                FileWorksheet(os.path.join(directory, name))
+                for name in sorted(os.listdir(directory)) if name.endswith(".csv")
+            ]
+            client.add_spreadsheet(key, sheets, directory=directory)
+        return client
+
+    def open_by_key(self, key):
+        self.calls["open_by_key"] += 1
+        try:
+            return self._spreadsheets[key]
+        except KeyError:
+            raise SpreadsheetNotFound(key) from None
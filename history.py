@@ -0,0 +1,209 @@
+"""Compact columnar season history built from the division result sheets.
+
+Every season of every division is held as one frame with Name, Type,
+TypeNorm and Tournament as categoricals (text stripped, categories sorted),
+CompetitorId from the identity index, Date as datetime64 and each event as
+an int16 array (float64 only when a sheet holds fractional or out-of-range
+points; blanks are 0). Text, names and dates are parsed once per distinct
+value rather than per row, and the source frames are read column by column
+without being concatenated or copied. Name holds each competitor's display
+name, so every spelling of one competitor (in any division) is one name.
+"""
+import numpy as np
+import pandas as pd
+
+import identity
+import seasons
+from scoring import EVENT_COLS, norm_types
+
+TEXT_COLS = ["Name", "Type", "Tournament", "Tournament Name"]
+DEDUPE_KEYS = ["CompetitorId", "Date", "Type", "Tournament Name"]
+SCORE_DTYPE = np.int16
+
+
+# ======================
+# COLUMNS
+# ======================
+def _text(value):
+    return str(value).strip()
+
+
+def _parts(parts) -> list:
+    return [parts] if isinstance(parts, (pd.Series, pd.Index, np.ndarray)) else list(parts)
+
+
+def categorical(parts, normalize=None) -> pd.Categorical:
+    """The values of ``parts`` (one array or a list taken as concatenated) as a
+    categorical with sorted categories. Each part is factorized on its own and
+    ``normalize`` maps each distinct value once (None becomes missing)."""
+    factorized = [pd.factorize(part) for part in _parts(parts)]
+    uniques = [u for _, part_uniques in factorized for u in part_uniques]
+    if normalize is not None:
+        uniques = [normalize(u) for u in uniques]
+    remap, categories = pd.factorize(pd.Index(uniques), sort=True)
+    codes = np.empty(sum(len(c) for c, _ in factorized), dtype=np.int64)
+    row = offset = 0
+    for part_codes, part_uniques in factorized:
+        lookup = np.append(remap[offset:offset + len(part_uniques)], -1)
+        codes[row:row + len(part_codes)] = lookup[part_codes]
+        row += len(part_codes)
+        offset += len(part_uniques)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def dates(parts) -> np.ndarray:
+    """datetime64 values of ``parts``, each distinct text parsed once (NaT when unreadable)."""
+    days = categorical(parts)
+    parsed = pd.to_datetime(pd.Series(days.categories, dtype=object), errors="coerce").to_numpy()
+    return np.append(parsed, np.datetime64("NaT", "ns").astype(parsed.dtype))[days.codes]
+
+
+def scores(parts) -> np.ndarray:
+    """Event points of ``parts`` as int16 (blanks and text are 0), or float64
+    when they do not fit."""
+    points = np.concatenate(
+        [pd.to_numeric(part, errors="coerce").to_numpy(dtype=float) for part in _parts(parts)] or [np.zeros(0)]
+    )
+    np.nan_to_num(points, copy=False, nan=0.0)
+    info = np.iinfo(SCORE_DTYPE)
+    if np.all(points == np.round(points)) and np.all((points >= info.min) & (points <= info.max)):
+        return points.astype(SCORE_DTYPE)
+    return points
+
+
+# ======================
+# DIVISION ROWS
+# ======================
+def division_rows(frames, event_cols=EVENT_COLS, identities=None) -> pd.DataFrame:
+    """Division result frames as one compact frame: dates parsed, types
+    normalized, competitors identified, duplicate rows (the same competitor
+    listed in two divisions) dropped. Columns other than the text columns,
+    Date and ``event_cols`` are left out."""
+    frames = [frame.set_axis(frame.columns.str.strip(), axis=1) for frame in frames]
+    wanted = TEXT_COLS + ["Date"] + list(event_cols)
+    present = [c for c in wanted if any(c in frame.columns for frame in frames)]
+
+    def parts(col):
+        return [frame[col] if col in frame.columns else pd.Series(np.nan, index=frame.index) for frame in frames]
+
+    columns = {}
+    for col in present:
+        if col == "Date":
+            columns[col] = dates(parts(col))
+        elif col in TEXT_COLS:
+            columns[col] = categorical(parts(col), _text)
+        else:
+            columns[col] = scores(parts(col))
+    if "Name" in columns:
+        columns["Name"], columns["CompetitorId"] = competitors(columns["Name"], identities)
+    df = pd.DataFrame(columns)
+    if "Type" in df.columns:
+        df["TypeNorm"] = norm_types(df["Type"])
+
+    # --- Deduplicate competitor rows ---
+    dedupe_keys = [c for c in DEDUPE_KEYS if c in df.columns]
+    if dedupe_keys:
+        duplicated = df.duplicated(subset=dedupe_keys).to_numpy()
+        if duplicated.any():
+            df = df[~duplicated]
+    return df
+
+
+# ======================
+# NAME LOOKUPS
+# ======================
+def _name_codes(names: pd.Series) -> tuple:
+    if not isinstance(names.dtype, pd.CategoricalDtype):
+        names = pd.Series(categorical(names, _text), index=names.index)
+    return names.cat.codes.to_numpy(), names.cat.categories
+
+
+def competitors(names, identities=None) -> tuple:
+    """``(names, ids)``: each row's display name (categorical, sorted) and
+    competitor id (``identity.MISSING`` for blanks), looked up once per spelling."""
+    identities = identities or identity.default_index()
+    codes, spellings = _name_codes(pd.Series(names))
+    ids = identities.ids(spellings)
+    remap, display = pd.factorize(pd.Index(identities.names(ids)), sort=True)
+    return (
+        pd.Categorical.from_codes(np.append(remap, -1)[codes], categories=display),
+        np.append(ids, ids.dtype.type(identity.MISSING))[codes],
+    )
+
+
+def name_index(names: pd.Series) -> tuple:
+    """``(index, positions)``: the sorted distinct (stripped) names of ``names``
+    and each row's position in that index (-1 for missing names)."""
+    codes, categories = _name_codes(names)
+    used = np.unique(codes[codes >= 0])
+    lookup = np.full(len(categories) + 1, -1, dtype=np.int64)
+    lookup[used] = np.arange(len(used))
+    return pd.Index(categories[used]), lookup[codes]
+
+
+def name_positions(index: pd.Index, names: pd.Series) -> np.ndarray:
+    """Each row's position in ``index`` (-1 when absent), matched once per distinct name."""
+    codes, categories = _name_codes(names)
+    return np.append(index.get_indexer(categories), -1)[codes]
+
+
+# ======================
+# SEASON PARTITIONS
+# ======================
+class SeasonHistory:
+    """Division rows partitioned by season and indexed by (competitor, season, date).
+
+    ``rows`` is sorted by season then date, so a season, or a season up to a
+    date, is one contiguous slice; a second ordering groups each competitor's
+    rows (by CompetitorId) in (season, date) order. Queries return slices of
+    ``rows`` without scanning the other seasons.
+    """
+
+    def __init__(self, df: pd.DataFrame, season_table=None, identities=None):
+        self.season_table = season_table or seasons.SEASONS
+        self.identities = identities or identity.default_index()
+        season = self.season_table.labels(df["Date"]).array
+        order = np.lexsort((df["Date"].to_numpy(), season.codes))
+        self.rows = df.iloc[order].assign(Season=season.take(order)).reset_index(drop=True)
+        self._dates = self.rows["Date"].to_numpy()
+        self._season_codes = season.codes[order]
+        self._season_names = list(season.categories)
+        cuts = np.searchsorted(self._season_codes, np.arange(len(self._season_names) + 1))
+        self._bounds = {name: (cuts[i], cuts[i + 1]) for i, name in enumerate(self._season_names)}
+
+        ids = self.rows["CompetitorId"].to_numpy()
+        self._by_id = np.argsort(ids, kind="stable")
+        self._sorted_ids = ids[self._by_id]
+
+    # --- partitions ---
+    def seasons(self) -> list:
+        """Seasons with rows, in season order."""
+        return list(self._bounds)
+
+    def season(self, name=None) -> pd.DataFrame:
+        """Rows of one season (default: the active one), in date order."""
+        name = self.season_table.active().name if name is None else name
+        start, stop = self._bounds.get(name, (0, 0))
+        return self.rows.iloc[start:stop]
+
+    def as_of(self, date) -> pd.DataFrame:
+        """Rows of the season containing ``date`` up to and including ``date``."""
+        season = self.season_table.season_of(date)
+        if season is None or season.name not in self._bounds:
+            return self.rows.iloc[0:0]
+        start, stop = self._bounds[season.name]
+        day = (pd.Timestamp(date).normalize() + pd.Timedelta(days=1)).to_datetime64().astype(self._dates.dtype)
+        return self.rows.iloc[start:start + int(np.searchsorted(self._dates[start:stop], day, side="left"))]
+
+    def competitor(self, name, season=None) -> pd.DataFrame:
+        """One competitor's rows (any spelling of ``name``) in (season, date)
+        order, optionally one season only."""
+        competitor_id = self.identities.id_of(name)
+        if competitor_id is None:
+            return self.rows.iloc[0:0]
+        start, stop = np.searchsorted(self._sorted_ids, [competitor_id, competitor_id + 1])
+        rows = self._by_id[start:stop]
+        if season is not None:
+            code = self._season_names.index(season) if season in self._bounds else -2
+            rows = rows[self._season_codes[rows] == code]
+        return self.rows.iloc[rows]
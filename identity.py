@@ -0,0 +1,190 @@
+"""Competitor identities shared by the competitor worksheets and the division sheets.
+
+A name is normalized once (Unicode NFKC, runs of whitespace collapsed, case
+folded) and every normalized name maps to one integer id, so "Jane  Doe" in
+one division sheet and "jane doe" in another are the same competitor. The
+alias table merges other spellings ("J. Doe") into an existing id. Each id
+has one display name: its worksheet title once one is registered (the first
+one that is not an alias when several share the id), else the first
+spelling seen.
+
+Ids, display names and aliases persist in ATA_IDENTITY_FILE (JSON) when it
+is set, so ids stay stable across restarts; otherwise they live for the
+process only.
+"""
+import json
+import os
+import threading
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+IDENTITY_FILE = os.environ.get("ATA_IDENTITY_FILE")
+MISSING = -1
+ID_DTYPE = np.int32
+
+
+def normalize(name) -> str:
+    """Key of ``name`` ("" for a missing or blank name)."""
+    if name is None or (not isinstance(name, str) and pd.isna(name)):
+        return ""
+    return " ".join(unicodedata.normalize("NFKC", str(name)).split()).casefold()
+
+
+def _display(name) -> str:
+    return " ".join(unicodedata.normalize("NFKC", str(name)).split())
+
+
+# ======================
+# INDEX
+# ======================
+class IdentityIndex:
+    """Normalized name -> id, id -> display name, and the alias merge table."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._ids = {}      # normalized name (aliases included) -> id
+        self._names = []    # id -> display name
+        self._aliases = {}  # normalized alias -> normalized canonical name
+        self._dirty = False
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._restore(json.load(f))
+
+    # --- lookups ---
+    def ids(self, names, titles=False) -> np.ndarray:
+        """Id of every name in ``names`` (``MISSING`` for blanks), normalized
+        once per distinct value; unseen names get new ids. With ``titles``
+        the names are worksheet titles and become the display names (the
+        first title wins when several share an id)."""
+        codes, uniques = pd.factorize(pd.Series(names, dtype=object))
+        titled = set() if titles else None
+        with self._lock:
+            lookup = [self._assign(name, titled) for name in uniques]
+            self._save()
+        return np.append(np.array(lookup, dtype=ID_DTYPE), ID_DTYPE(MISSING))[codes]
+
+    def id_of(self, name):
+        """Id of ``name``, or None when it has never been seen."""
+        with self._lock:
+            return self._ids.get(normalize(name))
+
+    def name(self, competitor_id):
+        return self._names[competitor_id] if competitor_id >= 0 else None
+
+    def names(self, ids) -> np.ndarray:
+        """Display name per id (None for ``MISSING``)."""
+        with self._lock:
+            names = np.array(self._names + [None], dtype=object)
+        ids = np.asarray(ids, dtype=np.int64)
+        return names[np.where(ids >= 0, ids, len(names) - 1)]
+
+    def canonical(self, names) -> pd.Series:
+        """Display name of every name in ``names`` (missing for blanks)."""
+        names = pd.Series(names)
+        return pd.Series(self.names(self.ids(names)), index=names.index, name=names.name)
+
+    def titles_by_id(self, titles) -> dict:
+        """``{id: title}`` for worksheet titles, registering them as display names;
+        of several titles sharing an id, the one that became its display name."""
+        ids = self.ids(titles, titles=True).tolist()
+        with self._lock:
+            aliases = set(self._aliases)
+        chosen = {}
+        for competitor_id, title in zip(ids, titles):
+            if competitor_id == MISSING:
+                continue
+            preferred = normalize(title) not in aliases
+            if competitor_id not in chosen or (preferred and not chosen[competitor_id][1]):
+                chosen[competitor_id] = (title, preferred)
+        return {competitor_id: title for competitor_id, (title, _) in chosen.items()}
+
+    # --- aliases ---
+    def aliases(self) -> dict:
+        """``{alias: canonical display name}``."""
+        with self._lock:
+            return {alias: self._names[self._ids[key]] for alias, key in self._aliases.items()}
+
+    def merge(self, alias, canonical) -> int:
+        """Make ``alias`` another spelling of ``canonical``; returns the shared id.
+        Names already merged into ``alias`` follow it."""
+        alias_key, key = normalize(alias), normalize(canonical)
+        if not alias_key or not key:
+            raise ValueError("Cannot merge a blank name")
+        with self._lock:
+            key = self._aliases.get(key, key)
+            target = self._assign(canonical)
+            if alias_key == key:
+                return target
+            for other, points_to in list(self._aliases.items()):
+                if points_to == alias_key:
+                    self._aliases[other] = key
+                    self._ids[other] = target
+            self._aliases[alias_key] = key
+            self._ids[alias_key] = target
+            self._dirty = True
+            self._save()
+            return target
+
+    # --- bookkeeping ---
+    def _assign(self, name, titled=None):
+        key = normalize(name)
+        if not key:
+            return MISSING
+        competitor_id = self._ids.get(key)
+        if competitor_id is None:
+            competitor_id = self._ids[key] = len(self._names)
+            self._names.append(_display(name))
+            self._dirty = True
+        elif titled is not None and competitor_id not in titled and key not in self._aliases:
+            if self._names[competitor_id] != _display(name):
+                self._names[competitor_id] = _display(name)
+                self._dirty = True
+        if titled is not None and key not in self._aliases:
+            titled.add(competitor_id)
+        return competitor_id
+
+    def _restore(self, state):
+        self._names = list(state.get("names", []))
+        self._ids = {key: int(i) for key, i in state.get("ids", {}).items()}
+        self._aliases = dict(state.get("aliases", {}))
+        for alias, key in self._aliases.items():
+            self._ids[alias] = self._ids[key]
+
+    def _save(self):
+        if not self._dirty or not self.path:
+            return
+        state = {
+            "names": self._names,
+            "ids": {key: i for key, i in self._ids.items() if key not in self._aliases},
+            "aliases": self._aliases,
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+# ======================
+# PROCESS-WIDE INDEX
+# ======================
+_index = None
+_index_lock = threading.Lock()
+
+
+def default_index(path=None) -> IdentityIndex:
+    """The shared index, loaded from ``path`` (default ATA_IDENTITY_FILE) on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = IdentityIndex(path or IDENTITY_FILE)
+        return _index
+
+
+def set_index(index):
+    global _index
+    with _index_lock:
+        _index = index
@@ -0,0 +1,209 @@
+"""Bulk ingestion of tournament results into every competitor worksheet.
+
+Results come from a division result CSV (one row per competitor and
+tournament, events under the division names in ``EVENT_COLS``) or an
+uploaded file that may use the worksheet event names instead. Places are
+converted with ``POINTS_MAP``; numbers are taken as points. Each affected
+worksheet skips tournaments it already has (same Date and Tournament Name)
+and gets all its new rows in one flush of the write-behind queue: one read,
+one rebuild (one Totals recompute) and one batched write; worksheets are
+flushed in parallel.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import identity
+import sheet_writer
+import tracing
+import write_queue
+from scoring import DNP, EVENT_COLS, EVENTS, HEADERS, PLACES, POINTS_CLASS, POINTS_MAP
+from totals_engine import make_row_key
+
+DEFAULT_WORKERS = 8
+
+ADDED = "added"
+CREATED = "created"  # new worksheet
+DUPLICATE = "duplicate"
+NEW = "new"          # would be added (dry run)
+FAILED = "failed"
+QUEUED = "queued"    # still waiting in the write-behind queue
+
+
+# ======================
+# SOURCE ROWS -> WORKSHEET ROWS
+# ======================
+def _tournament_col(results_df):
+    return "Tournament Name" if "Tournament Name" in results_df.columns else "Tournament"
+
+
+def tournaments_in(results_df: pd.DataFrame) -> list:
+    """Tournament names with results in ``results_df``, latest first."""
+    col = _tournament_col(results_df)
+    if col not in results_df.columns:
+        return []
+    df = results_df.dropna(subset=[col])
+    if "Date" in df.columns:
+        df = df.assign(_date=pd.to_datetime(df["Date"], errors="coerce"))
+        df = df.sort_values("_date", ascending=False, kind="stable")
+    return df[col].astype(str).str.strip().drop_duplicates().tolist()
+
+
+def _points(value, tourney_type):
+    """Division cell -> worksheet points: a place via ``POINTS_MAP``, a number as is."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return 0
+    if isinstance(value, str):
+        text = value.strip()
+        if text in PLACES:
+            return 0 if tourney_type == POINTS_CLASS else POINTS_MAP.get(tourney_type, {}).get(text, 0)
+        if text in ("", DNP):
+            return 0
+        value = pd.to_numeric(text, errors="coerce")
+        if pd.isna(value):
+            return 0
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def tournament_entries(results_df: pd.DataFrame, tournaments, tournaments_df: pd.DataFrame = None,
+                       event_cols=EVENT_COLS, events=EVENTS, identities=None) -> pd.DataFrame:
+    """One worksheet row per competitor per tournament: ``Name`` (the
+    competitor's display name in the identity index) plus the worksheet columns.
+
+    ``tournaments`` is a name or a list of names. Date and Type come from the
+    results rows, falling back to ``tournaments_df``. Events map by position:
+    ``event_cols[i]`` (or ``events[i]`` in files that use worksheet names) is
+    written to ``events[i]``. When a competitor appears twice in one
+    tournament the later row wins.
+    """
+    tournaments = [tournaments] if isinstance(tournaments, str) else list(tournaments)
+    col = _tournament_col(results_df)
+    df = results_df.copy()
+    df.columns = df.columns.str.strip()
+    df = df[df[col].astype(str).str.strip().isin(tournaments)].copy()
+    df["Name"] = (identities or identity.default_index()).canonical(df["Name"])
+    df = df[df["Name"].notna()]
+    df[col] = df[col].astype(str).str.strip()
+    df = df.drop_duplicates(subset=["Name", col], keep="last")
+
+    if tournaments_df is not None:
+        meta = tournaments_df.drop_duplicates("Tournament Name").set_index("Tournament Name")
+        for field in ("Date", "Type"):
+            lookup = df[col].map(meta[field]) if field in meta.columns else None
+            if field not in df.columns:
+                df[field] = lookup
+            elif lookup is not None:
+                df[field] = df[field].where(df[field].notna(), lookup)
+    for field in ("Date", "Type"):
+        if field not in df.columns or df[field].isna().any():
+            raise ValueError(f"No {field} for some results; pass the tournament list")
+
+    dates = pd.to_datetime(df["Date"], errors="coerce")
+    if dates.isna().any():
+        bad = df.loc[dates.isna(), col].iloc[0]
+        raise ValueError(f"Unreadable date for {bad!r}")
+
+    entries = pd.DataFrame({
+        "Name": df["Name"].to_numpy(),
+        "Date": dates.dt.strftime("%m/%d/%Y").to_numpy(),
+        "Type": df["Type"].astype(str).str.strip().to_numpy(),
+        "Tournament Name": df[col].to_numpy(),
+    })
+    for source, event in zip(event_cols, events):
+        column = source if source in df.columns else event if event in df.columns else None
+        values = df[column].tolist() if column else [0] * len(df)
+        entries[event] = [_points(v, t) for v, t in zip(values, entries["Type"])]
+    return entries.reset_index(drop=True)
+
+
+# ======================
+# WRITE
+# ======================
+def _new_rows(pool, key, name, rows, pending):
+    """Rows of ``rows`` that worksheet ``name`` (with its ``pending`` rows) does not have yet."""
+    ws = pool.worksheet(key, name)
+    old = sheet_writer.read_values(ws) if ws is not None else []
+    existing = sheet_writer.tournament_keys(old) | sheet_writer.tournament_keys(old, pending)
+    return [r for r in rows if make_row_key(r[0], r[2]) not in existing]
+
+
+def _preview(pool, key, by_name, workers, pending):
+    def run(item):
+        name, rows = item
+        try:
+            fresh = _new_rows(pool, key, name, rows, pending(name) if pending else ())
+            return name, NEW if fresh else DUPLICATE, len(fresh), ""
+        except Exception as exc:
+            return name, FAILED, 0, repr(exc)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(by_name) or 1)),
+                            thread_name_prefix="ingest") as executor:
+        return list(executor.map(run, by_name.items()))
+
+
+def _write(pool, key, by_name, queue, timeout):
+    failed, created = {}, set()
+    for name in by_name:
+        if pool.worksheet(key, name) is None:
+            try:
+                pool.add_worksheet(key, name, rows=200, cols=20)
+                created.add(name)
+            except Exception as exc:
+                failed[name] = repr(exc)
+    jobs = [(name, row) for name, rows in by_name.items() if name not in failed for row in rows]
+    ids = queue.enqueue_appends(jobs, unique=True)
+    status = queue.wait(ids, timeout)
+    states = {}
+    for (name, _), job_id in zip(jobs, ids):
+        states.setdefault(name, []).append(status[job_id])
+
+    results = []
+    for name in by_name:
+        if name in failed:
+            results.append((name, FAILED, 0, failed[name]))
+            continue
+        done = sum(state == "done" for state, _ in states[name])
+        pending = sum(state == "pending" for state, _ in states[name])
+        errors = [error for state, error in states[name] if state == "failed"]
+        if errors:
+            results.append((name, FAILED, done, errors[0]))
+        elif pending:
+            results.append((name, QUEUED, pending, ""))
+        elif done:
+            results.append((name, CREATED if name in created else ADDED, done, ""))
+        else:
+            results.append((name, DUPLICATE, 0, ""))
+    return results
+
+
+@tracing.traced("ingest.bulk")
+def ingest(pool, key, entries: pd.DataFrame, write=True, workers=DEFAULT_WORKERS,
+           queue=None, timeout=None, identities=None) -> pd.DataFrame:
+    """Add ``entries`` (from ``tournament_entries``) to the worksheets of spreadsheet ``key``.
+
+    Entries go to the worksheet of the same competitor id, whatever the
+    spelling; competitors without one get a new worksheet under their name.
+    Rows are written as unique appends through ``queue`` (the app's
+    write-behind queue, so they never race its other saves; by default a
+    private in-memory one flushing ``workers`` sheets at a time) and this
+    waits up to ``timeout`` seconds (None: until done) for them; rows still
+    waiting then report as ``queued``. With ``write=False`` nothing is
+    written and new rows report as ``new``. Returns one row per worksheet:
+    Name, Status, Rows, Error.
+    """
+    identities = identities or identity.default_index()
+    titles = identities.titles_by_id(pool.worksheet_titles(key))
+    records = entries[["Name"] + list(HEADERS)].itertuples(index=False)
+    by_name = {}
+    for competitor_id, record in zip(identities.ids(entries["Name"]).tolist(), records):
+        by_name.setdefault(titles.get(competitor_id, record[0]), []).append(list(record[1:]))
+
+    if not write:
+        results = _preview(pool, key, by_name, workers, queue.pending_rows if queue is not None else None)
+    elif queue is None:
+        private = write_queue.WriteBehindQueue(":memory:", lambda title: pool.worksheet(key, title), workers=workers)
+        results = _write(pool, key, by_name, private, None)
+    else:
+        results = _write(pool, key, by_name, queue, timeout)
+    return pd.DataFrame(results, columns=["Name", "Status", "Rows", "Error"])
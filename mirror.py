@@ -0,0 +1,352 @@
+"""Optional local SQLite mirror of the competitor worksheets and division CSVs.
+
+Reads come from indexed local tables; ``resync`` pulls from the sheets and
+only rewrites rows whose content changed.
+
+    python mirror.py resync [--full] [--db PATH] [--offline DIR]
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+import data_sources
+import tracing
+from sheet_writer import numericise
+
+WORKSHEET = "worksheet"
+CSV = "csv"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    spreadsheet TEXT,
+    columns TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    checksum TEXT NOT NULL,
+    version TEXT,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rows (
+    source TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    name TEXT,
+    date TEXT,
+    tournament TEXT,
+    digest TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (source, idx)
+);
+CREATE INDEX IF NOT EXISTS rows_by_name ON rows (name, date);
+CREATE INDEX IF NOT EXISTS rows_by_tournament ON rows (tournament, source);
+"""
+
+
+def _plain(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def _iso_date(value):
+    ts = pd.to_datetime(value, errors="coerce")
+    return None if pd.isna(ts) else ts.strftime("%Y-%m-%d")
+
+
+def _spreadsheet_version(sh):
+    """Drive last-update time when the backend exposes it (None = unknown).
+
+    ``get_lastUpdateTime`` is a Drive API call (the Sheets API has no
+    modified time); it needs the drive.metadata.readonly scope in
+    ``sheets_client.SCOPES``.
+    """
+    try:
+        getter = getattr(sh, "get_lastUpdateTime", None)
+        return str(getter()) if getter else str(sh.lastUpdateTime)
+    except Exception:
+        return None
+
+
+class SheetMirror:
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._conn.close()
+
+    # ======================
+    # STORE
+    # ======================
+    @tracing.traced("mirror.store")
+    def store(self, source, kind, columns, rows, name=None, spreadsheet=None, version=None) -> int:
+        """Mirror ``rows`` (lists aligned with ``columns``) under ``source``; returns rows rewritten."""
+        columns = [str(c) for c in columns]
+        rows = [[_plain(v) for v in row] for row in rows]
+        payloads = [json.dumps(row, default=str) for row in rows]
+        digests = [hashlib.sha1(p.encode("utf-8")).hexdigest() for p in payloads]
+        checksum = hashlib.sha1("".join(digests).encode("ascii")).hexdigest()
+        columns_json = json.dumps(columns)
+
+        date_col = columns.index("Date") if "Date" in columns else None
+        name_col = columns.index("Name") if "Name" in columns else None
+        tourney_col = next((columns.index(c) for c in ("Tournament", "Tournament Name") if c in columns), None)
+
+        with self._lock, self._conn:
+            old = self._conn.execute(
+                "SELECT columns, checksum FROM sources WHERE source = ?", (source,)
+            ).fetchone()
+            now = time.time()
+            if old and old == (columns_json, checksum):
+                self._conn.execute(
+                    "UPDATE sources SET synced_at = ?, version = ? WHERE source = ?", (now, version, source)
+                )
+                return 0
+
+            existing = {} if not old or old[0] != columns_json else dict(self._conn.execute(
+                "SELECT idx, digest FROM rows WHERE source = ?", (source,)
+            ).fetchall())
+            changed = []
+            for i, (row, payload, digest) in enumerate(zip(rows, payloads, digests)):
+                if existing.get(i) == digest:
+                    continue
+                row_name = name if name is not None else (row[name_col] if name_col is not None else None)
+                changed.append((
+                    source, i,
+                    str(row_name).strip() if row_name is not None else None,
+                    _iso_date(row[date_col]) if date_col is not None and date_col < len(row) else None,
+                    row[tourney_col] if tourney_col is not None and tourney_col < len(row) else None,
+                    digest, payload,
+                ))
+            self._conn.executemany("INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?, ?, ?, ?)", changed)
+            self._conn.execute("DELETE FROM rows WHERE source = ? AND idx >= ?", (source, len(rows)))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (source, kind, spreadsheet, columns_json, len(rows), checksum, version, now),
+            )
+            return len(changed)
+
+    def store_worksheet(self, spreadsheet, title, values, version=None) -> int:
+        header = values[0] if values else []
+        return self.store(
+            worksheet_source(spreadsheet, title), WORKSHEET, header, values[1:],
+            name=title, spreadsheet=spreadsheet, version=version,
+        )
+
+    def store_frame(self, url, frame: pd.DataFrame) -> int:
+        return self.store(csv_source(url), CSV, frame.columns, frame.itertuples(index=False))
+
+    def drop(self, source):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM rows WHERE source = ?", (source,))
+            self._conn.execute("DELETE FROM sources WHERE source = ?", (source,))
+
+    # ======================
+    # SYNC
+    # ======================
+    @tracing.traced("mirror.sync_spreadsheet")
+    def sync_spreadsheet(self, pool, key, full=False) -> dict:
+        """Pull every worksheet of ``key``; skipped entirely when its Drive last-update
+        time is unchanged (see ``_spreadsheet_version``), pulled when it is unknown."""
+        sh = pool.spreadsheet(key)
+        version = _spreadsheet_version(sh)
+        known = self._sources(WORKSHEET, key)
+        if not full and version is not None and known and all(v == version for v in known.values()):
+            return {"skipped": True, "worksheets": len(known), "rows_written": 0}
+
+        titles = pool.worksheet_titles(key)
+        written = 0
+        for title in titles:
+            ws = pool.worksheet(key, title)
+            with tracing.span("sheets.get_all_values"):
+                values = ws.get_all_values()
+            written += self.store_worksheet(key, title, values, version=version)
+        for source in set(known) - {worksheet_source(key, t) for t in titles}:
+            self.drop(source)
+        return {"skipped": False, "worksheets": len(titles), "rows_written": written}
+
+    def sync_titles(self, pool, key) -> dict:
+        """Mirror tabs added to or removed from ``key`` since the last sync; only new tabs are read."""
+        titles = pool.worksheet_titles(key)
+        known = self._sources(WORKSHEET, key)
+        added = [t for t in titles if worksheet_source(key, t) not in known]
+        for title in added:
+            with tracing.span("sheets.get_all_values"):
+                values = pool.worksheet(key, title).get_all_values()
+            self.store_worksheet(key, title, values)
+        removed = set(known) - {worksheet_source(key, t) for t in titles}
+        for source in removed:
+            self.drop(source)
+        return {"added": len(added), "removed": len(removed)}
+
+    def sync_csv(self, url) -> int:
+        return self.store_frame(url, data_sources.read_csv(url))
+
+    def resync(self, pool=None, spreadsheets=(), csv_urls=(), full=False) -> dict:
+        """Explicit resync of the given sources plus every source already mirrored."""
+        if full:
+            data_sources.get_cache().invalidate()
+        report = {}
+        keys = set(spreadsheets) | {sh for sh in self._spreadsheets() if sh}
+        if pool is not None:
+            for key in sorted(keys):
+                report[key] = self.sync_spreadsheet(pool, key, full=full)
+        urls = set(csv_urls) | {s[len(CSV) + 1:] for s in self._sources(CSV)}
+        for url in sorted(urls):
+            report[url] = {"rows_written": self.sync_csv(url)}
+        return report
+
+    def _sources(self, kind, spreadsheet=None) -> dict:
+        query = "SELECT source, version FROM sources WHERE kind = ?"
+        params = [kind]
+        if spreadsheet is not None:
+            query += " AND spreadsheet = ?"
+            params.append(spreadsheet)
+        with self._lock:
+            return dict(self._conn.execute(query, params).fetchall())
+
+    def _spreadsheets(self):
+        with self._lock:
+            return [r[0] for r in self._conn.execute(
+                "SELECT DISTINCT spreadsheet FROM sources WHERE kind = ?", (WORKSHEET,)
+            )]
+
+    # ======================
+    # READ
+    # ======================
+    def has(self, source) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM sources WHERE source = ?", (source,)).fetchone() is not None
+
+    def worksheet_titles(self, spreadsheet) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source FROM sources WHERE kind = ? AND spreadsheet = ? ORDER BY rowid",
+                (WORKSHEET, spreadsheet),
+            ).fetchall()
+        prefix = len(worksheet_source(spreadsheet, ""))
+        return [r[0][prefix:] for r in rows]
+
+    def values(self, source):
+        """Header plus rows, like ``get_all_values`` (None when not mirrored)."""
+        with self._lock:
+            meta = self._conn.execute("SELECT columns FROM sources WHERE source = ?", (source,)).fetchone()
+            if meta is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT payload FROM rows WHERE source = ? ORDER BY idx", (source,)
+            ).fetchall()
+        return [json.loads(meta[0])] + [json.loads(r[0]) for r in rows]
+
+    def worksheet_records(self, spreadsheet, title):
+        values = self.values(worksheet_source(spreadsheet, title))
+        if values is None:
+            return None
+        header = values[0]
+        return [
+            {h: numericise("" if v is None else v) for h, v in zip(header, row + [""] * (len(header) - len(row)))}
+            for row in values[1:]
+        ]
+
+    def frame(self, url):
+        values = self.values(csv_source(url))
+        if values is None:
+            return None
+        return pd.DataFrame(values[1:], columns=values[0])
+
+    def competitor_rows(self, name) -> pd.DataFrame:
+        """Every mirrored row for ``name`` across worksheets and division CSVs (indexed lookup)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.source, s.columns, r.payload FROM rows r JOIN sources s USING (source) "
+                "WHERE r.name = ? ORDER BY r.date",
+                (str(name).strip(),),
+            ).fetchall()
+        records = []
+        for source, columns, payload in rows:
+            record = dict(zip(json.loads(columns), json.loads(payload)))
+            record["Source"] = source
+            records.append(record)
+        return pd.DataFrame(records)
+
+    def status(self) -> pd.DataFrame:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, kind, row_count, synced_at FROM sources ORDER BY source"
+            ).fetchall()
+        status = pd.DataFrame(rows, columns=["Source", "Kind", "Rows", "Synced"])
+        status["Synced"] = pd.to_datetime(status["Synced"], unit="s")
+        return status
+
+
+def worksheet_source(spreadsheet, title):
+    return f"{WORKSHEET}:{spreadsheet}:{title}"
+
+
+def csv_source(url):
+    return f"{CSV}:{url}"
+
+
+_mirrors = {}
+_mirrors_lock = threading.Lock()
+
+
+def open_mirror(path) -> SheetMirror:
+    """One mirror connection per path per process."""
+    with _mirrors_lock:
+        m = _mirrors.get(path)
+        if m is None:
+            m = _mirrors[path] = SheetMirror(path)
+        return m
+
+
+# ======================
+# CLI
+# ======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resync the local sheet mirror.")
+    parser.add_argument("command", choices=["resync", "status"])
+    parser.add_argument("--db", default=os.environ.get("ATA_MIRROR_PATH", "ata_mirror.sqlite3"))
+    parser.add_argument("--spreadsheet", action="append", default=[], help="spreadsheet key to mirror")
+    parser.add_argument("--csv", action="append", default=[], help="published CSV url or path to mirror")
+    parser.add_argument("--full", action="store_true", help="ignore change checks and re-pull everything")
+    parser.add_argument("--offline", metavar="DIR", help="use the file-backed fake sheets in DIR")
+    parser.add_argument("--credentials", help="service-account JSON file for the live backend")
+    args = parser.parse_args(argv)
+
+    m = open_mirror(args.db)
+    if args.command == "status":
+        print(m.status().to_string(index=False))
+        return 0
+
+    import sheets_client
+    if args.offline:
+        from fake_sheets import FakeClient
+        pool = sheets_client.SheetPool(lambda: FakeClient.from_directory(args.offline))
+    elif args.credentials:
+        with open(args.credentials) as f:
+            pool = sheets_client.SheetPool(sheets_client.google_client_factory(json.load(f)))
+    else:
+        pool = None
+    report = m.resync(pool, spreadsheets=args.spreadsheet, csv_urls=args.csv, full=args.full)
+    for source, result in report.items():
+        print(f"{source}: {result}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,68 @@
+"""Vectorized season-wide placements for the division result sheets."""
+import numpy as np
+import pandas as pd
+
+import identity
+import tracing
+from scoring import DNP, EVENT_COLS, PLACES, POINTS_CLASS, POINTS_MAP
+
+
+@tracing.traced("compute.placement_cube")
+def placement_cube(results_df: pd.DataFrame, tournaments_df: pd.DataFrame, event_cols=EVENT_COLS,
+                   identities=None) -> pd.DataFrame:
+    """Map every score of every tournament in a division to 1st/2nd/3rd/DNP.
+
+    Returns a frame indexed by (Tournament, Name) with one column per event,
+    Name being each competitor's display name from the identity index.
+    Each row's class comes from ``tournaments_df`` (first row per name);
+    when a competitor appears twice in one tournament (under any spelling)
+    the later row wins.
+    """
+    identities = identities or identity.default_index()
+    event_cols = list(event_cols)
+    types = tournaments_df.drop_duplicates("Tournament Name").set_index("Tournament Name")["Type"]
+    row_types = results_df["Tournament"].map(types)
+
+    scores = np.column_stack([
+        pd.to_numeric(results_df[col], errors="coerce").fillna(0).to_numpy(dtype=float)
+        if col in results_df.columns else np.zeros(len(results_df))
+        for col in event_cols
+    ]) if len(results_df) else np.zeros((0, len(event_cols)))
+
+    conditions = []
+    for place in PLACES:
+        points = row_types.map({t: pts[place] for t, pts in POINTS_MAP.items()})
+        conditions.append(scores == points.to_numpy(dtype=float)[:, None])
+    labels = np.select(conditions, PLACES, default=DNP)
+
+    index = pd.MultiIndex.from_arrays(
+        [results_df["Tournament"].to_numpy(), identities.canonical(results_df["Name"]).to_numpy()],
+        names=["Tournament", "Name"],
+    )
+    cube = pd.DataFrame(labels, index=index, columns=event_cols)
+    return cube.groupby(level=["Tournament", "Name"], sort=False, dropna=False).last()
+
+
+def completed_placements(results_df: pd.DataFrame, tournaments_df: pd.DataFrame, today, event_cols=EVENT_COLS) -> tuple:
+    """``(tournament names, cube)`` for View Tournament Results: completed, placed
+    (not Class C) tournaments that have rows in ``results_df``."""
+    tournaments_df = tournaments_df.assign(Date=pd.to_datetime(tournaments_df["Date"], errors="coerce"))
+
+    # Filter: completed tournaments, not Class C
+    completed = tournaments_df[
+        (tournaments_df["Date"] <= today) &
+        (tournaments_df["Type"] != POINTS_CLASS)
+    ]
+
+    # Filter tournaments that actually have results
+    valid_tourneys = completed[
+        completed["Tournament Name"].isin(results_df["Tournament"].unique())
+    ]["Tournament Name"].dropna().sort_values().unique()
+
+    return list(valid_tourneys), placement_cube(results_df, completed, event_cols)
+
+
+def tournament_placements(cube: pd.DataFrame, tournament) -> pd.DataFrame:
+    table = cube.xs(tournament, level="Tournament")
+    table.index.name = None
+    return table
@@ -0,0 +1,169 @@
+"""Division-wide current / projected-max points for Maximum Points Projection."""
+import numpy as np
+import pandas as pd
+
+import tracing
+from history import name_index
+from season_calendar import BUCKETS
+from scoring import AA_BEST, AA_CAP, AAA_CAP, AB_BEST, AB_CAP, C_BEST, C_CAP, EVENT_COLS
+
+
+# ======================
+# GROUPED BEST-N
+# ======================
+def _best_n_matrix(frame: pd.DataFrame, keys: pd.Index, events, n) -> np.ndarray:
+    """Top ``n`` values per (key, event) as a (keys, events, n) array padded with -inf."""
+    out = np.full((len(keys), len(events), n), -np.inf)
+    if frame.empty:
+        return out
+    long = frame.melt(id_vars="key", value_vars=list(events), var_name="event", value_name="value")
+    long = long.sort_values(["key", "event", "value"], ascending=[True, True, False], kind="stable")
+    rank = long.groupby(["key", "event"], sort=False).cumcount().to_numpy()
+    keep = rank < n
+    key_pos = keys.get_indexer(long["key"].to_numpy()[keep])
+    event_pos = pd.Index(events).get_indexer(long["event"].to_numpy()[keep])
+    out[key_pos, event_pos, rank[keep]] = long["value"].to_numpy(dtype=float)[keep]
+    return out
+
+
+def _sum_best(values: np.ndarray, n) -> np.ndarray:
+    best = -np.sort(-values, axis=-1)[..., :n]
+    return np.where(np.isfinite(best), best, 0.0).sum(axis=-1)
+
+
+def _with_future(current: np.ndarray, future_vals, n) -> np.ndarray:
+    future = np.full(n, -np.inf)
+    top = sorted(future_vals, reverse=True)[:n]
+    future[:len(top)] = top
+    shape = current.shape[:-1] + (n,)
+    return np.concatenate([current, np.broadcast_to(future, shape)], axis=-1)
+
+
+# ======================
+# BATCH PROJECTION
+# ======================
+def current_buckets(df: pd.DataFrame, calendar, event_cols=EVENT_COLS) -> dict:
+    """Current ATA bucket values for every competitor and event.
+
+    Returns ``names`` and ``events`` plus (names, events) arrays ``aaa`` and
+    ``c`` (capped bucket totals) and ``aa_best`` / ``ab_best``, the best
+    weekend values padded with -inf to (names, events, AA_BEST / AB_BEST).
+    """
+    events = [e for e in event_cols if e in df.columns]
+    rows = df[df["Name"].notna()]
+    names, keys = name_index(rows["Name"])
+    slots = pd.RangeIndex(len(names))
+
+    scores = pd.DataFrame(
+        {e: pd.to_numeric(rows[e], errors="coerce").fillna(0) for e in events}, index=rows.index
+    )
+    scores["key"] = keys
+    type_norm = rows["TypeNorm"]
+
+    # AAA current (sum, capped)
+    aaa = scores[type_norm == "AAA"].groupby("key")[events].sum().reindex(slots, fill_value=0)
+
+    # AA / A-B: best weekend per event, weekends clustered from the days each competitor entered in the bucket
+    def weekend_best(bucket, n):
+        dates = pd.to_datetime(rows["Date"], errors="coerce")
+        part = scores[type_norm.isin(BUCKETS[bucket]) & dates.notna()].copy()
+        part["WeekendID"] = calendar.entered_weekends(part["key"].to_numpy(), dates[part.index])
+        weekend_max = part.groupby(["key", "WeekendID"])[events].max().reset_index()
+        return _best_n_matrix(weekend_max, slots, events, n)
+
+    # C current (best 3, capped)
+    c_rows = scores[type_norm == "C"]
+    c_best = _best_n_matrix(c_rows[["key"] + events], slots, events, C_BEST)
+
+    return {
+        "names": names,
+        "events": events,
+        "aaa": np.minimum(aaa.to_numpy(dtype=float), AAA_CAP),
+        "aa_best": weekend_best("AA", AA_BEST),
+        "ab_best": weekend_best("AB", AB_BEST),
+        "c": np.minimum(_sum_best(c_best, C_BEST), C_CAP),
+    }
+
+
+def bucket_totals(current: dict, future: dict) -> tuple:
+    """(current total, projected max) arrays of shape (names, events) from ``current_buckets``
+    and ``SeasonCalendar.future_values``."""
+    aa_best, ab_best = current["aa_best"], current["ab_best"]
+    aa_current = np.minimum(_sum_best(aa_best, AA_BEST), AA_CAP)
+    aa_projected = np.minimum(_sum_best(_with_future(aa_best, future["AA"], AA_BEST), AA_BEST), AA_CAP)
+    ab_current = np.minimum(_sum_best(ab_best, AB_BEST), AB_CAP)
+    ab_projected = np.minimum(_sum_best(_with_future(ab_best, future["AB"], AB_BEST), AB_BEST), AB_CAP)
+
+    current_total = current["aaa"] + aa_current + ab_current + current["c"]
+    projected_max = current["aaa"] + aa_projected + ab_projected + current["c"]
+    return current_total, projected_max
+
+
+@tracing.traced("compute.project_division")
+def project_division(df: pd.DataFrame, calendar, after, until, event_cols=EVENT_COLS) -> pd.DataFrame:
+    """Current and projected-max points for every competitor and event in one pass.
+
+    ``df`` holds the concatenated division rows (Name, Date, TypeNorm, events);
+    weekends come from ``calendar`` (a ``SeasonCalendar``) and future weekends
+    are the calendar's tournaments in (after, until]. Returns one row per
+    (Name, Event) with Current Points and Projected Max.
+    """
+    current = current_buckets(df, calendar, event_cols)
+    names, events = current["names"], current["events"]
+    current_total, projected_max = bucket_totals(current, calendar.future_values(after, until))
+    return pd.DataFrame({
+        "Name": np.repeat(names.to_numpy(), len(events)),
+        "Event": np.tile(events, len(names)),
+        "Current Points": current_total.ravel(),
+        "Projected Max": projected_max.ravel(),
+    })
+
+
+# ======================
+# HISTORY QUERIES
+# ======================
+def current_points(df: pd.DataFrame, calendar, event_cols=EVENT_COLS) -> pd.DataFrame:
+    """Current Points per (Name, Event) of ``df``, with no future weekends."""
+    current = current_buckets(df, calendar, event_cols)
+    names, events = current["names"], current["events"]
+    current_total, _ = bucket_totals(current, {"AA": [], "AB": []})
+    return pd.DataFrame({
+        "Name": np.repeat(names.to_numpy(), len(events)),
+        "Event": np.tile(events, len(names)),
+        "Current Points": current_total.ravel(),
+    })
+
+
+def standings(history, date, calendar, event_cols=EVENT_COLS) -> pd.DataFrame:
+    """Division standings as of ``date`` from a ``SeasonHistory``: the rows of
+    ``date``'s season up to ``date``, one ranked row per competitor."""
+    points = current_points(history.as_of(date), calendar, event_cols)
+    board = points.groupby("Name", sort=False)["Current Points"].sum()
+    board = board.sort_values(ascending=False, kind="stable").reset_index()
+    board.insert(0, "Rank", board["Current Points"].rank(method="min", ascending=False).astype(int))
+    return board
+
+
+def season_totals(history, name, calendar, event_cols=EVENT_COLS) -> pd.DataFrame:
+    """One competitor's Current Points per season (rows) and event (columns)
+    from a ``SeasonHistory``; each season is scored as its own competitor."""
+    rows = history.competitor(name)
+    points = current_points(rows.assign(Name=rows["Season"].astype(str)), calendar, event_cols)
+    table = points.pivot(index="Name", columns="Event", values="Current Points")
+    order = [s for s in history.seasons() if s in table.index]
+    events = [e for e in event_cols if e in table.columns]
+    return table.reindex(index=order, columns=events).rename_axis(index="Season", columns=None)
+
+
+def leaderboard(projection: pd.DataFrame, sort_by="Projected Max") -> pd.DataFrame:
+    board = projection.groupby("Name", sort=False)[["Current Points", "Projected Max"]].sum()
+    board["Headroom"] = board["Projected Max"] - board["Current Points"]
+    tiebreak = "Current Points" if sort_by == "Projected Max" else "Projected Max"
+    board = board.sort_values([sort_by, tiebreak], ascending=False, kind="stable").reset_index()
+    board.insert(0, "Rank", board[sort_by].rank(method="min", ascending=False).astype(int))
+    return board
+
+
+def competitor_projection(projection: pd.DataFrame, name) -> pd.DataFrame:
+    rows = projection[projection["Name"] == name]
+    return rows[["Event", "Current Points", "Projected Max"]].reset_index(drop=True)
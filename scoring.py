@@ -0,0 +1,128 @@
+"""ATA scoring rules: points, events, class buckets, totals and projection caps.
+
+Side-effect free: importing this (or any of the compute modules built on it)
+touches no Streamlit, network or files.
+"""
+import numpy as np
+import pandas as pd
+
+# ======================
+# EVENTS
+# ======================
+# Competitor worksheets
+EVENTS = [
+    "Traditional Forms", "Traditional Weapons", "Combat Sparring", "Traditional Sparring",
+    "Creative Forms", "Creative Weapons", "xTreme Forms", "xTreme Weapons"
+]
+HEADERS = ["Date", "Type", "Tournament Name"] + EVENTS
+TOTALS_LABEL = "Totals"
+
+# Published division result sheets (same events, same order, different names)
+EVENT_COLS = [
+    "Forms", "Weapons", "Combat Weapons", "Sparring",
+    "Creative Forms", "Creative Weapons", "X-Treme Forms", "X-Treme Weapons"
+]
+
+# ======================
+# POINTS
+# ======================
+POINTS_MAP = {
+    "Class AAA": {"1st": 20, "2nd": 15, "3rd": 10},
+    "Class AA": {"1st": 15, "2nd": 10, "3rd": 8},
+    "Class A": {"1st": 8, "2nd": 5, "3rd": 2},
+    "Class B": {"1st": 5, "2nd": 3, "3rd": 1}
+}
+PLACES = ["1st", "2nd", "3rd"]
+DNP = "DNP"
+POINTS_CLASS = "Class C"  # Class C results are entered as points, not places
+
+
+def points_for(tourney_type, result):
+    """Points for one event: Class C results are already points, otherwise a place."""
+    if tourney_type == POINTS_CLASS:
+        return result
+    return POINTS_MAP.get(tourney_type, {}).get(result, 0)
+
+
+def entry_row(date, tourney_type, tournament_name, results, events=EVENTS) -> list:
+    """Worksheet row for one tournament; ``results`` maps event -> place (or points for Class C)."""
+    return [date, tourney_type, tournament_name] + [points_for(tourney_type, results[e]) for e in events]
+
+
+# ======================
+# TOTALS (update_totals rules)
+# ======================
+# Best 1 AAA, best 2 AA, best 5 A/B, best 3 C, added in this order
+BUCKET_LIMITS = {"AAA": 1, "AA": 2, "AB": 5, "C": 3}
+TYPE_BUCKETS = {
+    "Class AAA": "AAA",
+    "Class AA": "AA",
+    "Class A": "AB",
+    "Class B": "AB",
+    "Class C": "C",
+}
+
+
+def compute_totals(df: pd.DataFrame, events) -> list:
+    """Per-event ATA totals of a cleaned worksheet frame (numeric events, exact Type labels)."""
+    buckets = df["Type"].map(TYPE_BUCKETS)
+    totals_by_event = []
+    for event in events:
+        total = 0
+        for bucket, limit in BUCKET_LIMITS.items():
+            total += df.loc[buckets == bucket, event].nlargest(limit).sum()
+        totals_by_event.append(float(total))
+    return totals_by_event
+
+
+# ======================
+# PROJECTION (Maximum Points Projection caps)
+# ======================
+# ATA caps: AAA 20, AA best 2 (30), A/B best 5 (40), C best 3 (9)
+AAA_CAP = 20
+AA_BEST, AA_CAP = 2, 30
+AB_BEST, AB_CAP = 5, 40
+C_BEST, C_CAP = 3, 9
+FUTURE_AA_POINTS = 15
+FUTURE_A_POINTS = 8
+FUTURE_B_POINTS = 5
+
+
+# --- Normalize types ---
+def norm_type(x):
+    s = str(x).strip().lower()
+    if "aaa" in s or s == "aaa": return "AAA"
+    elif ("aa" in s and "aaa" not in s) or s == "aa": return "AA"
+    elif "class a" in s or s == "a": return "A"
+    elif "class b" in s or s == "b": return "B"
+    elif "class c" in s or s == "c": return "C"
+    else: return None
+
+
+TYPE_CLASSES = ["AAA", "AA", "A", "B", "C"]
+
+
+def norm_types(types) -> pd.Series:
+    """``norm_type`` of a whole column as a categorical over ``TYPE_CLASSES``,
+    evaluated once per distinct value."""
+    types = pd.Series(types)
+    codes, uniques = pd.factorize(types)
+    lookup = np.array(
+        [TYPE_CLASSES.index(t) if t else -1 for t in map(norm_type, uniques)] + [-1], dtype=np.int8
+    )
+    return pd.Series(
+        pd.Categorical.from_codes(lookup[codes], categories=TYPE_CLASSES), index=types.index, name="TypeNorm"
+    )
+
+
+# ======================
+# WEEKENDS
+# ======================
+def cluster_days(dates) -> tuple:
+    """Unique days (datetime64[D], sorted) and their weekend ids: days within 1 day share an id."""
+    days = pd.to_datetime(pd.Series(dates), errors="coerce").dropna().to_numpy(dtype="datetime64[D]")
+    days = np.unique(days)
+    if len(days) == 0:
+        return days, np.zeros(0, dtype=np.int64)
+    gaps = np.diff(days).astype(np.int64) > 1
+    return days, np.concatenate([[1], 1 + np.cumsum(gaps)]).astype(np.int64)
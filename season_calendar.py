@@ -0,0 +1,132 @@
+"""Season calendar: tournament weekends clustered once from the tournament list.
+
+Weekends are clustered over the whole list (``weekends``, ``weekend_of``) and
+separately within each scoring bucket (``BUCKETS``): an AA Friday and AA
+Sunday bridged by a B Saturday are one calendar weekend but two AA weekends,
+as the ATA best-weekend rule counts them. A competitor's own scores are
+grouped by the days they entered (``entered_weekends``), so skipping the
+Saturday of an AA Friday - Sunday run leaves two AA weekends.
+"""
+import numpy as np
+import pandas as pd
+
+import tracing
+from scoring import FUTURE_A_POINTS, FUTURE_AA_POINTS, FUTURE_B_POINTS, cluster_days, norm_types
+
+CLASS_ORDER = ["C", "B", "A", "AA", "AAA"]
+BUCKETS = {"AA": ["AA"], "AB": ["A", "B"]}
+
+
+class _Weekends:
+    """Weekend ids of one set of tournament days."""
+
+    def __init__(self, dates):
+        self.days, self.ids = cluster_days(dates)
+        self.index = pd.Index(self.days)
+        self.by_day = dict(zip(self.days.tolist(), self.ids.tolist()))
+
+    def lookup(self, dates) -> pd.Series:
+        dates = pd.to_datetime(pd.Series(dates), errors="coerce")
+        pos = self.index.get_indexer(dates.dt.normalize().to_numpy(dtype="datetime64[D]"))
+        ids = self.ids[pos].astype(float) if len(self.ids) else np.full(len(pos), np.nan)
+        ids[pos < 0] = np.nan
+        return pd.Series(ids, index=dates.index).astype("Int64")
+
+    def assign(self, dates) -> pd.Series:
+        dates = pd.to_datetime(pd.Series(dates), errors="coerce").dt.normalize()
+        ids = self.lookup(dates)
+        for shift in (-1, 1):
+            missing = ids.isna() & dates.notna()
+            if not missing.any():
+                break
+            ids[missing] = self.lookup(dates[missing] + pd.Timedelta(days=shift))
+        missing = ids.isna() & dates.notna()
+        if missing.any():
+            days, extra = cluster_days(dates[missing])
+            offset = max(self.by_day.values(), default=0)
+            extra_map = dict(zip(days.tolist(), (extra + offset).tolist()))
+            ids[missing] = [extra_map[d] for d in dates[missing].to_numpy(dtype="datetime64[D]").tolist()]
+        return ids
+
+
+class SeasonCalendar:
+    @tracing.traced("compute.season_calendar")
+    def __init__(self, tournaments_df: pd.DataFrame):
+        frame = tournaments_df.set_axis(tournaments_df.columns.str.strip(), axis=1)
+        frame["Date"] = pd.to_datetime(frame["Date"], errors="coerce").dt.normalize()
+        if "TypeNorm" not in frame.columns:
+            frame["TypeNorm"] = norm_types(frame["Type"])
+
+        self._all = _Weekends(frame["Date"])
+        frame["WeekendID"] = self._all.lookup(frame["Date"])
+        self._buckets = {}
+        frame["BucketWeekendID"] = pd.Series(pd.NA, index=frame.index, dtype="Int64")
+        for bucket, types in BUCKETS.items():
+            in_bucket = frame["TypeNorm"].isin(types)
+            weekends = self._buckets[bucket] = _Weekends(frame.loc[in_bucket, "Date"])
+            frame.loc[in_bucket, "BucketWeekendID"] = weekends.lookup(frame.loc[in_bucket, "Date"])
+        self.tournaments = frame
+
+        named = frame.dropna(subset=["Tournament Name", "WeekendID"]).drop_duplicates("Tournament Name")
+        self._by_name = dict(zip(named["Tournament Name"].astype(str), named["WeekendID"].astype(int)))
+        self.weekends = self._summarize(frame)
+
+    # --- lookups ---
+    def weekend_of(self, key):
+        """Weekend id for a tournament name or a date (None when unknown)."""
+        if isinstance(key, str) and key in self._by_name:
+            return self._by_name[key]
+        try:
+            day = pd.Timestamp(key).to_datetime64().astype("datetime64[D]")
+        except (TypeError, ValueError):
+            return None
+        return self._all.by_day.get(day.tolist())
+
+    def weekend_ids(self, dates: pd.Series, bucket=None) -> pd.Series:
+        """Weekend id per date, among all tournaments or only ``bucket``'s (a
+        ``BUCKETS`` key); dates not on the calendar snap to an adjacent calendar
+        day, and anything left over is clustered among itself after the known weekends."""
+        weekends = self._all if bucket is None else self._buckets[bucket]
+        return weekends.assign(dates)
+
+    @staticmethod
+    def entered_weekends(keys, dates) -> np.ndarray:
+        """Weekend id per row, clustering each competitor's (``keys``) own days
+        like ``cluster_days``: entered days within 1 day of each other share a weekend."""
+        days = pd.to_datetime(pd.Series(dates), errors="coerce").to_numpy(dtype="datetime64[D]")
+        keys = np.asarray(keys)
+        order = np.lexsort((days, keys))
+        k, d = keys[order], days[order]
+        new = np.ones(len(order), dtype=bool)
+        new[1:] = (k[1:] != k[:-1]) | ((d[1:] - d[:-1]).astype(np.int64) > 1)
+        ids = np.empty(len(order), dtype=np.int64)
+        ids[order] = np.cumsum(new)
+        return ids
+
+    # --- per-weekend summaries ---
+    @staticmethod
+    def _summarize(frame):
+        rows = frame.dropna(subset=["WeekendID"])
+        if rows.empty:
+            return pd.DataFrame(columns=["Start", "End", "Tournaments", "HighestClass"] + CLASS_ORDER)
+        present = pd.crosstab(rows["WeekendID"], rows["TypeNorm"]).reindex(columns=CLASS_ORDER, fill_value=0) > 0
+        summary = rows.groupby("WeekendID").agg(
+            Start=("Date", "min"), End=("Date", "max"), Tournaments=("Tournament Name", "nunique")
+        )
+        ranked = present.to_numpy()[:, ::-1]
+        highest = np.where(ranked.any(axis=1), np.array(CLASS_ORDER[::-1])[ranked.argmax(axis=1)], None)
+        summary["HighestClass"] = highest
+        return summary.join(present)
+
+    def highest_class(self, weekend_id):
+        return self.weekends.at[weekend_id, "HighestClass"] if weekend_id in self.weekends.index else None
+
+    def future_values(self, after, until) -> dict:
+        """Projected AA and A/B weekend values for tournaments in (after, until]."""
+        frame = self.tournaments
+        window = frame[(frame["Date"] > after) & (frame["Date"] <= until) & frame["BucketWeekendID"].notna()]
+        aa_weekends = window.loc[window["TypeNorm"].isin(BUCKETS["AA"]), "BucketWeekendID"].nunique()
+        ab = window[window["TypeNorm"].isin(BUCKETS["AB"])]
+        has_a = ab["TypeNorm"].eq("A").groupby(ab["BucketWeekendID"]).any()
+        ab_vals = np.where(has_a.to_numpy(dtype=bool), FUTURE_A_POINTS, FUTURE_B_POINTS).tolist()
+        return {"AA": [FUTURE_AA_POINTS] * int(aa_weekends), "AB": ab_vals}
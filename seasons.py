@@ -0,0 +1,124 @@
+"""Season registry: the one place season boundaries and the active season are configured.
+
+Seasons run June 1 - May 31 and are named like ``2025-26``. Set
+ATA_SEASONS_FILE to a JSON file of ``{"2025-26": {"start": "2025-06-01", "end": "2026-05-31"}}``
+to override some or all of them. A configured season replaces the default
+one of the same name (its dates outside the configured range have no
+season); other dates outside the configured seasons fall in the default
+season of their year. ATA_ACTIVE_SEASON pins the active season (default: the
+one containing today, else the next configured one), which is the only
+season worksheet Totals and projections count.
+"""
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+START_MONTH, START_DAY = 6, 1
+
+
+class Season(NamedTuple):
+    name: str
+    start: pd.Timestamp
+    end: pd.Timestamp  # last day, inclusive
+
+    def contains(self, date) -> bool:
+        return self.start <= pd.Timestamp(date).normalize() <= self.end
+
+
+def default_season(year) -> Season:
+    """The June - May season starting in ``year``."""
+    start = pd.Timestamp(year, START_MONTH, START_DAY)
+    end = pd.Timestamp(year + 1, START_MONTH, START_DAY) - pd.Timedelta(days=1)
+    return Season(f"{year}-{(year + 1) % 100:02d}", start, end)
+
+
+def _season_years(days: np.ndarray) -> np.ndarray:
+    """Year each datetime64[D] day's default season starts in."""
+    months = days.astype("datetime64[M]")
+    early = (days - months.astype("datetime64[D]")).astype(np.int64) + 1 < START_DAY
+    shifted = months - early.astype(np.int64) - (START_MONTH - 1)
+    return shifted.astype("datetime64[Y]").astype(np.int64) + 1970
+
+
+class SeasonTable:
+    """Configured seasons plus the default June - May rule for every other date."""
+
+    def __init__(self, seasons=(), active=None):
+        self.configured = sorted(seasons, key=lambda s: s.start)
+        for earlier, later in zip(self.configured, self.configured[1:]):
+            if later.start <= earlier.end:
+                raise ValueError(f"Seasons {earlier.name!r} and {later.name!r} overlap")
+        self._by_name = {s.name: s for s in self.configured}
+        self._starts = np.array([s.start.to_datetime64() for s in self.configured], dtype="datetime64[ns]")
+        self._ends = np.array([s.end.to_datetime64() for s in self.configured], dtype="datetime64[ns]")
+        self._active = active
+
+    # --- lookups ---
+    def get(self, name) -> Season:
+        if name in self._by_name:
+            return self._by_name[name]
+        try:
+            season = default_season(int(str(name).split("-")[0]))
+        except ValueError:
+            raise KeyError(name) from None
+        if season.name != name:
+            raise KeyError(name)
+        return season
+
+    def season_of(self, date):
+        """The ``Season`` containing ``date`` (None for a missing date)."""
+        labels = self.labels([date])
+        return None if pd.isna(labels.iloc[0]) else self.get(labels.iloc[0])
+
+    def active(self, today=None) -> Season:
+        if self._active:
+            return self.get(self._active)
+        today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today)
+        season = self.season_of(today)
+        if season is None:
+            # today falls in the gap a configured season left in its default one
+            season = next((s for s in self.configured if s.end >= today), self.configured[-1])
+        return season
+
+    def labels(self, dates) -> pd.Series:
+        """Season name per date as an ordered categorical (categories in season
+        order); missing dates have no season."""
+        dates = pd.Series(dates)
+        values = dates.to_numpy() if dates.dtype.kind == "M" else pd.to_datetime(dates, errors="coerce").to_numpy()
+        days = values.astype("datetime64[D]")
+        valid = ~np.isnat(days)
+        years, year_codes = np.unique(_season_years(days[valid]), return_inverse=True)
+        defaults = [default_season(int(y)) for y in years]
+        seasons = defaults + self.configured
+        codes = np.full(len(days), -1, dtype=np.int64)
+        codes[valid] = year_codes
+        if self.configured:
+            days = days.astype("datetime64[ns]")
+            pos = np.searchsorted(self._starts, days, side="right") - 1
+            inside = valid & (pos >= 0) & (days <= self._ends[np.maximum(pos, 0)])
+            codes[inside] = len(years) + pos[inside]
+        # categories in season order; a configured season shadows the default of its name
+        kept = [i for i, s in enumerate(seasons) if i >= len(defaults) or s.name not in self._by_name]
+        order = sorted(kept, key=lambda i: seasons[i].start)
+        rank = np.full(len(seasons) + 1, -1, dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        labels = pd.Categorical.from_codes(rank[codes], categories=[seasons[i].name for i in order], ordered=True)
+        return pd.Series(labels.remove_unused_categories(), index=dates.index, name="Season")
+
+
+def load_seasons(path=None, active=None) -> SeasonTable:
+    path = path or os.environ.get("ATA_SEASONS_FILE")
+    active = active or os.environ.get("ATA_ACTIVE_SEASON") or None
+    config = {}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    seasons = [Season(name, pd.Timestamp(entry["start"]), pd.Timestamp(entry["end"]))
+               for name, entry in config.items()]
+    return SeasonTable(seasons, active)
+
+
+SEASONS = load_seasons()
@@ -0,0 +1,388 @@
+"""Batched write path for competitor worksheets.
+
+A save reads the sheet once, rebuilds the sorted rows plus the Totals row (of
+the active season) in memory and commits only the changed cells with a single
+``batch_update``. Edits made in the editor travel as a cell-level patch against the rows they
+were made on, so they merge with concurrent changes to other cells.
+"""
+import hashlib
+import json
+
+import pandas as pd
+
+import seasons
+import tracing
+from scoring import EVENTS, HEADERS, TOTALS_LABEL, compute_totals
+from totals_engine import make_row_key
+
+
+# ======================
+# A1 HELPERS
+# ======================
+def col_letter(n):
+    letters = ""
+    while n > 0:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if pd.isna(value):
+            return ""
+        if value.is_integer():
+            return str(int(value))
+    return str(value)
+
+
+def numericise(value):
+    """A cell read back the way ``get_all_records`` returns it: numeric text as int or float."""
+    if not isinstance(value, str) or value == "":
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _sheet_number(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+# ======================
+# IN-MEMORY SHEET BUILD
+# ======================
+@tracing.traced("compute.build_sheet")
+def build_sheet(values, events=EVENTS, extra_rows=(), season=None) -> list:
+    """Return the full sheet (header, date-sorted rows, Totals row) for ``values``;
+    the Totals row counts ``season`` (default: the active season)."""
+    header = list(values[0]) if values and any(values[0]) else list(HEADERS)
+    body = [list(r) for r in values[1:] if r and any(cell_text(c) for c in r)]
+    body += [list(r) for r in extra_rows]
+    width = len(header)
+    body = [(r + [""] * width)[:width] for r in body]
+
+    df = pd.DataFrame(body, columns=header, dtype=object)
+    df = df[~df["Date"].isin([TOTALS_LABEL])]
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df = df[df["Date"].notna()]
+    df = df.sort_values("Date", kind="stable").reset_index(drop=True)
+
+    for event in events:
+        if event not in df.columns:
+            df[event] = 0
+            header.append(event)
+        df[event] = pd.to_numeric(df[event], errors="coerce").fillna(0)
+
+    # Totals count the active season only; earlier seasons stay on the sheet
+    season = season or seasons.SEASONS.active().name
+    totals = compute_totals(df[(seasons.SEASONS.labels(df["Date"]) == season).to_numpy()], events)
+
+    df["Date"] = df["Date"].dt.strftime("%m/%d/%Y")
+    rows = []
+    for record in df[header].itertuples(index=False):
+        row = []
+        for col, value in zip(header, record):
+            row.append(_sheet_number(value) if col in events else cell_text(value))
+        rows.append(row)
+
+    totals_row = [TOTALS_LABEL] + [""] * (width - 1)
+    totals_row += [""] * (len(header) - len(totals_row))
+    for event, total in zip(events, totals):
+        totals_row[header.index(event)] = _sheet_number(total)
+    return [header] + rows + [totals_row]
+
+
+# ======================
+# COMMIT
+# ======================
+def _changed_runs(old, new) -> list:
+    """``(first, stop)`` column spans of adjacent cells that differ."""
+    runs, first = [], None
+    for j, (a, b) in enumerate(zip(old, new)):
+        if cell_text(a) != cell_text(b):
+            if first is None:
+                first = j
+        elif first is not None:
+            runs.append((first, j))
+            first = None
+    if first is not None:
+        runs.append((first, len(new)))
+    return runs
+
+
+def diff_updates(old_values, new_values) -> list:
+    """Batch-update payload covering only the cells that differ (blanking removed ones).
+
+    Changed cells form runs of adjacent columns per row; the same run on
+    consecutive rows shares one rectangular range.
+    """
+    width = max([len(r) for r in old_values] + [len(r) for r in new_values] + [1])
+    blank = [""] * width
+    updates = []
+    open_ranges = {}  # (first, stop) -> [start row, row slices]
+    for i in range(max(len(old_values), len(new_values))):
+        old = (list(old_values[i]) + blank)[:width] if i < len(old_values) else blank
+        new = (list(new_values[i]) + blank)[:width] if i < len(new_values) else blank
+        runs = _changed_runs(old, new)
+        for span in [span for span in open_ranges if span not in runs]:
+            updates.append(_range_payload(span, *open_ranges.pop(span)))
+        for first, stop in runs:
+            if (first, stop) in open_ranges:
+                open_ranges[(first, stop)][1].append(new[first:stop])
+            else:
+                open_ranges[(first, stop)] = [i, [new[first:stop]]]
+    for span, (start, rows) in open_ranges.items():
+        updates.append(_range_payload(span, start, rows))
+    return updates
+
+
+def _range_payload(span, start, rows):
+    first, last = start + 1, start + len(rows)
+    return {"range": f"{col_letter(span[0] + 1)}{first}:{col_letter(span[1])}{last}", "values": rows}
+
+
+def commit(ws, old_values, new_values) -> int:
+    """Write ``new_values`` over ``old_values`` in one batched call. Returns rows touched."""
+    updates = diff_updates(old_values, new_values)
+    if not updates:
+        return 0
+    needed_rows = max(len(old_values), len(new_values))
+    if needed_rows > ws.row_count:
+        with tracing.span("sheets.add_rows"):
+            ws.add_rows(needed_rows - ws.row_count)
+    needed_cols = max(len(r) for r in new_values)
+    if needed_cols > ws.col_count:
+        with tracing.span("sheets.add_cols"):
+            ws.add_cols(needed_cols - ws.col_count)
+    with tracing.span("sheets.batch_update"):
+        ws.batch_update(updates, value_input_option="RAW")
+    return sum(len(u["values"]) for u in updates)
+
+
+# ======================
+# SAVE ENTRY POINTS
+# ======================
+def read_values(ws):
+    with tracing.span("sheets.get_all_values"):
+        return ws.get_all_values()
+
+
+def update_totals(ws, events=EVENTS):
+    old = read_values(ws)
+    new = build_sheet(old, events)
+    commit(ws, old, new)
+    return new
+
+
+def save_result(ws, new_row, events=EVENTS):
+    old = read_values(ws)
+    new = build_sheet(old, events, extra_rows=[new_row])
+    commit(ws, old, new)
+    return new
+
+
+def replace_rows(ws, header, rows, events=EVENTS):
+    old = read_values(ws)
+    new = build_sheet([list(header)] + [list(r) for r in rows], events)
+    commit(ws, old, new)
+    return new
+
+
+def tournament_keys(values, rows=None) -> set:
+    """``make_row_key`` of every row of ``values`` (header first), or of ``rows`` laid
+    out like them; rows without a readable Date are left out."""
+    header = values[0] if values and any(values[0]) else HEADERS
+    if "Date" not in header or "Tournament Name" not in header:
+        return set()
+    date_col, name_col = header.index("Date"), header.index("Tournament Name")
+    keys = set()
+    for row in values[1:] if rows is None else rows:
+        if len(row) <= max(date_col, name_col):
+            continue
+        date = pd.to_datetime(row[date_col], errors="coerce")
+        if not pd.isna(date):
+            keys.add(make_row_key(date, row[name_col]))
+    return keys
+
+
+# ======================
+# EDIT PATCHES
+# ======================
+class EditConflict(ValueError):
+    """The sheet changed since an edit was loaded, in the cells the edit touches."""
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        super().__init__(
+            f"{len(conflicts)} edited cell(s) changed on the sheet since they were loaded: "
+            + "; ".join(conflicts[:3]) + ("; ..." if len(conflicts) > 3 else "")
+        )
+
+
+def _body(values) -> tuple:
+    """Header and the data rows of sheet ``values`` (blank and Totals rows dropped, padded)."""
+    header = list(values[0]) if values else list(HEADERS)
+    width = len(header)
+    date_col = header.index("Date") if "Date" in header else 0
+    body = []
+    for r in values[1:]:
+        row = (list(r) + [""] * width)[:width]
+        if any(cell_text(c) for c in row) and cell_text(row[date_col]) != TOTALS_LABEL:
+            body.append(row)
+    return header, body
+
+
+def rows_checksum(header, rows) -> str:
+    """Version of a sheet's data rows as text; unchanged sheets give the same digest."""
+    _, body = _body([header] + [list(r) for r in rows])
+    text = [[cell_text(c) for c in header]] + [[cell_text(c) for c in r] for r in body]
+    for row in text:
+        while row and row[-1] == "":
+            row.pop()
+    return hashlib.sha1(json.dumps(text).encode("utf-8")).hexdigest()
+
+
+def row_keys(header, rows) -> list:
+    """``[date, tournament, occurrence]`` identity of each row, as text."""
+    date_col, name_col = header.index("Date"), header.index("Tournament Name")
+    seen = {}
+    keys = []
+    for row in rows:
+        key = (cell_text(row[date_col]), cell_text(row[name_col]))
+        seen[key] = seen.get(key, 0) + 1
+        keys.append([key[0], key[1], seen[key]])
+    return keys
+
+
+def _frame_text(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    return cell_text(value)
+
+
+def frame_patch(before: pd.DataFrame, after: pd.DataFrame) -> dict:
+    """Cell-level patch from the rows an editor loaded (``before``) to its result (``after``).
+
+    Rows are matched on index labels, as ``st.data_editor`` keeps them;
+    ``base`` is the checksum of ``before``. Empty when nothing changed.
+    """
+    header = [str(c) for c in before.columns]
+    old_rows = [[_frame_text(v) for v in row] for row in before.itertuples(index=False)]
+    after = after.reindex(columns=before.columns)
+    changes, deleted = [], []
+    for label, key, old in zip(before.index, row_keys(header, old_rows), old_rows):
+        if label not in after.index:
+            deleted.append([key, old])
+            continue
+        new = [_frame_text(v) for v in after.loc[label]]
+        cells = {col: [a, b] for col, a, b in zip(header, old, new) if a != b}
+        if cells:
+            changes.append([key, cells])
+    added = [
+        [_frame_text(v) for v in after.loc[label]]
+        for label in after.index if label not in before.index
+    ]
+    added = [row for row in added if any(row)]
+    if not (changes or deleted or added):
+        return {}
+    return {"header": header, "base": rows_checksum(header, old_rows),
+            "changes": changes, "deleted": deleted, "added": added}
+
+
+def _cell_value(col, text, events):
+    """A typed-in cell as the sheet stores it: dates as MM/DD/YYYY, event scores as numbers."""
+    if col == "Date":
+        date = pd.to_datetime(text, errors="coerce")
+        return text if pd.isna(date) else date.strftime("%m/%d/%Y")
+    if col in events:
+        value = pd.to_numeric(text, errors="coerce")
+        return 0 if pd.isna(value) else _sheet_number(value)
+    return text
+
+
+def apply_patch(values, patch, events=EVENTS) -> tuple:
+    """Apply an editor ``patch`` to the current sheet ``values``.
+
+    Returns ``(values, merged)``: header plus data rows (unsorted, no Totals
+    row) and whether the sheet had changed since the patch was made. A
+    changed sheet is merged cell by cell: edits apply where the cell still
+    holds what the editor loaded; ``EditConflict`` is raised, and nothing
+    applied, when another edit got to any of them first.
+    """
+    header, body = _body(values)
+    merged = rows_checksum(header, body) != patch["base"]
+    index = {tuple(key): i for i, key in enumerate(row_keys(header, body))}
+    columns = {col: j for j, col in enumerate(header)}
+    conflicts = []
+    removed = set()
+
+    for key, cells in patch["changes"]:
+        i = index.get(tuple(key))
+        if i is None:
+            conflicts.append(f"{key[1]} ({key[0]}) was removed")
+            continue
+        for col, (old, new) in cells.items():
+            j = columns.get(col)
+            if j is None:
+                conflicts.append(f"column {col} was removed")
+                continue
+            current = cell_text(body[i][j])
+            if current == new:
+                continue
+            if merged and current != old:
+                conflicts.append(f"{key[1]} ({key[0]}) {col}: {old!r} is now {current!r}")
+                continue
+            body[i][j] = _cell_value(col, new, events)
+
+    for key, old in patch["deleted"]:
+        i = index.get(tuple(key))
+        if i is None:
+            continue  # already gone
+        current = [cell_text(c) for c in body[i]]
+        if merged and [c for c in current if c] != [c for c in old if c]:
+            conflicts.append(f"{key[1]} ({key[0]}) changed before it was deleted")
+            continue
+        removed.add(i)
+
+    if conflicts:
+        raise EditConflict(conflicts)
+    body = [row for i, row in enumerate(body) if i not in removed]
+    patch_columns = patch["header"]
+    for row in patch["added"]:
+        cells = dict(zip(patch_columns, row))
+        body.append([_cell_value(col, cells.get(col, ""), events) for col in header])
+    return [header] + body, merged
+
+
+@tracing.traced("compute.patched_sheet")
+def patched_sheet(values, engine, competitor) -> list:
+    """Full sheet (header, date-sorted rows, Totals row) after ``apply_patch``.
+
+    Rows are not re-parsed or re-formatted; the Totals row comes from
+    ``engine`` (a ``TotalsEngine``), which only re-ranks the rows that changed
+    since it last saw ``competitor``.
+    """
+    header, body = _body(values)
+    width = len(header)
+    dates = pd.to_datetime(pd.Series([cell_text(r[header.index("Date")]) for r in body], dtype=object),
+                           errors="coerce")
+    keep = dates.notna().to_numpy()
+    order = dates[keep].reset_index(drop=True).argsort(kind="stable")
+    body = [r for r, k in zip(body, keep) if k]
+    body = [body[i] for i in order]
+
+    engine.apply_records(competitor, pd.DataFrame(body, columns=header, dtype=object))
+    totals_row = [TOTALS_LABEL] + [""] * (width - 1)
+    for event, total in zip(engine.events, engine.totals(competitor)):
+        if event in header:
+            totals_row[header.index(event)] = _sheet_number(total)
+    return [header] + body + [totals_row]
@@ -0,0 +1,154 @@
+"""Process-wide gspread client with pooled spreadsheet and worksheet handles.
+
+Title lists expire after ``TITLES_TTL`` seconds and a title missing from the
+cached list is looked up again, so tabs added outside this process show up.
+"""
+import os
+import threading
+import time
+
+import tracing
+
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    # modifiedTime (Spreadsheet.get_lastUpdateTime) for the mirror's change check
+    "https://www.googleapis.com/auth/drive.metadata.readonly",
+]
+TITLES_TTL = float(os.environ.get("ATA_TITLES_TTL", "300"))
+
+
+def google_client_factory(service_account_info):
+    """Factory for an authorized gspread client; its HTTP session is shared by
+    every handle the pool opens from it."""
+    def factory():
+        import gspread
+        from google.oauth2.service_account import Credentials
+
+        creds = Credentials.from_service_account_info(dict(service_account_info), scopes=SCOPES)
+        return gspread.authorize(creds)
+    return factory
+
+
+class SheetPool:
+    """Caches the client, Spreadsheet handles, Worksheet handles and title lists.
+
+    ``client_factory`` is called once, lazily; pass a factory returning a
+    ``fake_sheets.FakeClient`` to run without Google.
+    """
+
+    def __init__(self, client_factory, titles_ttl=TITLES_TTL, clock=time.monotonic):
+        self._factory = client_factory
+        self._client = None
+        self._spreadsheets = {}
+        self._worksheets = {}
+        self._titles = {}  # key -> (titles, listed at)
+        self.titles_ttl = titles_ttl
+        self._clock = clock
+        self._lock = threading.RLock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = self._factory()
+            return self._client
+
+    def spreadsheet(self, key):
+        with self._lock:
+            sh = self._spreadsheets.get(key)
+            if sh is None:
+                with tracing.span("sheets.open_by_key"):
+                    sh = self._spreadsheets[key] = self.client.open_by_key(key)
+            return sh
+
+    def _cached_titles(self, key):
+        found = self._titles.get(key)
+        if found is None or self._clock() - found[1] >= self.titles_ttl:
+            return None
+        return found[0]
+
+    def _list(self, key):
+        sh = self.spreadsheet(key)
+        with tracing.span("sheets.worksheets"):
+            handles = sh.worksheets()
+        for ws in handles:
+            self._worksheets[(key, ws.title)] = ws
+        titles = [ws.title for ws in handles]
+        self._titles[key] = (titles, self._clock())
+        return titles
+
+    def worksheet_titles(self, key) -> list:
+        with self._lock:
+            titles = self._cached_titles(key)
+            if titles is None:
+                titles = self._list(key)
+            return list(titles)
+
+    def worksheet(self, key, title):
+        """Cached worksheet handle, or None when the sheet has no such tab. A
+        title missing from the cached list is checked against a fresh one."""
+        with self._lock:
+            ws = self._worksheets.get((key, title))
+            if ws is not None:
+                return ws
+            if key in self._titles:
+                if title not in self._list(key):
+                    return None
+                return self._worksheets[(key, title)]
+            sh = self.spreadsheet(key)
+            try:
+                with tracing.span("sheets.worksheet"):
+                    ws = sh.worksheet(title)
+            except Exception as exc:
+                # gspread's WorksheetNotFound or the fake client's stand-in, matched
+                # by name so neither module is imported before a sheet is opened
+                if type(exc).__name__ != "WorksheetNotFound":
+                    raise
+                return None
+            self._worksheets[(key, title)] = ws
+            return ws
+
+    def add_worksheet(self, key, title, rows=200, cols=20):
+        with self._lock:
+            sh = self.spreadsheet(key)
+            with tracing.span("sheets.add_worksheet"):
+                ws = sh.add_worksheet(title=title, rows=rows, cols=cols)
+            self._worksheets[(key, title)] = ws
+            self._titles.pop(key, None)
+            return ws
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._spreadsheets.clear()
+                self._worksheets.clear()
+                self._titles.clear()
+                return
+            self._spreadsheets.pop(key, None)
+            self._titles.pop(key, None)
+            for k in [k for k in self._worksheets if k[0] == key]:
+                del self._worksheets[k]
+
+
+# ======================
+# PROCESS-WIDE POOL
+# ======================
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def default_pool(client_factory=None) -> SheetPool:
+    """The shared pool; created from ``client_factory`` on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if client_factory is None:
+                raise RuntimeError("No sheet pool configured")
+            _pool = SheetPool(client_factory)
+        return _pool
+
+
+def set_pool(pool):
+    global _pool
+    with _pool_lock:
+        _pool = pool
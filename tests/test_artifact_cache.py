@@ -0,0 +1,82 @@
+import pytest
+
+import artifact_cache
+from artifact_cache import ArtifactCache
+
+KEY = "sheet"
+
+
+@pytest.fixture
+def clock():
+    return [0.0]
+
+
+@pytest.fixture
+def cache(clock):
+    return ArtifactCache(ttl=60, clock=lambda: clock[0])
+
+
+def _loader(cache, kind, sources, builds, read=None):
+    def load():
+        builds[kind] = builds.get(kind, 0) + 1
+        artifact_cache.depends_on(*sources)
+        return read() if read else kind
+    return lambda: cache.get_or_compute((kind,), load)
+
+
+def test_entries_built_from_another_entry_are_evicted_with_it(cache):
+    builds = {}
+    records = _loader(cache, "records", [artifact_cache.worksheet(KEY, "Jo")], builds)
+    totals = _loader(cache, "totals", [], builds, read=records)
+    names = _loader(cache, "names", [artifact_cache.titles(KEY)], builds)
+    totals(), names()
+    totals(), names()
+    assert builds == {"records": 1, "totals": 1, "names": 1}
+
+    assert cache.invalidate(artifact_cache.worksheet(KEY, "Jo")) == 2
+    totals(), names()
+    assert builds == {"records": 2, "totals": 2, "names": 1}
+
+
+def test_a_shorter_source_matches_every_source_it_prefixes(cache):
+    builds = {}
+    jo = _loader(cache, "jo", [artifact_cache.worksheet(KEY, "Jo")], builds)
+    sam = _loader(cache, "sam", [artifact_cache.worksheet(KEY, "Sam")], builds)
+    other = _loader(cache, "other", [artifact_cache.worksheet("other", "Jo")], builds)
+    jo(), sam(), other()
+
+    assert cache.invalidate(artifact_cache.spreadsheet(KEY)) == 2
+    jo(), sam(), other()
+    assert builds == {"jo": 2, "sam": 2, "other": 1}
+
+
+def test_a_build_invalidated_while_running_is_not_stored(cache):
+    builds = {}
+    source = artifact_cache.worksheet(KEY, "Jo")
+
+    def read():
+        if builds["records"] == 1:
+            cache.invalidate(artifact_cache.spreadsheet(KEY))  # a write lands mid-build
+        return builds["records"]
+    records = _loader(cache, "records", [source], builds, read=read)
+
+    assert records() == 1
+    assert cache.stats()["discarded"] == 1 and cache.stats()["entries"] == 0
+    assert records() == 2 and records() == 2
+
+
+def test_entries_expire_after_their_ttl(cache, clock):
+    builds = {}
+    names = _loader(cache, "names", [artifact_cache.titles(KEY)], builds)
+    names()
+    clock[0] = 59.0
+    names()
+    assert builds == {"names": 1}
+
+    clock[0] = 60.0
+    names()
+    assert builds == {"names": 2} and cache.stats()["expirations"] == 1
+
+    short = cache.get_or_compute(("short",), lambda: "v", ttl=5)
+    clock[0] = 66.0
+    assert cache.get_or_compute(("short",), lambda: "w", ttl=5) == "w" != short
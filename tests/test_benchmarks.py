@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks import run, startup
+from identity import IdentityIndex
+from placements import placement_cube, tournament_placements
+from scoring import EVENT_COLS
+
+
+def test_new_totals_projections_and_placements_match_legacy():
+    assert run.run_checks([10, 60], log=lambda line: None) == []
+
+
+def test_wall_times_are_compared_after_scaling():
+    baseline = {"x@10": {"wall_s": 0.05, "peak_kib": 100, "api_calls": 2}}
+    slower_machine = {"x@10": {"wall_s": 0.1, "peak_kib": 100, "api_calls": 2}}
+    assert run.compare(slower_machine, baseline) != []
+    assert run.compare(slower_machine, baseline, scale=2.0) == []
+
+    more_calls = {"x@10": {"wall_s": 0.05, "peak_kib": 100, "api_calls": 3}}
+    assert run.compare(more_calls, baseline, scale=2.0) == ["x@10: api_calls 2 -> 3"]
+
+
+def test_placements_with_ties_and_empty_events_match_legacy():
+    tournaments = pd.DataFrame({"Tournament Name": ["Open A", "Open B", "Empty"],
+                                "Type": ["Class A", "Class B", "Class AA"]})
+    rows = [
+        ["Open A", "Jo", 8, 5, "", 2],
+        ["Open A", "Sam", 8, 5, "", 1],    # tied with Jo
+        ["Open A", "Lee", 3, "DNP", "", 2],
+        ["Open B", "Jo", 5, 3, "", 1],
+        ["Open B", "Jo", 3, 3, "", 0],     # listed twice: the later row wins
+        ["Empty", "Sam", np.nan, "", "", np.nan],
+    ]
+    results = pd.DataFrame(rows, columns=["Tournament", "Name"] + EVENT_COLS[:4])
+    for col in EVENT_COLS[4:]:
+        results[col] = np.nan  # events nobody entered
+    types = tournaments.set_index("Tournament Name")["Type"]
+    assert run.placement_mismatches(results, tournaments, types) == []
+
+    table = tournament_placements(placement_cube(results, tournaments, identities=IdentityIndex()), "Open A")
+    assert table["Forms"].tolist() == ["1st", "1st", "DNP"]
+
+
+def test_startup_plan_follows_the_app_script():
+    before, after, per_mode = startup.script_imports()
+    assert sorted(per_mode) == sorted(startup.MODES)
+    assert not set(startup.HEAVY_MODULES) & set(before) and "pandas" in after
+    # Modules reached through the cached loaders the mode calls count too
+    assert {"history", "season_calendar"} <= set(per_mode["Season Simulation"])
+
+
+def test_startup_plan_reads_mode_branches_and_the_functions_they_call(tmp_path):
+    script = tmp_path / "app.py"
+    script.write_text(
+        "import os\n"
+        "import tracing\n"
+        "if os.environ.get('MIRROR'):\n"
+        "    import mirror\n"
+        "def load():\n"
+        "    import history\n"
+        "mode = st.selectbox('Choose:', ['A', 'B', 'C'])\n"
+        "tracing.record('app.first_paint', 0.0)\n"
+        "import pandas as pd\n"
+        "PICKS = ['A', 'B']\n"
+        "if mode in PICKS:\n"
+        "    import identity\n"
+        "if mode == 'A':\n"
+        "    from scoring import EVENTS\n"
+        "elif mode == 'B':\n"
+        "    def build():\n"
+        "        return load()\n"
+        "    build()\n"
+    )
+    before, after, per_mode = startup.script_imports(str(script))
+    assert (before, after) == (["tracing"], ["pandas"])
+    assert per_mode == {"A": ["identity", "scoring"], "B": ["identity", "history"], "C": []}
@@ -0,0 +1,56 @@
+import csv
+
+import pandas as pd
+import pytest
+
+import cli
+import scoring
+from benchmarks.synthetic import make_league
+from fake_sheets import FileWorksheet
+from seasons import SEASONS
+
+KEY = "offline-key"
+
+
+@pytest.fixture
+def offline(tmp_path):
+    league = make_league(competitors=5, seasons=2, seed=6)
+    directory = tmp_path / "sheets" / KEY
+    directory.mkdir(parents=True)
+    for name in league.competitors:
+        with open(directory / f"{name}.csv", "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(league.sheet_values(name, with_totals=False))
+    return league, tmp_path / "sheets"
+
+
+def _expected(league, name):
+    """``scoring.compute_totals`` over the active season's rows of ``name``'s worksheet."""
+    header, *rows = league.sheet_values(name, with_totals=False)
+    df = pd.DataFrame(rows, columns=header)
+    df["Date"] = pd.to_datetime(df["Date"])
+    df = df[(SEASONS.labels(df["Date"]) == SEASONS.active().name).to_numpy()]
+    return scoring.compute_totals(df.astype({e: float for e in scoring.EVENTS}), scoring.EVENTS)
+
+
+def test_totals_command_matches_scoring(offline, tmp_path):
+    league, root = offline
+    out = tmp_path / "totals.csv"
+    assert cli.main(["totals", "--spreadsheet", KEY, "--offline", str(root), "--out", str(out)]) == 0
+
+    totals = pd.read_csv(out).set_index("Name")
+    assert sorted(totals.index) == sorted(league.competitors)
+    for name in league.competitors:
+        assert totals.loc[name, scoring.EVENTS].astype(float).tolist() == _expected(league, name)
+    assert totals.to_numpy().sum() > 0
+
+
+def test_totals_write_adds_the_totals_row(offline, tmp_path):
+    league, root = offline
+    name = league.competitors[0]
+    assert cli.main(["totals", "--spreadsheet", KEY, "--offline", str(root), "--write",
+                     "--out", str(tmp_path / "totals.csv")]) == 0
+
+    values = FileWorksheet(str(root / KEY / f"{name}.csv")).get_all_values()
+    header, totals = values[0], values[-1]
+    assert totals[0] == scoring.TOTALS_LABEL
+    assert [float(totals[header.index(e)]) for e in scoring.EVENTS] == _expected(league, name)
@@ -0,0 +1,126 @@
+import os
+
+import pytest
+
+from data_sources import CsvSourceCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """Serves ``body`` with an ETag; ``fail`` makes every request raise."""
+
+    def __init__(self, body):
+        self.body = body
+        self.fail = False
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(dict(headers or {}))
+        if self.fail:
+            raise ConnectionError("offline")
+        etag = str(hash(self.body))
+        if (headers or {}).get("If-None-Match") == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, self.body, {"ETag": etag})
+
+
+URL = "https://example.test/sheet.csv"
+
+
+def test_local_file_served_from_cache_within_ttl(tmp_path):
+    path = tmp_path / "results.csv"
+    path.write_text("Name,Forms\nAda,5\n")
+    cache = CsvSourceCache(ttl=60, snapshot_dir=None)
+
+    first = cache.read_csv(str(path))
+    second = cache.read_csv(str(path))
+
+    assert first.equals(second)
+    assert cache.stats()["parses"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_local_file_reparsed_only_when_changed(tmp_path):
+    path = tmp_path / "results.csv"
+    path.write_text("Name,Forms\nAda,5\n")
+    cache = CsvSourceCache(ttl=0, snapshot_dir=None)
+
+    cache.read_csv(str(path))
+    cache.read_csv(str(path))
+    assert cache.stats()["parses"] == 1
+    assert cache.stats()["revalidated"] == 1
+
+    path.write_text("Name,Forms\nAda,8\n")
+    os.utime(path, (1, 1))
+    assert cache.read_csv(str(path))["Forms"].tolist() == [8]
+    assert cache.stats()["parses"] == 2
+
+
+def test_returned_frames_are_copies(tmp_path):
+    path = tmp_path / "results.csv"
+    path.write_text("Name,Forms\nAda,5\n")
+    cache = CsvSourceCache(ttl=60, snapshot_dir=None)
+
+    frame = cache.read_csv(str(path))
+    frame.loc[0, "Forms"] = 99
+    assert cache.read_csv(str(path))["Forms"].tolist() == [5]
+
+
+def test_http_revalidates_with_etag():
+    session = FakeSession(b"Name,Forms\nAda,5\n")
+    cache = CsvSourceCache(ttl=0, snapshot_dir=None, session=session)
+
+    cache.read_csv(URL)
+    cache.read_csv(URL)
+
+    assert "If-None-Match" in session.requests[-1]
+    assert cache.stats()["parses"] == 1
+    assert cache.stats()["revalidated"] == 1
+
+
+def test_stale_frame_served_when_fetch_fails():
+    session = FakeSession(b"Name,Forms\nAda,5\n")
+    cache = CsvSourceCache(ttl=0, snapshot_dir=None, session=session)
+    cache.read_csv(URL)
+
+    session.fail = True
+    assert cache.read_csv(URL)["Forms"].tolist() == [5]
+    assert cache.stats()["stale_served"] == 1
+
+
+def test_snapshot_served_when_cold_cache_cannot_fetch(tmp_path):
+    session = FakeSession(b"Name,Forms\nAda,5\n")
+    CsvSourceCache(snapshot_dir=str(tmp_path), session=session).read_csv(URL)
+
+    session.fail = True
+    cold = CsvSourceCache(snapshot_dir=str(tmp_path), session=session)
+    assert cold.read_csv(URL)["Name"].tolist() == ["Ada"]
+    assert cold.stats()["snapshot_fallbacks"] == 1
+
+
+def test_fetch_failure_without_snapshot_raises(tmp_path):
+    session = FakeSession(b"")
+    session.fail = True
+    with pytest.raises(ConnectionError):
+        CsvSourceCache(snapshot_dir=str(tmp_path), session=session).read_csv(URL)
+
+
+def test_read_many_reports_failures_per_url(tmp_path):
+    good = tmp_path / "good.csv"
+    good.write_text("Name\nAda\n")
+    cache = CsvSourceCache(snapshot_dir=None)
+
+    frames, errors = cache.read_many([str(good), str(tmp_path / "missing.csv")])
+
+    assert list(frames) == [str(good)]
+    assert list(errors) == [str(tmp_path / "missing.csv")]
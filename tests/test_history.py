@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import history
+import seasons
+from benchmarks import legacy, run
+from benchmarks.synthetic import make_league
+from identity import IdentityIndex
+from scoring import EVENT_COLS
+
+CATEGORICAL = ["Name", "Type", "Tournament", "TypeNorm"]
+
+
+@pytest.fixture(scope="module")
+def frames():
+    frames = run._division_csvs(make_league(12, seasons=2, seed=8))
+    # the same competitor listed in a second division, with stray whitespace
+    repeated = frames[0].head(4).copy()
+    repeated["Name"] = " " + repeated["Name"] + "  "
+    return frames + [repeated]
+
+
+@pytest.fixture(scope="module")
+def identities():
+    return IdentityIndex()
+
+
+@pytest.fixture(scope="module")
+def compact(frames, identities):
+    return history.division_rows(frames, identities=identities)
+
+
+def _dtypes(df):
+    return {col: str(df[col].dtype) for col in CATEGORICAL + ["Date"] + EVENT_COLS}
+
+
+def test_division_rows_match_the_concatenated_frame(frames, compact):
+    old = legacy.division_rows([f.assign(Name=f["Name"].str.strip()) for f in frames])
+    keys = ["Name", "Date", "Tournament"]
+    old = old.sort_values(keys).reset_index(drop=True)
+    new = compact.astype({c: object for c in CATEGORICAL}).sort_values(keys).reset_index(drop=True)
+
+    assert len(new) == len(old) == sum(len(f) for f in frames[:-1])
+    for col in ["Name", "Type", "Tournament", "TypeNorm"]:
+        assert new[col].tolist() == old[col].tolist(), col
+    assert (new["Date"].to_numpy() == old["Date"].to_numpy()).all()
+    assert np.array_equal(new[EVENT_COLS].to_numpy(dtype=float), old[EVENT_COLS].to_numpy(dtype=float))
+
+
+def test_categorical_dtypes_survive_partitioning(compact, identities):
+    dtypes = _dtypes(compact)
+    assert all(dtypes[c] == "category" for c in CATEGORICAL)
+    assert all(dtypes[e] == "int16" for e in EVENT_COLS)
+
+    rows = history.SeasonHistory(compact, identities=identities)
+    name = compact["Name"].iloc[0]
+    for part in (rows.rows, rows.season(rows.seasons()[0]), rows.as_of(compact["Date"].max()), rows.competitor(name)):
+        assert _dtypes(part) == dtypes
+        assert isinstance(part["Season"].dtype, pd.CategoricalDtype)
+
+
+def test_season_slices_match_season_of(compact, identities):
+    rows = history.SeasonHistory(compact, identities=identities)
+    expected = compact["Date"].map(lambda d: seasons.SEASONS.season_of(d).name)
+    assert rows.seasons() == sorted(expected.unique(), key=lambda s: seasons.SEASONS.get(s).start)
+
+    for name in rows.seasons():
+        part = rows.season(name)
+        assert len(part) == (expected == name).sum()
+        assert part["Date"].map(lambda d: seasons.SEASONS.season_of(d).name).eq(name).all()
+        assert part["Date"].is_monotonic_increasing
+
+    date = compact["Date"].sort_values().iloc[len(compact) // 2]
+    season = seasons.SEASONS.season_of(date).name
+    as_of = rows.as_of(date)
+    assert len(as_of) == ((expected == season) & (compact["Date"] <= date)).sum()
+
+    competitor = compact["Name"].iloc[0]
+    for name in rows.seasons():
+        part = rows.competitor(competitor, season=name)
+        assert len(part) == ((compact["Name"] == competitor) & (expected == name)).sum()
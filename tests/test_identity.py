@@ -0,0 +1,22 @@
+import pytest
+
+from identity import IdentityIndex
+
+
+def test_titles_by_id_keeps_the_display_name_title():
+    index = IdentityIndex()
+    titles = ["Jane Doe", "jane  doe", "Sam Roe"]
+    by_id = index.titles_by_id(titles)
+    jane = index.id_of("JANE DOE")
+    assert by_id == {jane: "Jane Doe", index.id_of("sam roe"): "Sam Roe"}
+    assert index.name(jane) == by_id[jane]
+
+
+@pytest.mark.parametrize("titles", [["J. Doe", "Jane Doe"], ["Jane Doe", "J. Doe"]])
+def test_alias_titles_lose_to_the_canonical_title(titles):
+    index = IdentityIndex()
+    index.merge("J. Doe", "jane doe")
+    by_id = index.titles_by_id(titles)
+    jane = index.id_of("J. Doe")
+    assert by_id == {jane: "Jane Doe"} and index.name(jane) == "Jane Doe"
+    assert index.canonical(["j. doe", "JANE DOE"]).tolist() == ["Jane Doe", "Jane Doe"]
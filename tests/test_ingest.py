@@ -0,0 +1,64 @@
+import pandas as pd
+
+import ingest
+from benchmarks.synthetic import SPREADSHEET_KEY, make_league
+from identity import IdentityIndex
+from scoring import HEADERS
+from sheets_client import SheetPool
+from write_queue import WriteBehindQueue
+
+
+def _setup(tmp_path):
+    league = make_league(competitors=3, seed=5)
+    client = league.client()
+    pool = SheetPool(lambda: client)
+    identities = IdentityIndex(str(tmp_path / "identities.json"))
+    return league, client, pool, identities
+
+
+def _entries(names, tournament="Bulk Open"):
+    return pd.DataFrame(
+        [[name, "01/04/2030", "Class AA", tournament] + [5] * (len(HEADERS) - 3) for name in names],
+        columns=["Name"] + HEADERS,
+    )
+
+
+def test_ingest_writes_through_the_shared_queue(tmp_path):
+    league, client, pool, identities = _setup(tmp_path)
+    flushed = []
+    queue = WriteBehindQueue(str(tmp_path / "journal.db"), lambda title: pool.worksheet(SPREADSHEET_KEY, title),
+                             on_flush=lambda title, values: flushed.append(title), base_delay=0)
+    names = league.competitors[:2] + ["Newcomer"]
+    entries = _entries(names)
+
+    preview = ingest.ingest(pool, SPREADSHEET_KEY, entries, write=False, queue=queue, identities=identities)
+    assert preview["Status"].tolist() == [ingest.NEW] * 3
+
+    report = ingest.ingest(pool, SPREADSHEET_KEY, entries, queue=queue, identities=identities)
+    assert report["Status"].tolist() == [ingest.ADDED, ingest.ADDED, ingest.CREATED]
+    assert report["Rows"].tolist() == [1, 1, 1] and sorted(flushed) == sorted(names)
+    assert queue.depth() == 0
+
+    again = ingest.ingest(pool, SPREADSHEET_KEY, entries, queue=queue, identities=identities)
+    assert again["Status"].tolist() == [ingest.DUPLICATE] * 3
+    ws = pool.worksheet(SPREADSHEET_KEY, names[0])
+    assert sum(row[2] == "Bulk Open" for row in ws.get_all_values()) == 1
+
+
+def test_rows_already_queued_count_as_existing_in_a_dry_run(tmp_path):
+    league, client, pool, identities = _setup(tmp_path)
+    queue = WriteBehindQueue(str(tmp_path / "journal.db"), lambda title: pool.worksheet(SPREADSHEET_KEY, title))
+    name = league.competitors[0]
+    queue.enqueue_append(name, _entries([name]).iloc[0, 1:].tolist())
+
+    preview = ingest.ingest(pool, SPREADSHEET_KEY, _entries([name]), write=False, queue=queue, identities=identities)
+    assert preview["Status"].tolist() == [ingest.DUPLICATE]
+
+
+def test_rate_limited_sheets_are_retried_by_the_private_queue(tmp_path):
+    league, client, pool, identities = _setup(tmp_path)
+    name = league.competitors[1]
+    pool.worksheet(SPREADSHEET_KEY, name).fail_next(429)
+
+    report = ingest.ingest(pool, SPREADSHEET_KEY, _entries(league.competitors), identities=identities)
+    assert report["Status"].tolist() == [ingest.ADDED] * 3
@@ -0,0 +1,78 @@
+import pandas as pd
+
+import sheet_writer
+from fake_sheets import FakeClient, FakeWorksheet
+from mirror import SheetMirror, worksheet_source
+from sheets_client import SheetPool
+
+KEY = "key"
+
+
+def _setup(tmp_path):
+    client = FakeClient()
+    sh = client.add_spreadsheet(KEY, [
+        FakeWorksheet("Jo", [["Date", "Type"], ["06/07/2025", "Class A"]]),
+        FakeWorksheet("Sam", [["Date", "Type"], ["06/08/2025", "Class B"]]),
+    ])
+    return client, sh, SheetPool(lambda: client), SheetMirror(str(tmp_path / "mirror.db"))
+
+
+def test_sync_titles_reads_only_new_tabs(tmp_path):
+    client, sh, pool, mirror = _setup(tmp_path)
+    mirror.sync_spreadsheet(pool, KEY)
+    sh.add_worksheet("Lee").append_row(["Date", "Type"])
+    sh.del_worksheet(sh.worksheet("Sam"))
+    client.reset_calls()
+
+    pool.invalidate(KEY)
+    assert mirror.sync_titles(pool, KEY) == {"added": 1, "removed": 1}
+    assert mirror.worksheet_titles(KEY) == ["Jo", "Lee"]
+    assert client.calls["get_all_values"] == 1
+
+
+def test_store_rewrites_only_changed_rows(tmp_path):
+    mirror = SheetMirror(str(tmp_path / "mirror.db"))
+    values = [["Date", "Type", "Score"], ["06/07/2025", "Class A", "5"], ["06/08/2025", "Class B", "3"]]
+    assert mirror.store_worksheet(KEY, "Jo", values) == 2
+    assert mirror.store_worksheet(KEY, "Jo", values) == 0
+
+    values[2][2] = "4"
+    assert mirror.store_worksheet(KEY, "Jo", values) == 1
+    assert mirror.values(worksheet_source(KEY, "Jo")) == values
+    assert mirror.worksheet_records(KEY, "Jo")[1] == {"Date": "06/08/2025", "Type": "Class B", "Score": 4}
+
+    assert mirror.store_worksheet(KEY, "Jo", values[:2]) == 0
+    assert mirror.values(worksheet_source(KEY, "Jo")) == values[:2]
+
+    frame = pd.DataFrame({"Name": ["Jo Doe"], "Date": ["2025-06-07"], "Tournament": ["Open"]})
+    mirror.store_frame("division.csv", frame)
+    assert mirror.frame("division.csv").equals(frame)
+    assert mirror.competitor_rows("Jo Doe")["Tournament"].tolist() == ["Open"]
+
+
+def test_unchanged_spreadsheet_is_skipped(tmp_path):
+    client, sh, pool, mirror = _setup(tmp_path)
+    first = mirror.sync_spreadsheet(pool, KEY)
+    assert first == {"skipped": False, "worksheets": 2, "rows_written": 2}
+
+    client.reset_calls()
+    assert mirror.sync_spreadsheet(pool, KEY)["skipped"] is True
+    assert client.calls["get_all_values"] == 0
+
+    jo = sh.worksheet("Jo")
+    sheet_writer.commit(jo, jo.get_all_values(), [["Date", "Type"], ["06/07/2025", "Class AA"]])
+    client.reset_calls()
+    report = mirror.sync_spreadsheet(pool, KEY)
+    assert report == {"skipped": False, "worksheets": 2, "rows_written": 1}
+    assert mirror.worksheet_records(KEY, "Jo") == [{"Date": "06/07/2025", "Type": "Class AA"}]
+
+
+def test_resync_pulls_mirrored_sources_and_full_ignores_the_change_check(tmp_path):
+    client, sh, pool, mirror = _setup(tmp_path)
+    mirror.sync_spreadsheet(pool, KEY)
+
+    assert mirror.resync(pool)[KEY]["skipped"] is True
+    client.reset_calls()
+    report = mirror.resync(pool, full=True)
+    assert report[KEY] == {"skipped": False, "worksheets": 2, "rows_written": 0}
+    assert client.calls["get_all_values"] == 2
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from benchmarks import legacy
+from projection import project_division
+from season_calendar import SeasonCalendar
+from scoring import norm_types
+
+EVENT = "Forms"
+
+# Two bridged weekends: AA Friday and AA Sunday around a B (then A) Saturday,
+# and an AA Friday - Sunday run
+TOURNAMENTS = pd.DataFrame({
+    "Tournament Name": ["AA Fri", "B Sat", "AA Sun", "AA Fri 2", "A Sat 2", "AA Sun 2", "B Sat 3",
+                        "AA Fri 4", "AA Sat 4", "AA Sun 4"],
+    "Date": pd.to_datetime(["2025-09-05", "2025-09-06", "2025-09-07",
+                            "2025-10-03", "2025-10-04", "2025-10-05", "2025-10-18",
+                            "2025-08-08", "2025-08-09", "2025-08-10"]),
+    "Type": ["Class AA", "Class B", "Class AA", "Class AA", "Class A", "Class AA", "Class B",
+             "Class AA", "Class AA", "Class AA"],
+})
+AFTER, UNTIL = pd.Timestamp("2025-09-30"), pd.Timestamp("2025-11-30")
+
+
+def _division(rows):
+    df = pd.DataFrame(rows, columns=["Name", "Date", "Type", EVENT])
+    df["Date"] = pd.to_datetime(df["Date"])
+    df["TypeNorm"] = norm_types(df["Type"]).astype(object)
+    return df
+
+
+def _legacy(df, name):
+    future = TOURNAMENTS.assign(TypeNorm=norm_types(TOURNAMENTS["Type"]).astype(object))
+    future = future[(future["Date"] > AFTER) & (future["Date"] <= UNTIL)]
+    return legacy.calc_event(df[df["Name"] == name].copy(), EVENT, future)
+
+
+@pytest.mark.parametrize("rows", [
+    [("Jo", "2025-09-05", "Class AA", 15), ("Jo", "2025-09-06", "Class B", 5), ("Jo", "2025-09-07", "Class AA", 10)],
+    [("Jo", "2025-09-05", "Class AA", 15), ("Jo", "2025-09-07", "Class AA", 10)],
+    [("Jo", "2025-09-06", "Class B", 3), ("Jo", "2025-09-07", "Class AA", 6)],
+    # AA all three days, Saturday skipped: Friday and Sunday are two weekends
+    [("Jo", "2025-08-08", "Class AA", 15), ("Jo", "2025-08-10", "Class AA", 10)],
+    [("Jo", "2025-08-08", "Class AA", 15), ("Jo", "2025-08-09", "Class AA", 5), ("Jo", "2025-08-10", "Class AA", 10)],
+])
+def test_bridged_weekend_matches_legacy(rows):
+    df = _division(rows)
+    result = project_division(df, SeasonCalendar(TOURNAMENTS), AFTER, UNTIL, [EVENT]).iloc[0]
+    assert (result["Current Points"], result["Projected Max"]) == pytest.approx(_legacy(df, "Jo"))
+
+
+def test_bridged_aa_days_are_separate_aa_weekends():
+    calendar = SeasonCalendar(TOURNAMENTS)
+    dates = pd.Series(pd.to_datetime(["2025-09-05", "2025-09-07"]))
+    assert calendar.weekend_ids(dates).nunique() == 1
+    assert calendar.weekend_ids(dates, "AA").nunique() == 2
+    assert calendar.future_values(AFTER, UNTIL) == {"AA": [15, 15], "AB": [8, 5]}
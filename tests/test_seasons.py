@@ -0,0 +1,38 @@
+import json
+
+import pandas as pd
+
+import seasons
+
+# The ATA_SEASONS_FILE example from the seasons module docstring
+EXAMPLE = {"2025-26": {"start": "2025-06-01", "end": "2026-05-31"}}
+
+
+def _load(tmp_path, config, active=None):
+    path = tmp_path / "seasons.json"
+    path.write_text(json.dumps(config))
+    return seasons.load_seasons(str(path), active)
+
+
+def test_docstring_example_shadows_the_default_season(tmp_path):
+    table = _load(tmp_path, EXAMPLE)
+    labels = table.labels(pd.to_datetime(["2024-09-01", "2025-06-01", "2026-05-31", "2026-06-01", None]))
+    assert labels.tolist()[:4] == ["2024-25", "2025-26", "2025-26", "2026-27"]
+    assert pd.isna(labels.iloc[4])
+    assert list(labels.cat.categories) == ["2024-25", "2025-26", "2026-27"]
+    assert table.active("2025-12-01") == table.get("2025-26")
+
+
+def test_shorter_configured_season_splits_its_defaults(tmp_path):
+    table = _load(tmp_path, {
+        "2025-26": {"start": "2025-08-01", "end": "2026-04-30"},
+        "Summer 2026": {"start": "2026-05-15", "end": "2026-08-31"},
+    })
+    dates = pd.to_datetime(["2025-07-01", "2025-08-01", "2026-05-01", "2026-05-20", "2026-09-01"])
+    labels = table.labels(dates)
+    assert pd.isna(labels.iloc[0]) and pd.isna(labels.iloc[2])
+    assert labels.iloc[[1, 3, 4]].tolist() == ["2025-26", "Summer 2026", "2026-27"]
+    assert list(labels.cat.categories) == ["2025-26", "Summer 2026", "2026-27"]
+
+    assert table.active("2025-07-01").name == "2025-26"
+    assert table.active("2026-05-01").name == "Summer 2026"
@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import sheet_writer
+from benchmarks import legacy
+from benchmarks.synthetic import entry_row, make_league
+from fake_sheets import FakeWorksheet
+from scoring import EVENTS
+from totals_engine import TotalsEngine
+
+WRITES = ("batch_update", "update", "append_row", "append_rows", "clear", "delete_rows")
+
+
+@pytest.fixture(scope="module")
+def league():
+    return make_league(competitors=8, seed=3)
+
+
+def _sheet(league, name, with_totals=True):
+    values = league.sheet_values(name, with_totals)
+    return FakeWorksheet(name, values, rows=len(values) + 10)
+
+
+def _writes(ws):
+    return {name: ws.calls[name] for name in WRITES if ws.calls[name]}
+
+
+def _totals(values):
+    row = next(r for r in values if r and r[0] == sheet_writer.TOTALS_LABEL)
+    return [float(v) for v in row[3:3 + len(EVENTS)]]
+
+
+def test_save_result_reads_once_and_writes_one_batch(league):
+    name = league.competitors[0]
+    ws = _sheet(league, name)
+    row = entry_row(league, np.random.default_rng(1))
+    sheet_writer.save_result(ws, row)
+    assert ws.calls["get_all_values"] == 1
+    assert _writes(ws) == {"batch_update": 1}
+
+    reference = _sheet(league, name)
+    legacy.save_result(reference, row, EVENTS)
+    assert _totals(ws.get_all_values()) == _totals(reference.get_all_values())
+
+
+def test_update_totals_on_current_sheet_writes_nothing(league):
+    ws = _sheet(league, league.competitors[1])
+    sheet_writer.update_totals(ws)
+    assert ws.calls["get_all_values"] == 1
+    assert _writes(ws) == {}
+
+
+def test_update_totals_without_totals_row_matches_legacy(league):
+    name = league.competitors[2]
+    ws = _sheet(league, name, with_totals=False)
+    sheet_writer.update_totals(ws)
+    assert _writes(ws) == {"batch_update": 1}
+
+    reference = _sheet(league, name, with_totals=False)
+    assert _totals(ws.get_all_values()) == legacy.update_totals(reference, EVENTS)
+
+
+def test_commit_grows_grid_before_the_single_batch():
+    old = [["Date", "Type"], ["06/07/2025", "Class A"]]
+    new = old + [[f"06/{d:02d}/2025", "Class B", "extra"] for d in range(8, 14)]
+    ws = FakeWorksheet("grow", old, rows=2, cols=2)
+    touched = sheet_writer.commit(ws, old, new)
+    assert touched >= len(new) - len(old)
+    assert ws.calls["add_rows"] == 1 and ws.calls["add_cols"] == 1
+    assert _writes(ws) == {"batch_update": 1}
+    assert [[c for c in r if c] for r in ws.get_all_values()] == new
+
+
+def test_commit_without_changes_makes_no_calls():
+    values = [["Date", "Type"], ["06/07/2025", "Class A"]]
+    ws = FakeWorksheet("same", values)
+    assert sheet_writer.commit(ws, values, [list(r) for r in values]) == 0
+    assert ws.api_calls == 0
+
+
+@pytest.mark.parametrize("cell, value", [("12", 12), ("7.5", 7.5), ("", ""), ("Class A", "Class A"), (3, 3)])
+def test_numericise_matches_get_all_records(cell, value):
+    assert sheet_writer.numericise(cell) == value
+    ws = FakeWorksheet("n", [["Cell"], [cell]])
+    assert ws.get_all_records() == [{"Cell": value}]
+
+
+# ======================
+# EDIT PATCHES
+# ======================
+def _loaded(ws):
+    """The frame Edit mode shows for ``ws``."""
+    df = pd.DataFrame(ws.get_all_records())
+    return df[df["Date"] != sheet_writer.TOTALS_LABEL]
+
+
+def _edited(df, *cells):
+    out = df.copy()
+    for row, col, value in cells:
+        out.loc[out.index[row], col] = value
+    return out
+
+
+def _committed(ws, patch, engine=None):
+    old = sheet_writer.read_values(ws)
+    values, merged = sheet_writer.apply_patch(old, patch)
+    engine = engine or TotalsEngine()
+    sheet_writer.commit(ws, old, sheet_writer.patched_sheet(values, engine, ws.title))
+    return merged
+
+
+def test_frame_patch_lists_only_the_changed_cells(league):
+    ws = _sheet(league, league.competitors[3])
+    df = _loaded(ws)
+    assert sheet_writer.frame_patch(df, df.copy()) == {}
+
+    patch = sheet_writer.frame_patch(df, _edited(df, (1, EVENTS[0], 9)))
+    row = df.iloc[1]
+    assert patch["changes"] == [[[row["Date"], row["Tournament Name"], 1], {EVENTS[0]: [str(row[EVENTS[0]]), "9"]}]]
+    assert patch["deleted"] == [] and patch["added"] == []
+
+
+def test_edits_to_different_cells_merge(league):
+    ws = _sheet(league, league.competitors[3])
+    df = _loaded(ws)
+    first = sheet_writer.frame_patch(df, _edited(df, (0, EVENTS[0], 11)))
+    second = sheet_writer.frame_patch(df, _edited(df, (1, EVENTS[1], 12)))
+
+    assert _committed(ws, first) is False
+    assert _committed(ws, second) is True
+    now = _loaded(ws)
+    assert now.iloc[0][EVENTS[0]] == 11 and now.iloc[1][EVENTS[1]] == 12
+
+
+def test_same_cell_changed_on_the_sheet_is_a_conflict(league):
+    ws = _sheet(league, league.competitors[3])
+    df = _loaded(ws)
+    _committed(ws, sheet_writer.frame_patch(df, _edited(df, (0, EVENTS[0], 11))))
+    before = ws.get_all_values()
+
+    with pytest.raises(sheet_writer.EditConflict) as err:
+        _committed(ws, sheet_writer.frame_patch(df, _edited(df, (0, EVENTS[0], 13), (1, EVENTS[1], 12))))
+    assert len(err.value.conflicts) == 1 and EVENTS[0] in err.value.conflicts[0]
+    assert ws.get_all_values() == before
+
+    # the same value typed twice is not a conflict
+    assert _committed(ws, sheet_writer.frame_patch(df, _edited(df, (0, EVENTS[0], 11)))) is True
+
+
+def test_added_and_deleted_rows(league):
+    ws = _sheet(league, league.competitors[4])
+    df = _loaded(ws)
+    new_row = {"Date": "2030-01-05", "Type": "Class A", "Tournament Name": "Added Open", **{e: 4 for e in EVENTS}}
+    after = pd.concat([df.drop(index=df.index[0]), pd.DataFrame([new_row], index=[100])])
+    patch = sheet_writer.frame_patch(df, after)
+    assert len(patch["deleted"]) == 1 and len(patch["added"]) == 1
+
+    _committed(ws, patch)
+    now = _loaded(ws)
+    assert df.iloc[0]["Tournament Name"] not in now["Tournament Name"].tolist()
+    added = now[now["Tournament Name"] == "Added Open"].iloc[0]
+    assert added["Date"] == "01/05/2030" and added[EVENTS[0]] == 4
+
+
+def test_deleting_a_row_changed_on_the_sheet_is_a_conflict(league):
+    ws = _sheet(league, league.competitors[4])
+    df = _loaded(ws)
+    _committed(ws, sheet_writer.frame_patch(df, _edited(df, (2, EVENTS[2], 20))))
+    with pytest.raises(sheet_writer.EditConflict):
+        _committed(ws, sheet_writer.frame_patch(df, df.drop(index=df.index[2])))
+
+
+def test_patched_totals_match_legacy(league):
+    name = league.competitors[5]
+    ws = _sheet(league, name)
+    engine = TotalsEngine.build({name: ws.get_all_records()})
+    edits = [lambda df: _edited(df, (0, EVENTS[0], 25), (3, EVENTS[4], 0)),
+             lambda df: df.drop(index=df.index[1])]
+    for edit in edits:
+        df = _loaded(ws)
+        _committed(ws, sheet_writer.frame_patch(df, edit(df)), engine)
+        reference = FakeWorksheet("ref", ws.get_all_values(), rows=ws.row_count + 10)
+        assert _totals(ws.get_all_values()) == legacy.update_totals(reference, EVENTS)
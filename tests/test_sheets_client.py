@@ -0,0 +1,60 @@
+import pytest
+
+from fake_sheets import FakeAPIError, FakeClient, FakeWorksheet
+from sheets_client import SheetPool
+
+
+def _pool():
+    client = FakeClient()
+    client.add_spreadsheet("key", [FakeWorksheet("Jo", [["Date"]])])
+    return SheetPool(lambda: client)
+
+
+def test_missing_worksheet_is_none():
+    assert _pool().worksheet("key", "Nobody") is None
+
+
+def test_worksheet_handles_are_cached():
+    pool = _pool()
+    assert pool.worksheet("key", "Jo") is pool.worksheet("key", "Jo")
+    assert pool.worksheet_titles("key") == ["Jo"]
+
+
+def test_other_errors_propagate():
+    pool = _pool()
+    sh = pool.spreadsheet("key")
+
+    def fail(title):
+        raise FakeAPIError(500)
+    sh.worksheet = fail
+    with pytest.raises(FakeAPIError):
+        pool.worksheet("key", "Jo")
+
+
+def test_add_worksheet_refreshes_the_titles():
+    pool = _pool()
+    assert pool.worksheet_titles("key") == ["Jo"]
+    pool.add_worksheet("key", "Sam")
+    assert pool.worksheet_titles("key") == ["Jo", "Sam"]
+
+    pool.invalidate("key")
+    assert pool.worksheet("key", "Sam").title == "Sam"
+
+
+def test_tab_added_outside_the_pool_is_found():
+    now = [0.0]
+    client = FakeClient()
+    sh = client.add_spreadsheet("key", [FakeWorksheet("Jo", [["Date"]])])
+    pool = SheetPool(lambda: client, titles_ttl=60, clock=lambda: now[0])
+    assert pool.worksheet_titles("key") == ["Jo"]
+
+    sh.add_worksheet("Sam")
+    assert pool.worksheet("key", "Sam").title == "Sam"
+    assert pool.worksheet("key", "Nobody") is None
+    with pytest.raises(FakeAPIError):
+        pool.add_worksheet("key", "Sam")
+
+    sh.add_worksheet("Lee")
+    assert pool.worksheet_titles("key") == ["Jo", "Sam"]
+    now[0] = 61.0
+    assert pool.worksheet_titles("key") == ["Jo", "Sam", "Lee"]
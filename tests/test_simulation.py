@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import simulation
+from benchmarks.run import _active_rows, _season_window
+from benchmarks.synthetic import make_league
+from season_calendar import SeasonCalendar
+
+
+@pytest.fixture(scope="module")
+def division():
+    league = make_league(competitors=12, seasons=2, seed=6)
+    today, season_end = _season_window(league)
+    return _active_rows(league), SeasonCalendar(league.tournaments), today, season_end
+
+
+def _simulate(division, **kwargs):
+    df, calendar, today, season_end = division
+    return simulation.simulate_division(df, calendar, today, season_end, n_sims=3_000, **kwargs)
+
+
+def test_same_seed_gives_the_same_result(division):
+    first, second = _simulate(division, seed=5), _simulate(division, seed=5)
+    for key in first:
+        pd.testing.assert_frame_equal(first[key], second[key])
+    assert not _simulate(division, seed=6)["ranks"].equals(first["ranks"])
+
+
+def test_rank_probabilities_and_bounds(division):
+    result = _simulate(division, seed=1, chunk=700)
+    assert np.allclose(result["ranks"].sum(axis=1), 1.0)
+    summary = result["summary"]
+    assert (summary["P10"] <= summary["Median"]).all() and (summary["Median"] <= summary["P90"]).all()
+    assert (summary["Current"] <= summary["Expected"] + 1e-9).all()
+    assert (summary["P90"] <= summary["Projected Max"]).all()
+
+
+def test_histogram_percentiles_match_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 40, (3, 501))
+    histogram = np.stack([np.bincount(v, minlength=40) for v in values])
+    got = simulation._histogram_percentiles(histogram, [10, 50, 90])
+    assert np.allclose(got, np.percentile(values, [10, 50, 90], axis=1))
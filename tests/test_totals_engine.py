@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from benchmarks import legacy
+from benchmarks.synthetic import entry_row, make_league
+from fake_sheets import FakeWorksheet
+from scoring import EVENTS
+from totals_engine import TotalsEngine, make_row_key
+
+
+def _records(values):
+    header = values[0]
+    return [dict(zip(header, row)) for row in values[1:]]
+
+
+def _legacy_totals(values):
+    return legacy.update_totals(FakeWorksheet("ref", values, rows=len(values) + 10), EVENTS)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_build_matches_legacy_update_totals(seed):
+    league = make_league(competitors=15, attendance=0.3, seed=seed)
+    engine = TotalsEngine.build({name: _records(v) for name, v in league.worksheets.items()})
+    for name, values in league.worksheets.items():
+        assert engine.totals(name) == pytest.approx(_legacy_totals(values))
+
+
+def test_incremental_rows_match_a_rebuild():
+    league = make_league(competitors=4, attendance=0.4, seed=7)
+    rng = np.random.default_rng(7)
+    name = league.competitors[0]
+    values = [list(r) for r in league.worksheets[name]]
+    engine = TotalsEngine.build({name: _records(values)})
+
+    for tourney_type in ("Class AAA", "Class AA", "Class A", "Class C"):
+        row = entry_row(league, rng, tourney_type)
+        values.append(row)
+        engine.add_row(name, make_row_key(row[0], row[2]) + (2,), row[1], row[3:])
+    assert engine.totals(name) == pytest.approx(_legacy_totals(values))
+
+    removed = values.pop(1)
+    engine.remove_row(name, make_row_key(removed[0], removed[2]) + (1,))
+    assert engine.totals(name) == pytest.approx(_legacy_totals(values))
+
+
+def test_apply_records_matches_legacy_after_edits():
+    league = make_league(competitors=3, attendance=0.5, seed=11)
+    name = league.competitors[1]
+    values = [list(r) for r in league.worksheets[name]]
+    engine = TotalsEngine.build({name: _records(values)})
+
+    values[1][3] = 0
+    values[2][4] = 99
+    del values[3]
+    engine.apply_records(name, _records(values))
+    assert engine.totals(name) == pytest.approx(_legacy_totals(values))
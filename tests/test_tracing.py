@@ -0,0 +1,79 @@
+import contextvars
+import json
+
+import pytest
+
+import tracing
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    monkeypatch.setattr(tracing, "_enabled", True)
+    monkeypatch.setattr(tracing, "PROCESS", tracing.Recorder())
+    return tracing.PROCESS
+
+
+def test_nested_spans_are_recorded_in_process_and_session(recorder):
+    session = tracing.Recorder()
+
+    def rerun():
+        tracing.bind_session(session)
+
+        @tracing.traced("outer")
+        def outer():
+            with tracing.span("inner"):
+                pass
+            with pytest.raises(KeyError), tracing.span("inner"):
+                raise KeyError("x")
+        outer()
+    contextvars.copy_context().run(rerun)
+
+    spans = recorder.histograms()
+    assert {name: h["count"] for name, h in spans.items()} == {"inner": 2, "outer": 1}
+    assert spans["inner"]["errors"] == 1 and spans["outer"]["errors"] == 0
+    assert spans["outer"]["sum"] >= spans["inner"]["sum"]
+    assert [name for name, _ in session.run] == ["inner", "inner", "outer"]
+    assert session.histograms() == spans
+
+    session.begin_run()
+    assert [r["Span"] for r in session.run_breakdown()] and session.run == []
+
+
+def test_disabled_tracing_records_nothing(recorder, monkeypatch):
+    monkeypatch.setattr(tracing, "_enabled", False)
+    with tracing.span("off"):
+        pass
+    tracing.traced("off")(lambda: None)()
+    tracing.record("off", 1.0)
+    assert recorder.histograms() == {}
+
+
+def test_histogram_buckets_are_upper_bounds():
+    hist = tracing.Histogram()
+    for seconds in (0.001, 0.0011, 0.3, 100.0):
+        hist.observe(seconds)
+    buckets = hist.to_dict()["buckets"]
+    assert buckets["0.001"] == 1 and buckets["0.0025"] == 1 and buckets["0.5"] == 1 and buckets["+Inf"] == 1
+    assert sum(buckets.values()) == hist.count == 4
+    assert hist.quantile(0.25) == 0.001
+    assert hist.quantile(0.75) == 0.5
+    assert hist.quantile(1.0) == 100.0
+
+
+def test_exports(recorder):
+    tracing.record("sheets.get_all_values", 0.02)
+    tracing.record("sheets.get_all_values", 0.2, error=True)
+    tracing.record('odd "name"', 2.0)
+
+    spans = json.loads(tracing.to_json(recorder))["spans"]
+    assert spans["sheets.get_all_values"]["count"] == 2
+    assert spans["sheets.get_all_values"]["buckets"]["0.025"] == 1
+
+    lines = tracing.to_prometheus(recorder).splitlines()
+    assert "# TYPE ata_span_seconds histogram" in lines
+    assert 'ata_span_seconds_bucket{span="sheets.get_all_values",le="0.025"} 1' in lines
+    assert 'ata_span_seconds_bucket{span="sheets.get_all_values",le="0.25"} 2' in lines
+    assert 'ata_span_seconds_bucket{span="sheets.get_all_values",le="+Inf"} 2' in lines
+    assert 'ata_span_seconds_count{span="sheets.get_all_values"} 2' in lines
+    assert 'ata_span_errors_total{span="sheets.get_all_values"} 1' in lines
+    assert 'ata_span_seconds_count{span="odd \\"name\\""} 1' in lines
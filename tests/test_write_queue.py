@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import sheet_writer
+from benchmarks import legacy
+from benchmarks.synthetic import entry_row, make_league
+from fake_sheets import FakeWorksheet
+from scoring import EVENTS
+from write_queue import WriteBehindQueue
+
+NAME = "Competitor 00000"
+
+
+@pytest.fixture(scope="module")
+def league():
+    return make_league(competitors=2, seed=4)
+
+
+@pytest.fixture
+def ws(league):
+    values = league.sheet_values(NAME)
+    return FakeWorksheet(NAME, values, rows=len(values) + 10)
+
+
+def _queue(tmp_path, ws, **kwargs):
+    flushed = []
+    queue = WriteBehindQueue(str(tmp_path / "journal.db"), lambda title: ws if title == ws.title else None,
+                             on_flush=lambda title, values: flushed.append(title), base_delay=0, **kwargs)
+    return queue, flushed
+
+
+def _rows(league, n):
+    rng = np.random.default_rng(9)
+    return [entry_row(league, rng) for _ in range(n)]
+
+
+def test_appends_for_one_sheet_commit_in_one_batch(tmp_path, league, ws):
+    queue, flushed = _queue(tmp_path, ws)
+    rows = _rows(league, 3)
+    for row in rows:
+        queue.enqueue_append(NAME, row)
+    assert queue.pending_rows(NAME) == rows
+
+    assert queue.flush() == 3
+    assert ws.calls["get_all_values"] == 1 and ws.calls["batch_update"] == 1
+    assert flushed == [NAME]
+    assert queue.depth() == 0 and queue.pending_rows(NAME) == []
+    dates = [r[0] for r in ws.get_all_values()]
+    assert all(row[0] in dates for row in rows)
+
+
+def test_rate_limited_flush_is_retried(tmp_path, league, ws):
+    queue, flushed = _queue(tmp_path, ws)
+    queue.enqueue_append(NAME, _rows(league, 1)[0])
+    ws.fail_next(429)
+
+    assert queue.flush() == 0
+    assert queue.depth() == 1 and queue.failed() == []
+    assert queue.stats()["retries"] == 1 and flushed == []
+
+    assert queue.flush() == 1
+    assert queue.depth() == 0 and flushed == [NAME]
+
+
+def test_client_error_marks_jobs_failed(tmp_path, league, ws):
+    queue, flushed = _queue(tmp_path, ws)
+    before = ws.get_all_values()
+    queue.enqueue_append(NAME, _rows(league, 1)[0])
+    ws.fail_next(400)
+
+    assert queue.flush() == 0
+    assert queue.depth() == 0
+    [(_, worksheet, op, attempts, error)] = queue.failed()
+    assert (worksheet, op, attempts) == (NAME, "append", 1) and "400" in error
+    assert queue.stats()["failed_jobs"] == 1 and flushed == []
+    assert ws.get_all_values() == before
+
+
+def test_retries_stop_at_max_attempts(tmp_path, league, ws):
+    queue, _ = _queue(tmp_path, ws, max_attempts=2)
+    queue.enqueue_append(NAME, _rows(league, 1)[0])
+    ws.fail_next(503, times=2)
+
+    assert queue.flush() == 0 and queue.depth() == 1
+    assert queue.flush() == 0 and queue.depth() == 0
+    assert queue.failed()[0][3] == 2
+
+    queue.retry_failed()
+    assert queue.flush() == 1
+
+
+def test_parallel_workers_back_off_each_sheet(tmp_path, league):
+    sheets = {}
+    for name in league.competitors:
+        values = league.sheet_values(name)
+        sheets[name] = FakeWorksheet(name, values, rows=len(values) + 10)
+        sheets[name].fail_next(429)
+    queue = WriteBehindQueue(str(tmp_path / "journal.db"), sheets.get, base_delay=0, workers=4)
+    for name in sheets:
+        queue.enqueue_append(name, _rows(league, 1)[0])
+
+    assert queue.flush() == 0
+    assert queue.stats()["retries"] == len(sheets) and set(queue._retry_at) == set(sheets)
+    assert queue.flush() == len(sheets)
+    assert queue.depth() == 0 and queue._retry_at == {}
+
+
+def test_pending_jobs_survive_a_restart(tmp_path, league, ws):
+    queue, _ = _queue(tmp_path, ws)
+    queue.enqueue_append(NAME, _rows(league, 1)[0])
+
+    resumed, flushed = _queue(tmp_path, ws)
+    assert resumed.depth() == 1
+    assert resumed.flush() == 1 and flushed == [NAME]
+
+
+def test_unique_append_skips_a_tournament_already_on_the_sheet(tmp_path, league, ws):
+    queue, flushed = _queue(tmp_path, ws)
+    existing = ws.get_all_values()[1]
+    fresh = _rows(league, 1)[0]
+    ids = queue.enqueue_appends([(NAME, existing), (NAME, fresh), (NAME, fresh)], unique=True)
+
+    assert queue.flush() == 1
+    assert [queue.job_status(ids)[i][0] for i in ids] == ["skipped", "done", "skipped"]
+    assert queue.stats()["skipped_jobs"] == 2 and flushed == [NAME]
+    assert sum(row[2] == fresh[2] for row in ws.get_all_values()) == 1
+
+
+def _loaded(ws):
+    df = pd.DataFrame(ws.get_all_records())
+    return df[df["Date"] != sheet_writer.TOTALS_LABEL]
+
+
+def _patch(df, row, col, value):
+    after = df.copy()
+    after.loc[after.index[row], col] = value
+    return sheet_writer.frame_patch(df, after)
+
+
+def _totals_match_legacy(ws):
+    values = ws.get_all_values()
+    row = next(r for r in values if r and r[0] == sheet_writer.TOTALS_LABEL)
+    reference = FakeWorksheet("ref", values, rows=len(values) + 10)
+    return [float(v) for v in row[3:3 + len(EVENTS)]] == legacy.update_totals(reference, EVENTS)
+
+
+def test_patch_and_append_commit_together(tmp_path, league, ws):
+    queue, flushed = _queue(tmp_path, ws)
+    df = _loaded(ws)
+    queue.enqueue_patch(NAME, _patch(df, 0, EVENTS[0], 17))
+    row = _rows(league, 1)[0]
+    queue.enqueue_append(NAME, row)
+
+    assert queue.flush() == 2
+    assert ws.calls["batch_update"] == 1 and flushed == [NAME]
+    now = _loaded(ws).set_index("Tournament Name")
+    assert now.at[df.iloc[0]["Tournament Name"], EVENTS[0]] == 17 and row[2] in now.index
+    assert _totals_match_legacy(ws)
+
+
+def test_patch_merges_with_a_change_to_another_cell(tmp_path, league, ws):
+    queue, _ = _queue(tmp_path, ws)
+    df = _loaded(ws)
+    queue.enqueue_patch(NAME, _patch(df, 0, EVENTS[0], 17))
+    queue.enqueue_patch(NAME, _patch(df, 1, EVENTS[1], 18))
+
+    assert queue.flush() == 2
+    assert queue.stats()["merged_patches"] == 1 and queue.failed() == []
+    now = _loaded(ws)
+    assert now.iloc[0][EVENTS[0]] == 17 and now.iloc[1][EVENTS[1]] == 18
+    assert _totals_match_legacy(ws)
+
+
+def test_conflicting_patch_fails_alone(tmp_path, league, ws):
+    queue, _ = _queue(tmp_path, ws)
+    df = _loaded(ws)
+    queue.enqueue_patch(NAME, _patch(df, 0, EVENTS[0], 17))
+    rejected = queue.enqueue_patch(NAME, _patch(df, 0, EVENTS[0], 19))
+    queue.enqueue_append(NAME, _rows(league, 1)[0])
+
+    assert queue.flush() == 2
+    [(job_id, _, op, _, error)] = queue.failed()
+    assert (job_id, op) == (rejected, "patch") and "EditConflict" in error
+    assert queue.stats()["conflicts"] == 1
+    assert _loaded(ws).iloc[0][EVENTS[0]] == 17
@@ -0,0 +1,291 @@
+"""Incremental ATA totals: bounded top-N per (competitor, season, event, class bucket).
+
+Adding, editing or deleting one tournament row touches one heap per event,
+so totals stay current without re-reading the competitor's history. Rows are
+partitioned by season (``seasons.SEASONS``) and indexed by (competitor,
+season, date); totals count one season, the active one unless asked.
+"""
+import heapq
+import math
+from collections import Counter
+
+import pandas as pd
+
+import seasons
+from scoring import BUCKET_LIMITS, EVENTS, TOTALS_LABEL, TYPE_BUCKETS
+
+
+def _score(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(value) else value
+
+
+def make_row_key(date, tournament_name):
+    """Identity of a worksheet row; bulk loads append an occurrence counter."""
+    return (pd.Timestamp(date).normalize(), str(tournament_name))
+
+
+# ======================
+# BOUNDED TOP-N
+# ======================
+class TopN:
+    """Multiset that keeps its ``n`` largest values separated from the rest.
+
+    ``_top`` is a min-heap of the kept values, ``_rest`` a max-heap (negated)
+    of everything else; removals are lazy and resolved when a heap head is
+    touched.
+    """
+
+    __slots__ = ("n", "_top", "_rest", "_top_live", "_rest_live", "_top_dead", "_rest_dead", "_top_size")
+
+    def __init__(self, n, values=()):
+        self.n = n
+        ordered = sorted(values, reverse=True)
+        self._top = ordered[:n]
+        self._rest = [-v for v in ordered[n:]]
+        heapq.heapify(self._top)
+        heapq.heapify(self._rest)
+        self._top_live = Counter(self._top)
+        self._rest_live = Counter(ordered[n:])
+        self._top_dead = Counter()
+        self._rest_dead = Counter()
+        self._top_size = len(self._top)
+
+    def __len__(self):
+        return self._top_size + sum(self._rest_live.values())
+
+    def _prune(self):
+        while self._top and self._top_dead[self._top[0]]:
+            self._top_dead[heapq.heappop(self._top)] -= 1
+        while self._rest and self._rest_dead[-self._rest[0]]:
+            self._rest_dead[-heapq.heappop(self._rest)] -= 1
+
+    def _push_top(self, value):
+        heapq.heappush(self._top, value)
+        self._top_live[value] += 1
+        self._top_size += 1
+
+    def _push_rest(self, value):
+        heapq.heappush(self._rest, -value)
+        self._rest_live[value] += 1
+
+    def _pop_top(self):
+        value = heapq.heappop(self._top)
+        self._top_live[value] -= 1
+        self._top_size -= 1
+        return value
+
+    def _pop_rest(self):
+        value = -heapq.heappop(self._rest)
+        self._rest_live[value] -= 1
+        return value
+
+    def add(self, value):
+        self._prune()
+        if self._top_size < self.n:
+            self._push_top(value)
+        elif self._top and value > self._top[0]:
+            self._push_rest(self._pop_top())
+            self._push_top(value)
+        else:
+            self._push_rest(value)
+
+    def remove(self, value):
+        if self._rest_live[value] > 0:
+            self._rest_live[value] -= 1
+            self._rest_dead[value] += 1
+        elif self._top_live[value] > 0:
+            self._top_live[value] -= 1
+            self._top_dead[value] += 1
+            self._top_size -= 1
+            self._prune()
+            if self._rest:
+                self._push_top(self._pop_rest())
+        else:
+            raise KeyError(value)
+        self._prune()
+
+    def best(self):
+        return sorted(self._top_live.elements(), reverse=True)
+
+    def total(self):
+        return sum(self.best())
+
+
+# ======================
+# ENGINE
+# ======================
+class TotalsEngine:
+    def __init__(self, events=EVENTS, season_table=None):
+        self.events = list(events)
+        self.season_table = season_table or seasons.SEASONS
+        self._heaps = {}
+        self._rows = {}   # competitor -> {row key: (season, bucket, values)}
+        self._index = {}  # competitor -> {season: {row key}}
+
+    # --- row operations ---
+    def add_row(self, competitor, row_key, tourney_type, scores):
+        rows = self._rows.setdefault(competitor, {})
+        if row_key in rows:
+            raise KeyError(f"Row {row_key!r} already recorded for {competitor!r}")
+        if isinstance(scores, dict):
+            scores = [scores.get(e) for e in self.events]
+        season = self.season_table.labels([row_key[0]]).iloc[0]
+        row = (None if pd.isna(season) else season, TYPE_BUCKETS.get(tourney_type), tuple(_score(v) for v in scores))
+        self._insert(competitor, row_key, row)
+
+    def _insert(self, competitor, row_key, row):
+        season, bucket, values = row
+        self._rows.setdefault(competitor, {})[row_key] = row
+        self._index.setdefault(competitor, {}).setdefault(season, set()).add(row_key)
+        if bucket is None:
+            return
+        for event, value in zip(self.events, values):
+            self._heap(competitor, season, event, bucket).add(value)
+
+    def remove_row(self, competitor, row_key):
+        season, bucket, values = self._rows[competitor].pop(row_key)
+        keys = self._index[competitor][season]
+        keys.discard(row_key)
+        if not keys:
+            del self._index[competitor][season]
+        if bucket is None:
+            return
+        for event, value in zip(self.events, values):
+            self._heap(competitor, season, event, bucket).remove(value)
+
+    def update_row(self, competitor, row_key, tourney_type, scores):
+        if row_key in self._rows.get(competitor, {}):
+            self.remove_row(competitor, row_key)
+        self.add_row(competitor, row_key, tourney_type, scores)
+
+    def has_row(self, competitor, row_key):
+        return row_key in self._rows.get(competitor, {})
+
+    def _heap(self, competitor, season, event, bucket):
+        key = (competitor, season, event, bucket)
+        heap = self._heaps.get(key)
+        if heap is None:
+            heap = self._heaps[key] = TopN(BUCKET_LIMITS[bucket])
+        return heap
+
+    # --- queries ---
+    def competitors(self):
+        return sorted(c for c, rows in self._rows.items() if rows)
+
+    def seasons(self, competitor) -> list:
+        """Seasons ``competitor`` has rows in, in season order."""
+        names = [s for s in self._index.get(competitor, {}) if s is not None]
+        return sorted(names, key=lambda s: self.season_table.get(s).start)
+
+    def season_rows(self, competitor, season=None) -> list:
+        """Row keys of one season (default: the active one), in date order."""
+        season = self.season_table.active().name if season is None else season
+        return sorted(self._index.get(competitor, {}).get(season, ()))
+
+    def totals(self, competitor, season=None) -> list:
+        """Per-event totals of one season (default: the active one)."""
+        season = self.season_table.active().name if season is None else season
+        result = []
+        for event in self.events:
+            total = 0.0
+            for bucket in BUCKET_LIMITS:
+                heap = self._heaps.get((competitor, season, event, bucket))
+                total += heap.total() if heap is not None else 0
+            result.append(float(total))
+        return result
+
+    def season_totals(self, competitor) -> pd.DataFrame:
+        """Totals per season for ``competitor``: one row per season, one column per event."""
+        names = self.seasons(competitor)
+        return pd.DataFrame([self.totals(competitor, s) for s in names],
+                            index=pd.Index(names, name="Season"), columns=self.events)
+
+    # --- bulk build ---
+    def _parse(self, records) -> tuple:
+        """``(rows, scores, buckets, seasons)`` of worksheet records, filtered like ``update_totals``."""
+        df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(list(records))
+        if df.empty:
+            return {}, None, None, None
+        df = df[~df["Date"].isin([TOTALS_LABEL])]
+        dates = pd.to_datetime(df["Date"], errors="coerce")
+        df = df[dates.notna()]
+        dates = dates[dates.notna()]
+
+        scores = pd.DataFrame(
+            {e: pd.to_numeric(df[e], errors="coerce").fillna(0).astype(float) if e in df else 0.0
+             for e in self.events},
+            index=df.index,
+        )
+        buckets = df["Type"].map(TYPE_BUCKETS)
+        labels = self.season_table.labels(dates).astype(object)
+        rows = {}
+        seen = Counter()
+        tournaments = df["Tournament Name"] if "Tournament Name" in df else pd.Series("", index=df.index)
+        for date, name, season, bucket, values in zip(dates, tournaments, labels, buckets,
+                                                     scores.itertuples(index=False)):
+            key = make_row_key(date, name)
+            seen[key] += 1
+            rows[key + (seen[key],)] = (season, None if pd.isna(bucket) else bucket, tuple(values))
+        return rows, scores, buckets, labels
+
+    def load_competitor(self, competitor, records):
+        """Replace ``competitor``'s rows with ``records`` (worksheet records or DataFrame).
+
+        Rows are filtered exactly like ``update_totals``: the Totals row and
+        rows with an unparseable Date are ignored, blank scores count as 0.
+        """
+        self.drop_competitor(competitor)
+        rows, scores, buckets, labels = self._parse(records)
+        if not rows:
+            return
+        self._rows[competitor] = rows
+        index = self._index[competitor] = {}
+        for key, (season, _, _) in rows.items():
+            index.setdefault(season, set()).add(key)
+
+        values = scores.to_numpy()
+        buckets = buckets.to_numpy(dtype=object)
+        labels = labels.to_numpy(dtype=object)
+        for season in index:
+            in_season = labels == season
+            for bucket, limit in BUCKET_LIMITS.items():
+                mask = in_season & (buckets == bucket)
+                if not mask.any():
+                    continue
+                block = values[mask]
+                for j, event in enumerate(self.events):
+                    self._heaps[(competitor, season, event, bucket)] = TopN(limit, block[:, j].tolist())
+
+    def apply_records(self, competitor, records) -> int:
+        """Bring ``competitor`` to ``records`` like ``load_competitor``, but only
+        remove and re-add the rows that differ from what is recorded now.
+        Returns the number of rows removed or added."""
+        rows, _, _, _ = self._parse(records)
+        current = self._rows.get(competitor, {})
+        stale = [key for key, row in current.items() if rows.get(key) != row]
+        for key in stale:
+            self.remove_row(competitor, key)
+        # ``current`` is the live row map: removed rows are re-added below
+        fresh = [(key, row) for key, row in rows.items() if key not in current]
+        for key, row in fresh:
+            self._insert(competitor, key, row)
+        return len(stale) + len(fresh)
+
+    def drop_competitor(self, competitor):
+        self._rows.pop(competitor, None)
+        for season in self._index.pop(competitor, {}):
+            for event in self.events:
+                for bucket in BUCKET_LIMITS:
+                    self._heaps.pop((competitor, season, event, bucket), None)
+
+    @classmethod
+    def build(cls, histories, events=EVENTS, season_table=None):
+        """Bulk-build from ``{competitor: records}``."""
+        engine = cls(events, season_table)
+        for competitor, records in histories.items():
+            engine.load_competitor(competitor, records)
+        return engine
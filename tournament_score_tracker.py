@@ -1,33 +1,139 @@
+import os
+import time
+
 import streamlit as st
-import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
 from datetime import datetime
 
+# pandas and the compute modules built on it are imported after the menu is
+# drawn, and only by the modes that use them
+import artifact_cache
+import data_sources
+import divisions
+import sheets_client
+import tracing
+import write_queue
+
+_script_start = time.perf_counter()
+
+# ======================
+# TIMING (ATA_TRACING=1 or tracing = true in secrets)
+# ======================
+if not tracing.enabled() and st.secrets.get("tracing", False):
+    tracing.enable()
+if "trace" not in st.session_state:
+    st.session_state.trace = tracing.Recorder()
+tracing.bind_session(st.session_state.trace)
+
 # ======================
 # GOOGLE SHEETS SETUP
 # ======================
 SHEET_ID_MAIN = "1GsxPhcrKvQ-eUOov4F8XiPONOS6fhF648Xb8-m6JiCs"
-TOURNAMENT_LIST_SHEET = "https://docs.google.com/spreadsheets/d/16ORyU9066rDdQCeUTjWYlIVtEYLdncs5EG89IoANOeE/export?format=csv"
+TOURNAMENT_LIST_SHEET = divisions.TOURNAMENT_LIST_URL
 
-# Load credentials
-creds_json = st.secrets["google_service_account"]
-creds = Credentials.from_service_account_info(
-    creds_json, scopes=["https://www.googleapis.com/auth/spreadsheets"]
+# One authorized client per process; spreadsheet/worksheet handles are pooled
+pool = sheets_client.default_pool(
+    sheets_client.google_client_factory(st.secrets["google_service_account"])
 )
-client = gspread.authorize(creds)
 
-# ======================
-# LOAD TOURNAMENT LIST
-# ======================
-try:
-    tournaments_df = pd.read_csv(TOURNAMENT_LIST_SHEET)
-    tournaments_df = tournaments_df.dropna(subset=["Tournament Name"])
-    tournaments_df["Tournament Name"] = tournaments_df["Tournament Name"].astype(str)
-    tournaments = tournaments_df["Tournament Name"].unique().tolist()
-except Exception as e:
-    st.error(f"Failed to load tournament list: {e}")
-    st.stop()
+# Optional local SQLite mirror (ATA_MIRROR_PATH or mirror_path in secrets)
+MIRROR_PATH = os.environ.get("ATA_MIRROR_PATH") or st.secrets.get("mirror_path")
+if MIRROR_PATH:
+    import mirror
+
+    sheet_mirror = mirror.open_mirror(MIRROR_PATH)
+else:
+    sheet_mirror = None
+
+
+def read_sheet_csv(url):
+    # Published CSVs: served from the mirror once it holds them
+    artifact_cache.depends_on(artifact_cache.csv(url))
+    if sheet_mirror is None:
+        return data_sources.read_csv(url)
+    frame = sheet_mirror.frame(url)
+    if frame is None:
+        frame = data_sources.read_csv(url)
+        sheet_mirror.store_frame(url, frame)
+    return frame
+
+
+def read_sheet_csvs(urls):
+    # Several published CSVs at once: mirror hits locally, the rest fetched concurrently
+    artifact_cache.depends_on(*[artifact_cache.csv(url) for url in urls])
+    frames, pending = {}, []
+    for url in urls:
+        frame = sheet_mirror.frame(url) if sheet_mirror is not None else None
+        if frame is None:
+            pending.append(url)
+        else:
+            frames[url] = frame
+    fetched, errors = data_sources.read_many(pending)
+    for url, frame in fetched.items():
+        if sheet_mirror is not None:
+            sheet_mirror.store_frame(url, frame)
+        frames[url] = frame
+    return frames, errors
+
+
+def read_worksheet_records(ws):
+    artifact_cache.depends_on(artifact_cache.worksheet(SHEET_ID_MAIN, ws.title))
+    if sheet_mirror is None:
+        with tracing.span("sheets.get_all_records"):
+            return ws.get_all_records()
+    records = sheet_mirror.worksheet_records(SHEET_ID_MAIN, ws.title)
+    if records is None:
+        with tracing.span("sheets.get_all_values"):
+            values = ws.get_all_values()
+        sheet_mirror.store_worksheet(SHEET_ID_MAIN, ws.title, values)
+        records = sheet_mirror.worksheet_records(SHEET_ID_MAIN, ws.title)
+    return records
+
+
+def mirror_saved(ws, values):
+    # Keep the mirror current with what was just written, without re-reading the sheet
+    if sheet_mirror is not None:
+        sheet_mirror.store_worksheet(SHEET_ID_MAIN, ws.title, values)
+    artifact_cache.invalidate(artifact_cache.worksheet(SHEET_ID_MAIN, ws.title))
+
+
+# Saves are journaled locally and flushed to Sheets by a background worker; the
+# sheet only changes on flush, which is when every session's cached reads of it
+# (and the totals built from them) are evicted
+def _flushed_to_sheet(title, values):
+    if sheet_mirror is not None:
+        sheet_mirror.store_worksheet(SHEET_ID_MAIN, title, values)
+    artifact_cache.invalidate(artifact_cache.worksheet(SHEET_ID_MAIN, title))
+
+
+save_queue = write_queue.default_queue(
+    os.environ.get("ATA_WRITE_JOURNAL", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ata_write_journal.sqlite3")),
+    lambda title: pool.worksheet(SHEET_ID_MAIN, title),
+    on_flush=_flushed_to_sheet,
+    workers=8,
+)
+
+# --- Season calendar: weekend clustering done once per tournament-list refresh ---
+@artifact_cache.cached("season_calendar")
+def load_season_calendar(url):
+    import season_calendar
+
+    return season_calendar.SeasonCalendar(read_sheet_csv(url))
+
+
+# --- Division result rows (deduplicated, types normalized, partitioned by season) per data refresh ---
+@artifact_cache.cached("division_history")
+def load_division_history(comp_urls, tourney_url):
+    import history
+
+    # All division sheets and the tournament list are fetched in parallel
+    frames, errors = read_sheet_csvs(list(comp_urls) + [tourney_url])
+    if tourney_url in errors:
+        raise errors[tourney_url]
+    comp_frames = [frames[url] for url in comp_urls if url in frames]
+    if not comp_frames:
+        raise next(iter(errors.values()))
+    failed = [url for url in comp_urls if url in errors]
+    return history.SeasonHistory(history.division_rows(comp_frames)), failed
 
 # ======================
 # STREAMLIT UI
@@ -43,106 +149,164 @@ mode = st.selectbox(
         "View Tournament Scores",
         "Edit Tournament Scores",
         "View Tournament Results",
-        "Maximum Points Projection (All Events)"
+        "Maximum Points Projection (All Events)",
+        "Season Simulation",
+        "Bulk Tournament Ingest"
     ]
 )
+tracing.record("app.first_paint", time.perf_counter() - _script_start)
+
+# --- Local mirror controls ---
+if sheet_mirror is not None:
+    with st.sidebar:
+        st.caption(f"Reading from local mirror: {MIRROR_PATH}")
+        if st.button("🔄 Resync mirror"):
+            pool.invalidate(SHEET_ID_MAIN)
+            report = sheet_mirror.resync(pool, spreadsheets=[SHEET_ID_MAIN])
+            artifact_cache.invalidate(*[
+                source for key in report
+                for source in (artifact_cache.titles(key), artifact_cache.spreadsheet(key), artifact_cache.csv(key))
+            ])
+            st.success(f"Resynced {len(report)} source(s).")
+
+# --- Pending saves ---
+queue_stats = save_queue.stats()
+if queue_stats["depth"] or queue_stats["failed_jobs"]:
+    with st.sidebar:
+        st.caption(f"⏳ {queue_stats['depth']} save(s) waiting to sync to Google Sheets")
+        if queue_stats["last_latency"] is not None:
+            st.caption(f"Last sync took {queue_stats['last_latency']:.1f}s after saving")
+        failed = save_queue.failed()
+        if failed:
+            st.error(f"{len(failed)} save(s) could not be written: {failed[-1][4]}")
+            if st.button("🔁 Retry failed saves"):
+                save_queue.retry_failed()
+
+# --- Timing breakdown ---
+if tracing.enabled():
+    with st.sidebar.expander("⏱ Timing"):
+        session_trace = st.session_state.trace
+        st.caption("Previous rerun")
+        st.dataframe(session_trace.run_breakdown(), use_container_width=True, hide_index=True)
+        st.caption("This session")
+        st.dataframe(session_trace.breakdown(), use_container_width=True, hide_index=True)
+        st.caption("All sessions (this process)")
+        st.dataframe(tracing.PROCESS.breakdown(), use_container_width=True, hide_index=True)
+        st.caption("Cache (all sessions): hits, evictions by writes and TTL expirations")
+        st.dataframe(artifact_cache.get_cache().breakdown(), use_container_width=True, hide_index=True)
+        st.download_button("Export JSON", tracing.to_json(), "ata_timings.json", "application/json")
+        st.download_button("Export Prometheus", tracing.to_prometheus(), "ata_timings.prom", "text/plain")
+
+# Every mode below works in pandas; imported once the menu is on screen
+import pandas as pd
+
+# Competitor ids shared by the worksheets and the division sheets, with their
+# aliases (ATA_IDENTITY_FILE or identity_path in secrets)
+import identity
+
+identities = identity.default_index(
+    os.environ.get("ATA_IDENTITY_FILE") or st.secrets.get("identity_path")
+    or os.path.join(os.path.dirname(os.path.abspath(__file__)), "ata_identities.json")
+)
+
+# Existing competitors (worksheet titles); listed only by the modes that pick one.
+# A rebuild (TTL expiry or a write) lists the tabs afresh, not the pool's copy,
+# and the mirror pulls any tab added since it last synced
+@artifact_cache.cached("worksheet_titles")
+def load_competitor_names():
+    artifact_cache.depends_on(artifact_cache.titles(SHEET_ID_MAIN))
+    pool.invalidate(SHEET_ID_MAIN)
+    if sheet_mirror is None:
+        return pool.worksheet_titles(SHEET_ID_MAIN)
+    if not sheet_mirror.worksheet_titles(SHEET_ID_MAIN):
+        sheet_mirror.sync_spreadsheet(pool, SHEET_ID_MAIN)
+    else:
+        sheet_mirror.sync_titles(pool, SHEET_ID_MAIN)
+    return sheet_mirror.worksheet_titles(SHEET_ID_MAIN)
+
+
+def competitor_names():
+    try:
+        return load_competitor_names()
+    except Exception:
+        return []
 
-# Existing competitors
-try:
-    existing_names = [ws.title for ws in client.open_by_key(SHEET_ID_MAIN).worksheets()]
-except Exception:
-    existing_names = []
+
+# {competitor id: worksheet title}; the titles become the competitors' display names
+@artifact_cache.cached("competitor_ids")
+def competitor_titles():
+    return identities.titles_by_id(load_competitor_names())
+
+
+def existing_title(name):
+    # The worksheet of ``name`` under any spelling, if there is one
+    try:
+        return competitor_titles().get(identities.id_of(name))
+    except Exception:
+        return None
 
 # Global competitor selection ONLY for these modes
+COMPETITOR_MODES = ["Enter Tournament Scores", "View Tournament Scores", "Edit Tournament Scores"]
 user_name = ""
 if mode == "Enter Tournament Scores":
     user_name_option = st.selectbox(
         "Select existing competitor or add new:",
-        [""] + existing_names + ["Add New Competitor"]
+        [""] + competitor_names() + ["Add New Competitor"]
     )
     if user_name_option in ["", "Add New Competitor"]:
         user_name = st.text_input("Enter new competitor name (First Last):").strip()
+        existing = existing_title(user_name) if user_name else None
+        if existing:
+            st.info(f"{user_name} already has a worksheet as '{existing}'; scores are added there.")
+            user_name = existing
     else:
         user_name = user_name_option
 
 elif mode in ["View Tournament Scores", "Edit Tournament Scores"]:
-    user_name = st.selectbox("Select Competitor:", [""] + existing_names)
-
-# Stop ONLY for modes that rely on the global name
-if mode in ["Enter Tournament Scores", "View Tournament Scores", "Edit Tournament Scores"] and not user_name:
-    st.stop()
+    user_name = st.selectbox("Select Competitor:", [""] + competitor_names())
 
 # --- Helper: Get existing worksheet if it exists ---
 def get_user_worksheet(name):
-    try:
-        return client.open_by_key(SHEET_ID_MAIN).worksheet(name)
-    except gspread.exceptions.WorksheetNotFound:
-        return None
+    return pool.worksheet(SHEET_ID_MAIN, name)
 
-worksheet = get_user_worksheet(user_name)
 
-# ======================
-# FUNCTION: Update totals row (ATA TOTAL only)
-# ======================
-def update_totals(ws, events):
-    # Get all values and remove existing "Totals" row
-    all_values = ws.get_all_values()
-    col_a = [row[0] for row in all_values if row]
-
-    if "Totals" in col_a:
-        idx = col_a.index("Totals") + 1
-        ws.delete_rows(idx)
-
-    # Load and clean data
-    df = pd.DataFrame(ws.get_all_records())
-    df = df[~df["Date"].isin(["Totals"])]
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    df = df[df["Date"].notna()]
-    df = df.sort_values("Date").reset_index(drop=True)
-
-    # Ensure all event columns are numeric
-    for event in events:
-        df[event] = pd.to_numeric(df[event], errors="coerce").fillna(0)
-
-    # Calculate per-event totals using ATA rules
-    totals_by_event = []
-    for event in events:
-        aaa_score = df[df["Type"] == "Class AAA"][event].nlargest(1).sum()
-        aa_score = df[df["Type"] == "Class AA"][event].nlargest(2).sum()
-        ab_score = df[df["Type"].isin(["Class A", "Class B"])][event].nlargest(5).sum()
-        c_score = df[df["Type"] == "Class C"][event].nlargest(3).sum()
-        total = aaa_score + aa_score + ab_score + c_score
-        totals_by_event.append(float(total))  # Ensure native float for JSON serialization
-
-    # Rebuild sheet
-    df["Date"] = df["Date"].dt.strftime("%m/%d/%Y")
-    rows = df.fillna("").astype(str).values.tolist()
-
-    ws.clear()
-    ws.append_row(df.columns.tolist())
-    ws.append_rows(rows)
-
-    # Insert Totals row aligned under event columns (starts at column D)
-    ws.append_row(["Totals", "", ""] + totals_by_event)
+# --- One competitor's worksheet rows, shared by every session until that sheet is written ---
+@artifact_cache.cached("worksheet_records")
+def worksheet_records(name):
+    return read_worksheet_records(get_user_worksheet(name))
 
+# Stop ONLY for modes that rely on the global name
+if mode in COMPETITOR_MODES:
+    if not user_name:
+        st.stop()
+    worksheet = get_user_worksheet(user_name)
 
 # ======================
 # MODE 1: ENTER TOURNAMENT SCORES
 # ======================
 if mode == "Enter Tournament Scores":
+    import scoring
+
     # Create worksheet if missing
     if worksheet is None:
-        worksheet = client.open_by_key(SHEET_ID_MAIN).add_worksheet(
-            title=user_name, rows=200, cols=20
-        )
-        headers = [
-            "Date", "Type", "Tournament Name",
-            "Traditional Forms", "Traditional Weapons", "Combat Sparring", "Traditional Sparring",
-            "Creative Forms", "Creative Weapons", "xTreme Forms", "xTreme Weapons"
-        ]
-        worksheet.append_row(headers)
+        worksheet = pool.add_worksheet(SHEET_ID_MAIN, user_name, rows=200, cols=20)
+        headers = list(scoring.HEADERS)
+        with tracing.span("sheets.append_row"):
+            worksheet.append_row(headers)
+        mirror_saved(worksheet, [headers])
+        artifact_cache.invalidate(artifact_cache.titles(SHEET_ID_MAIN))
         st.info("🆕 New worksheet created for this competitor.")
 
+    # --- Tournament list: only this mode reads it ---
+    try:
+        tournaments_df = read_sheet_csv(TOURNAMENT_LIST_SHEET)
+        tournaments_df = tournaments_df.dropna(subset=["Tournament Name"])
+        tournaments_df["Tournament Name"] = tournaments_df["Tournament Name"].astype(str)
+        tournaments = tournaments_df["Tournament Name"].unique().tolist()
+    except Exception as e:
+        st.error(f"Failed to load tournament list: {e}")
+        st.stop()
+
     selected_tournament = st.selectbox("Select Tournament:", [""] + tournaments)
     if not selected_tournament:
         st.stop()
@@ -155,13 +319,13 @@ if mode == "Enter Tournament Scores":
     st.write(f"**Date:** {date}")
     st.write(f"**Type:** {tourney_type}")
 
-    events = [
-        "Traditional Forms", "Traditional Weapons", "Combat Sparring", "Traditional Sparring",
-        "Creative Forms", "Creative Weapons", "xTreme Forms", "xTreme Weapons"
-    ]
+    events = scoring.EVENTS
 
     # Check for duplicates
-    sheet_df = pd.DataFrame(worksheet.get_all_records())
+    sheet_df = pd.DataFrame(worksheet_records(user_name))
+    pending = save_queue.pending_rows(user_name)
+    if pending:
+        sheet_df = pd.concat([sheet_df, pd.DataFrame([r[:3] for r in pending], columns=["Date", "Type", "Tournament Name"])])
     if not sheet_df.empty and ((sheet_df["Date"] == date) & (sheet_df["Tournament Name"] == selected_tournament)).any():
         st.warning("⚠️ You have already entered results for this tournament.")
         st.stop()
@@ -169,41 +333,20 @@ if mode == "Enter Tournament Scores":
     st.subheader("Enter Your Results")
 
     results = {}
-    if tourney_type == "Class C":
+    if tourney_type == scoring.POINTS_CLASS:
         for event in events:
             results[event] = st.number_input(f"{event} (Points)", min_value=0, step=1)
     else:
-        places = ["", "1st", "2nd", "3rd"]
+        places = [""] + scoring.PLACES
         for event in events:
             results[event] = st.selectbox(f"{event} (Place)", places, key=event)
 
     if st.button("💾 Save Results"):
-        POINTS_MAP = {
-            "Class A": {"1st": 8, "2nd": 5, "3rd": 2},
-            "Class B": {"1st": 5, "2nd": 3, "3rd": 1},
-            "Class AA": {"1st": 15, "2nd": 10, "3rd": 8},
-            "Class AAA": {"1st": 20, "2nd": 15, "3rd": 10},
-        }
-
-        new_row = [date, tourney_type, selected_tournament]
-        for event in events:
-            if tourney_type == "Class C":
-                new_row.append(results[event])
-            else:
-                new_row.append(POINTS_MAP.get(tourney_type, {}).get(results[event], 0))
-
-        worksheet.append_row(new_row)
+        new_row = scoring.entry_row(date, tourney_type, selected_tournament, results, events)
 
-    # Resort by date
-    df = pd.DataFrame(worksheet.get_all_records())
-    if "Date" in df.columns:
-        df = df.sort_values("Date").reset_index(drop=True)
-        worksheet.clear()
-        worksheet.append_row(df.columns.tolist())
-        worksheet.append_rows(df.values.tolist())
-
-    update_totals(worksheet, events)
-    st.success("✅ Tournament results saved successfully!")
+        # Journaled now; the background flusher appends, re-sorts and rebuilds totals
+        save_queue.enqueue_append(user_name, new_row)
+        st.success("✅ Tournament results saved successfully! Syncing to Google Sheets in the background.")
 
     # ✅ Reset mode to return to main menu
     #st.session_state.mode = ""
@@ -214,11 +357,13 @@ if mode == "Enter Tournament Scores":
 # MODE 2: VIEW RESULTS
 # ======================
 elif mode == "View Tournament Scores":
+    import totals_engine
+
     if worksheet is None:
         st.info("There are no Tournament Scores for this person.")
         st.stop()
 
-    data = worksheet.get_all_records()
+    data = worksheet_records(user_name)
     if not data:
         st.info("There are no Tournament Scores for this person.")
     else:
@@ -242,21 +387,36 @@ elif mode == "View Tournament Scores":
         )
 
         st.dataframe(df, use_container_width=True, hide_index=True)
+
+        # --- Totals per season (the sheet's Totals row counts the active season) ---
+        @artifact_cache.cached("season_totals")
+        def competitor_season_totals(name):
+            engine = totals_engine.TotalsEngine()
+            engine.load_competitor(name, pd.DataFrame(worksheet_records(name)))
+            return engine.season_totals(name)
+
+        by_season = competitor_season_totals(user_name)
+        if len(by_season) > 1:
+            with st.expander("📅 Totals by season"):
+                st.dataframe(by_season, use_container_width=True)
 # ======================
 # MODE 3: EDIT RESULTS
 # ======================
 elif mode == "Edit Tournament Scores":
+    import scoring
+    import sheet_writer
+
     if worksheet is None:
         st.info("There are no Tournament Scores for this person.")
         st.stop()
 
-    data = worksheet.get_all_records()
+    data = worksheet_records(user_name)
     if not data:
         st.info("There are no Tournament Scores for this person.")
         st.stop()
 
     df = pd.DataFrame(data)
-    df = df[df["Date"] != "ATA TOTAL"]
+    df = df[~df["Date"].isin(["ATA TOTAL", scoring.TOTALS_LABEL])]
 
     st.markdown(
         """
@@ -278,102 +438,55 @@ elif mode == "Edit Tournament Scores":
     edited_df = st.data_editor(df, num_rows="dynamic", use_container_width=True, hide_index=True)
 
     if st.button("💾 Save Changes"):
-        worksheet.clear()
-        worksheet.append_row(df.columns.tolist())
-        worksheet.append_rows(edited_df.values.tolist())
-
-        update_totals(worksheet, [
-            "Traditional Forms", "Traditional Weapons", "Combat Sparring", "Traditional Sparring",
-            "Creative Forms", "Creative Weapons", "xTreme Forms", "xTreme Weapons"
-        ])
-
-        st.success("✅ Changes saved successfully and ATA total updated!")
+        # Only the edited cells are sent, checked against the sheet as loaded here
+        patch = sheet_writer.frame_patch(df, edited_df)
+        if not patch:
+            st.info("No changes to save.")
+        else:
+            save_queue.enqueue_patch(user_name, patch)
+            cells = sum(len(c) for _, c in patch["changes"])
+            st.success(
+                f"✅ Saved {cells} changed cell(s), {len(patch['added'])} new and {len(patch['deleted'])} deleted row(s)! "
+                "ATA total updates as they sync to Google Sheets. If someone else changed the same cells "
+                "since you loaded this sheet, the save is rejected and shown in the sidebar."
+            )
 
 # ================================
 # MODE 4: VIEW TOURNAMENT RESULTS
 # ================================
 elif mode == "View Tournament Results":
-    from datetime import datetime
+    import placements
 
     st.subheader("🥋 View Tournament Results")
 
     # Load tournament metadata
-    tourney_url = "https://docs.google.com/spreadsheets/d/16ORyU9066rDdQCeUTjWYlIVtEYLdncs5EG89IoANOeE/export?format=csv&gid=327661053"
-    tournaments_df = pd.read_csv(tourney_url)
-    tournaments_df["Date"] = pd.to_datetime(tournaments_df["Date"], errors="coerce")
+    tourney_url = divisions.TOURNAMENT_METADATA_URL
     today = pd.to_datetime(datetime.today().date())
 
-    # Filter: completed tournaments, not Class C
-    completed = tournaments_df[
-        (tournaments_df["Date"] <= today) &
-        (tournaments_df["Type"] != "Class C")
-    ]
-
     # Choose division
-    sheet_map = {
-        "50–59 1st Degree Black Belt": "1tCWIc-Zeog8GFH6fZJJR-85GHbC1Kjhx50UvGluZqdg",
-        "40–49 2nd/3rd Degree Black Belt": "1W7q6YjLYMqY9bdv5G77KdK2zxUKET3NZMQb9Inu2F8w"
-    }
-    division = st.selectbox("Choose division:", list(sheet_map.keys()))
-    result_url = f"https://docs.google.com/spreadsheets/d/{sheet_map[division]}/export?format=csv&gid=0"
-    results_df = pd.read_csv(result_url)
-
-    # Filter tournaments that actually have results
-    valid_tourneys = completed[
-        completed["Tournament Name"].isin(results_df["Tournament"].unique())
-    ]["Tournament Name"].dropna().sort_values().unique()
-
-    selected_tourney = st.selectbox("Select a completed tournament:", [""] + list(valid_tourneys))
-    if not selected_tourney:
-        st.stop()
-
-    # Get tournament type
-    tourney_type = completed[completed["Tournament Name"] == selected_tourney]["Type"].iloc[0]
+    division = st.selectbox("Choose division:", list(divisions.DIVISIONS.keys()))
+    result_url = divisions.DIVISIONS[division]
+
+    # --- Season-wide placements for the whole division, computed once per data refresh ---
+    @artifact_cache.cached("division_placements")
+    def division_placements(result_url, tourney_url, today):
+        # Metadata and division results are fetched in parallel
+        frames, errors = read_sheet_csvs([tourney_url, result_url])
+        if errors:
+            raise next(iter(errors.values()))
+        return placements.completed_placements(frames[result_url], frames[tourney_url], today)
 
-    # Filter results for selected tournament
-    df = results_df[results_df["Tournament"] == selected_tourney]
+    try:
+        valid_tourneys, placement_cube = division_placements(result_url, tourney_url, today)
+    except Exception as e:
+        st.error(f"Failed to load results for {division}: {e}")
+        st.stop()
 
-    # Define event columns
-    event_cols = [
-        "Forms", "Weapons", "Combat Weapons", "Sparring",
-        "Creative Forms", "Creative Weapons", "X-Treme Forms", "X-Treme Weapons"
-    ]
+    selected_tourney = st.selectbox("Select a completed tournament:", [""] + valid_tourneys)
+    if not selected_tourney:
+        st.stop()
 
-    # Clean scores
-    for col in event_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-    # Scoring map
-    POINTS_MAP = {
-        "Class AAA": {"1st": 20, "2nd": 15, "3rd": 10},
-        "Class AA": {"1st": 15, "2nd": 10, "3rd": 8},
-        "Class A": {"1st": 8, "2nd": 5, "3rd": 2},
-        "Class B": {"1st": 5, "2nd": 3, "3rd": 1}
-    }
-
-    # Initialize placement table
-    placement_table = pd.DataFrame(index=df["Name"].unique(), columns=event_cols)
-
-    # Assign placements per event (allowing duplicates)
-    for event in event_cols:
-        scores = df[["Name", event]].copy()
-        scores[event] = pd.to_numeric(scores[event], errors="coerce").fillna(0)
-
-        placed = {}
-        for _, row in scores.iterrows():
-            score = row[event]
-            name = row["Name"]
-            if score == POINTS_MAP[tourney_type]["1st"]:
-                placed[name] = "1st"
-            elif score == POINTS_MAP[tourney_type]["2nd"]:
-                placed[name] = "2nd"
-            elif score == POINTS_MAP[tourney_type]["3rd"]:
-                placed[name] = "3rd"
-            else:
-                placed[name] = "DNP"
-
-        for name in placement_table.index:
-            placement_table.at[name, event] = placed.get(name, "DNP")
+    placement_table = placements.tournament_placements(placement_cube, selected_tourney)
 
     # Display results
     st.subheader(f"🏆 Event Placements for {selected_tourney}")
@@ -382,158 +495,158 @@ elif mode == "View Tournament Results":
 # MODE 6: MAXIMUM POINTS PROJECTION (ALL EVENTS)
 # ======================
 elif mode == "Maximum Points Projection (All Events)":
-    st.subheader("📈 Maximum Points Projection (All Events)")
+    import projection
+    import seasons
 
-    # --- Load competitor sheets ---
-    comp_urls = [
-        "https://docs.google.com/spreadsheets/d/1W7q6YjLYMqY9bdv5G77KdK2zxUKET3NZMQb9Inu2F8w/export?format=csv",
-        "https://docs.google.com/spreadsheets/d/1tCWIc-Zeog8GFH6fZJJR-85GHbC1Kjhx50UvGluZqdg/export?format=csv"
-    ]
-    comp_frames = []
-    for url in comp_urls:
-        df_part = pd.read_csv(url)
-        df_part.columns = df_part.columns.str.strip()
-        df_part["Date"] = pd.to_datetime(df_part["Date"], errors="coerce")
-        comp_frames.append(df_part)
-    df = pd.concat(comp_frames, ignore_index=True)
-
-    # --- Deduplicate competitor rows ---
-    dedupe_keys = [c for c in ["Name","Date","Type","Tournament Name"] if c in df.columns]
-    if dedupe_keys:
-        df = df.drop_duplicates(subset=dedupe_keys)
-
-    # --- Load tournament metadata ---
-    tourney_url = "https://docs.google.com/spreadsheets/d/16ORyU9066rDdQCeUTjWYlIVtEYLdncs5EG89IoANOeE/export?format=csv"
-    tournaments = pd.read_csv(tourney_url)
-    tournaments.columns = tournaments.columns.str.strip()
-    tournaments["Date"] = pd.to_datetime(tournaments["Date"], errors="coerce")
-
-    # --- Normalize types ---
-    def norm_type(x):
-        s = str(x).strip().lower()
-        if "aaa" in s or s == "aaa": return "AAA"
-        elif ("aa" in s and "aaa" not in s) or s == "aa": return "AA"
-        elif "class a" in s or s == "a": return "A"
-        elif "class b" in s or s == "b": return "B"
-        elif "class c" in s or s == "c": return "C"
-        else: return None
-
-    tournaments["TypeNorm"] = tournaments["Type"].apply(norm_type)
-    if "TypeNorm" not in df.columns and "Type" in df.columns:
-        df["TypeNorm"] = df["Type"].apply(norm_type)
+    st.subheader("📈 Maximum Points Projection (All Events)")
 
+    # --- Competitor sheets (every registered division) + tournament metadata ---
+    comp_urls = tuple(divisions.DIVISIONS.values())
+    tourney_url = divisions.TOURNAMENT_LIST_URL
     today = pd.to_datetime(datetime.today().date())
-    season_end = pd.to_datetime("2026-05-31")
-    future_tournaments = tournaments[(tournaments["Date"] > today) & (tournaments["Date"] <= season_end)].copy()
-
-    # --- Weekend grouping: dates within 1 day = same weekend ---
-    def assign_weekend_ids(dates: pd.Series) -> pd.Series:
-        s = pd.to_datetime(dates, errors="coerce").dropna().dt.normalize().sort_values().unique()
-        if len(s) == 0:
-            return pd.Series(index=dates.index, dtype="Int64")
-        cluster_id = 0
-        mapping = {}
-        prev = None
-        for d in s:
-            if prev is None or (d - prev).days > 1:
-                cluster_id += 1
-            mapping[d] = cluster_id
-            prev = d
-        normalized = pd.to_datetime(dates, errors="coerce").dt.normalize()
-        return normalized.map(mapping)
-
-    def bestN_sum(values, N):
-        return sum(sorted(values, reverse=True)[:N])
-
-    # --- AA helpers ---
-    def aa_current_weekend_values(aa_df: pd.DataFrame, event_col: str) -> list:
-        if aa_df.empty:
-            return []
-        aa_df = aa_df.copy()
-        aa_df["WeekendID"] = assign_weekend_ids(aa_df["Date"])
-        return list(aa_df.groupby("WeekendID")[event_col].max().values)
-
-    def future_aa_weekend_values(fut_df: pd.DataFrame) -> list:
-        if fut_df.empty:
-            return []
-        f = fut_df.copy()
-        f["WeekendID"] = assign_weekend_ids(f["Date"])
-        return [15] * f["WeekendID"].nunique()
-
-    # --- A/B helpers ---
-    def ab_current_weekend_values(ab_df: pd.DataFrame, event_col: str) -> list:
-        if ab_df.empty:
-            return []
-        ab_df = ab_df.copy()
-        ab_df["WeekendID"] = assign_weekend_ids(ab_df["Date"])
-        return list(ab_df.groupby("WeekendID")[event_col].max().values)
-
-    def future_ab_weekend_values(fut_df: pd.DataFrame) -> list:
-        if fut_df.empty:
-            return []
-        f = fut_df.copy()
-        f["WeekendID"] = assign_weekend_ids(f["Date"])
-        vals = []
-        for _, wk_df in f.groupby("WeekendID"):
-            if (wk_df["TypeNorm"] == "A").any():
-                vals.append(8)
-            elif (wk_df["TypeNorm"] == "B").any():
-                vals.append(5)
-        return vals
+    season = seasons.SEASONS.active(today)
+    st.caption(f"Season {season.name}: {season.start:%m/%d/%Y} to {season.end:%m/%d/%Y}")
+
+    # --- Whole-division projection of the active season, computed once per data refresh ---
+    @artifact_cache.cached("division_projection")
+    def division_projection(comp_urls, tourney_url, today, season_name, season_end):
+        division_history, failed = load_division_history(comp_urls, tourney_url)
+        df = division_history.season(season_name)
+
+        # Weekends and future-weekend values come from the shared season calendar
+        calendar = load_season_calendar(tourney_url)
+        missing = [e for e in projection.EVENT_COLS if e not in df.columns]
+        return projection.project_division(df, calendar, today, season_end, projection.EVENT_COLS), missing, failed
+
+    try:
+        proj_all, missing_events, failed_urls = division_projection(
+            comp_urls, tourney_url, today, season.name, season.end
+        )
+    except Exception as e:
+        st.error(f"Failed to load division sheets: {e}")
+        st.stop()
+    division_names = {url: name for name, url in divisions.DIVISIONS.items()}
+    for url in failed_urls:
+        st.warning(f"Could not load division '{division_names.get(url, url)}'; it is left out of this projection.")
+    for event in missing_events:
+        st.warning(f"Column '{event}' not found in sheet")
 
     # --- Choose competitor ---
-    competitor = st.selectbox("Choose competitor:", sorted(df["Name"].dropna().unique()))
+    competitor = st.selectbox("Choose competitor:", sorted(proj_all["Name"].unique()))
     if not competitor:
         st.stop()
-    cdf = df[df["Name"].str.strip().eq(competitor)].copy()
-    if cdf.empty:
+
+    proj_df = projection.competitor_projection(proj_all, competitor)
+    if proj_df.empty:
         st.info("No scores available for this competitor yet.")
         st.stop()
+    st.dataframe(proj_df, use_container_width=True, hide_index=True)
 
-    # --- Event columns ---
-    event_cols = [
-        "Forms","Weapons","Combat Weapons","Sparring",
-        "Creative Forms","Creative Weapons","X-Treme Forms","X-Treme Weapons"
-    ]
+    st.caption("Current totals follow ATA caps (AAA 20, AA best 2 30, A/B best 5 40, C best 3 9). Projected Max recomputes AA best 2 using current + future AA weekends (15 each) and A/B best 5 using current + future weekends (A=8, B=5).")
 
-    def calc_event(cdf_event, event_col):
-        cdf_event[event_col] = pd.to_numeric(cdf_event[event_col], errors="coerce").fillna(0)
+    # --- Division leaderboard ---
+    with st.expander("🏅 Division leaderboard"):
+        sort_by = st.radio("Sort by:", ["Projected Max", "Current Points"], horizontal=True)
+        st.dataframe(projection.leaderboard(proj_all, sort_by), use_container_width=True, hide_index=True)
 
-        # AAA current
-        aaa_current = min(cdf_event.loc[cdf_event["TypeNorm"]=="AAA", event_col].sum(), 20)
+# ======================
+# MODE 7: SEASON SIMULATION (MONTE CARLO)
+# ======================
+elif mode == "Season Simulation":
+    import seasons
+    import simulation
 
-        # AA current + projection
-        aa_df = cdf_event.loc[cdf_event["TypeNorm"]=="AA", ["Date", event_col]].copy()
-        aa_current_vals = aa_current_weekend_values(aa_df, event_col)
-        aa_current = min(sum(sorted(aa_current_vals, reverse=True)[:2]), 30)
-        future_aa_vals = future_aa_weekend_values(future_tournaments[future_tournaments["TypeNorm"]=="AA"])
-        aa_projected_best2 = min(sum(sorted(aa_current_vals + future_aa_vals, reverse=True)[:2]), 30)
+    st.subheader("🎲 Season Simulation")
 
-        # A/B current + projection
-        ab_df = cdf_event.loc[cdf_event["TypeNorm"].isin(["A","B"]), ["Date", event_col]].copy()
-        ab_current_vals = ab_current_weekend_values(ab_df, event_col)
-        ab_current_total = min(bestN_sum(ab_current_vals, 5), 40)
-        future_ab_vals = future_ab_weekend_values(future_tournaments[future_tournaments["TypeNorm"].isin(["A","B"])])
-        ab_projected_best5 = min(bestN_sum(ab_current_vals + future_ab_vals, 5), 40)
+    tourney_url = divisions.TOURNAMENT_LIST_URL
+    today = pd.to_datetime(datetime.today().date())
+    season = seasons.SEASONS.active(today)
+    st.caption(f"Season {season.name}: {season.start:%m/%d/%Y} to {season.end:%m/%d/%Y}")
+
+    division = st.selectbox("Choose division:", list(divisions.DIVISIONS.keys()))
+    col_sims, col_seed = st.columns(2)
+    n_sims = col_sims.select_slider("Simulated seasons:", [1_000, 10_000, 100_000], value=simulation.DEFAULT_SIMS)
+    seed = int(col_seed.number_input("Seed:", min_value=0, value=0, step=1))
+
+    # --- One simulation per division, settings and data refresh ---
+    @artifact_cache.cached("division_simulation")
+    def division_simulation(result_url, tourney_url, today, season_name, season_end, n_sims, seed):
+        division_history, _ = load_division_history((result_url,), tourney_url)
+        df = division_history.season(season_name)
+        calendar = load_season_calendar(tourney_url)
+        return simulation.simulate_division(df, calendar, today, season_end, n_sims=n_sims, seed=seed)
 
-        # C current
-        c_scores = cdf_event.loc[cdf_event["TypeNorm"]=="C", event_col].sort_values(ascending=False)
-        c_current = min(c_scores.head(3).sum(), 9)
+    try:
+        with st.spinner(f"Simulating {n_sims:,} seasons..."):
+            sim = division_simulation(
+                divisions.DIVISIONS[division], tourney_url, today, season.name, season.end, n_sims, seed
+            )
+    except Exception as e:
+        st.error(f"Failed to simulate {division}: {e}")
+        st.stop()
 
-        current_total = aaa_current + aa_current + ab_current_total + c_current
-        projected_max = aaa_current + aa_projected_best2 + ab_projected_best5 + c_current
+    st.dataframe(sim["summary"].round(2), use_container_width=True, hide_index=True)
+
+    competitor = st.selectbox("Choose competitor:", [""] + sim["summary"]["Name"].tolist())
+    if competitor:
+        ranks = sim["ranks"].loc[competitor]
+        st.caption(f"Final rank distribution for {competitor}")
+        st.bar_chart(ranks[ranks > 0].rename("Probability"))
+        events_df = sim["events"]
+        st.dataframe(
+            events_df[events_df["Name"] == competitor].drop(columns="Name").round(2),
+            use_container_width=True, hide_index=True,
+        )
 
-        return current_total, projected_max
+    st.caption("Each simulated season attends the remaining AA and A/B weekends at the competitor's attendance rate so far and places at their historical 1st/2nd/3rd rates (blended with the division's). Totals use the same caps as Maximum Points Projection.")
 
-    projection = []
-    for event in event_cols:
-        if event not in cdf.columns:
-            st.warning(f"Column '{event}' not found in sheet")
-            continue
-        cur, proj = calc_event(cdf.copy(), event)
-        projection.append({"Event": event, "Current Points": cur, "Projected Max": proj})
+# ======================
+# MODE 8: BULK TOURNAMENT INGEST
+# ======================
+elif mode == "Bulk Tournament Ingest":
+    import ingest
 
-    proj_df = pd.DataFrame(projection)
-    st.dataframe(proj_df, use_container_width=True, hide_index=True)
+    st.subheader("📥 Bulk Tournament Ingest")
 
-    st.caption("Current totals follow ATA caps (AAA 20, AA best 2 30, A/B best 5 40, C best 3 9). Projected Max recomputes AA best 2 using current + future AA weekends (15 each) and A/B best 5 using current + future weekends (A=8, B=5).")
+    source = st.radio("Results from:", ["Division sheet", "Uploaded CSV"], horizontal=True)
+    try:
+        if source == "Division sheet":
+            division = st.selectbox("Choose division:", list(divisions.DIVISIONS.keys()))
+            results_df = read_sheet_csv(divisions.DIVISIONS[division])
+        else:
+            upload = st.file_uploader("Results CSV (Name, Tournament, events as places or points):", type="csv")
+            if upload is None:
+                st.stop()
+            results_df = pd.read_csv(upload)
+        tournaments_df = read_sheet_csv(TOURNAMENT_LIST_SHEET)
+    except Exception as e:
+        st.error(f"Failed to load results: {e}")
+        st.stop()
+
+    selected = st.multiselect("Tournaments to add:", ingest.tournaments_in(results_df))
+    if not selected:
+        st.stop()
+    try:
+        entries = ingest.tournament_entries(results_df, selected, tournaments_df)
+    except (KeyError, ValueError) as e:
+        st.error(f"Cannot read these results: {e}")
+        st.stop()
+
+    st.caption(f"{len(entries)} result(s) for {entries['Name'].nunique()} competitor(s). "
+               "Rows a competitor already has (same Date and Tournament Name) are skipped.")
+    st.dataframe(entries, use_container_width=True, hide_index=True)
+
+    if st.button("📥 Add to competitor sheets"):
+        with st.spinner("Writing competitor sheets..."):
+            report = ingest.ingest(pool, SHEET_ID_MAIN, entries, queue=save_queue, timeout=60)
+        counts = report["Status"].value_counts()
+        if counts.get(ingest.CREATED, 0):
+            artifact_cache.invalidate(artifact_cache.titles(SHEET_ID_MAIN))
+        written = counts.get(ingest.ADDED, 0) + counts.get(ingest.CREATED, 0)
+        st.success(f"✅ Updated {written} competitor sheet(s) ({counts.get(ingest.CREATED, 0)} new); "
+                   f"{counts.get(ingest.DUPLICATE, 0)} already had these results.")
+        if counts.get(ingest.QUEUED, 0):
+            st.info(f"⏳ {counts[ingest.QUEUED]} competitor sheet(s) are still queued and will be written shortly.")
+        if counts.get(ingest.FAILED, 0):
+            st.error(f"{counts[ingest.FAILED]} competitor sheet(s) could not be written.")
+        st.dataframe(report, use_container_width=True, hide_index=True)
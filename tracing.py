@@ -0,0 +1,226 @@
+"""Named timing spans around remote calls and compute stages.
+
+Tracing is off unless ATA_TRACING=1 (or ``enable()``); while off ``span``
+returns a shared no-op and ``traced`` functions call straight through.
+Every span is recorded in the process-wide ``PROCESS`` recorder and in the
+recorder bound to the current session with ``bind_session``.
+"""
+import bisect
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+
+# Upper bounds in seconds, Prometheus style (+Inf is implicit)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_enabled = os.environ.get("ATA_TRACING", "").strip().lower() in ("1", "true", "yes", "on")
+_session = contextvars.ContextVar("ata_trace_session", default=None)
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = bool(on)
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+# ======================
+# HISTOGRAMS
+# ======================
+class Histogram:
+    __slots__ = ("buckets", "count", "sum", "max", "errors")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+    def observe(self, seconds, error=False):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if error:
+            self.errors += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile, capped at the observed max."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count, "sum": self.sum, "max": self.max, "errors": self.errors,
+            "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], self.buckets)),
+        }
+
+
+class Recorder:
+    """Histograms per span name, plus the spans of the current rerun."""
+
+    def __init__(self):
+        self._hists = {}
+        self._lock = threading.Lock()
+        self.run = []
+        self.previous_run = []
+
+    def observe(self, name, seconds, error=False):
+        with self._lock:
+            hist = self._hists.get(name)
+            if hist is None:
+                hist = self._hists[name] = Histogram()
+            hist.observe(seconds, error)
+            self.run.append((name, seconds))
+
+    def begin_run(self):
+        with self._lock:
+            self.previous_run, self.run = self.run, []
+
+    def histograms(self) -> dict:
+        with self._lock:
+            return {name: hist.to_dict() for name, hist in sorted(self._hists.items())}
+
+    def breakdown(self) -> list:
+        """One row per span: calls, total, mean, p95 (bucket bound) and max, slowest first."""
+        with self._lock:
+            rows = [{
+                "Span": name,
+                "Calls": h.count,
+                "Total (s)": round(h.sum, 4),
+                "Mean (ms)": round(1000 * h.sum / h.count, 2),
+                "p95 (ms)": round(1000 * h.quantile(0.95), 2),
+                "Max (ms)": round(1000 * h.max, 2),
+                "Errors": h.errors,
+            } for name, h in self._hists.items()]
+        return sorted(rows, key=lambda r: r["Total (s)"], reverse=True)
+
+    def run_breakdown(self, previous=True) -> list:
+        """Total time and calls per span for one rerun."""
+        totals = {}
+        for name, seconds in (self.previous_run if previous else self.run):
+            calls, total = totals.get(name, (0, 0.0))
+            totals[name] = (calls + 1, total + seconds)
+        rows = [{"Span": n, "Calls": c, "Total (ms)": round(1000 * t, 2)} for n, (c, t) in totals.items()]
+        return sorted(rows, key=lambda r: r["Total (ms)"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._hists.clear()
+            self.run, self.previous_run = [], []
+
+
+PROCESS = Recorder()
+
+
+def bind_session(recorder):
+    """Attribute spans in this context (one Streamlit rerun) to ``recorder``."""
+    recorder.begin_run()
+    _session.set(recorder)
+    return recorder
+
+
+# ======================
+# SPANS
+# ======================
+def _record(name, seconds, error):
+    PROCESS.observe(name, seconds, error)
+    session = _session.get()
+    if session is not None:
+        session.observe(name, seconds, error)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _record(self.name, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def record(name, seconds, error=False):
+    """Record an interval timed outside a ``span`` (e.g. from script start)."""
+    if _enabled:
+        _record(name, seconds, error)
+
+
+def span(name):
+    """``with span("sheets.get_all_values"): ...``"""
+    return _Span(name) if _enabled else _NO_SPAN
+
+
+def traced(name):
+    """Decorator form of ``span``."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ======================
+# EXPORT
+# ======================
+def to_json(recorder=PROCESS) -> str:
+    return json.dumps({"generated": time.time(), "spans": recorder.histograms()}, indent=2)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def to_prometheus(recorder=PROCESS, metric="ata_span_seconds") -> str:
+    """Histograms in the Prometheus text exposition format."""
+    lines = [f"# HELP {metric} Time spent in named spans.", f"# TYPE {metric} histogram"]
+    spans = recorder.histograms()
+    for name, hist in spans.items():
+        label = f'span="{_label(name)}"'
+        cumulative = 0
+        for bound, n in hist["buckets"].items():
+            cumulative += n
+            lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {cumulative}')
+        lines.append(f"{metric}_sum{{{label}}} {hist['sum']:.6f}")
+        lines.append(f"{metric}_count{{{label}}} {hist['count']}")
+    errors = metric.removesuffix("_seconds") + "_errors_total"
+    lines += [f"# HELP {errors} Spans that raised.", f"# TYPE {errors} counter"]
+    for name, hist in spans.items():
+        lines.append(f'{errors}{{span="{_label(name)}"}} {hist["errors"]}')
+    return "\n".join(lines) + "\n"
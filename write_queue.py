@@ -0,0 +1,392 @@
+"""Durable write-behind queue for competitor worksheet saves.
+
+Saves are journaled to SQLite immediately and a background thread flushes
+them: all pending jobs for one worksheet are applied to a single read and
+committed with one batched write. 429 and 5xx responses are retried with
+exponential backoff. Every write to a competitor worksheet, bulk ingest
+included, goes through a queue, so no two writers race on one sheet.
+
+An append marked ``unique`` is skipped at flush time when the sheet (or an
+earlier job) already has a row with its Date and Tournament Name.
+
+Editor saves are cell-level patches checked against the sheet at flush
+time: they merge with concurrent changes to other cells, and a patch that
+overlaps one fails on its own without holding back the other jobs.
+"""
+import json
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+
+APPEND = "append"
+REPLACE = "replace"
+PATCH = "patch"
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    worksheet TEXT NOT NULL,
+    op TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, worksheet, id);
+"""
+
+
+def status_code(exc):
+    """HTTP status carried by a gspread APIError (or a fake one), else None."""
+    response = getattr(exc, "response", None)
+    code = getattr(response, "status_code", None)
+    if code is None:
+        code = getattr(exc, "code", None)
+    try:
+        return int(code)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc):
+    return status_code(exc) in RETRYABLE_STATUS
+
+
+class WriteBehindQueue:
+    """``resolve(title)`` returns the worksheet handle for a competitor;
+    ``on_flush(title, values)`` is called with the committed sheet values."""
+
+    def __init__(self, journal_path, resolve, events=None, on_flush=None,
+                 interval=1.0, base_delay=1.0, max_delay=60.0, max_attempts=8, workers=1):
+        self.resolve = resolve
+        self.events = None if events is None else list(events)  # None: sheet_writer.EVENTS
+        self.on_flush = on_flush
+        self.interval = interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.workers = workers  # worksheets flushed in parallel
+        self._conn = sqlite3.connect(journal_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._retry_at = {}  # worksheet -> backoff deadline; guarded by _db_lock like the journal
+        self._totals = None  # TotalsEngine kept across patch flushes
+        self._totals_lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush at a time, worker or caller
+        self._stats = {"flushed_jobs": 0, "commits": 0, "retries": 0, "failed_jobs": 0,
+                       "skipped_jobs": 0, "merged_patches": 0, "conflicts": 0,
+                       "last_latency": None, "max_latency": 0.0, "total_latency": 0.0}
+        self._stats_lock = threading.Lock()
+
+    # ======================
+    # ENQUEUE
+    # ======================
+    def _enqueue_many(self, jobs) -> list:
+        """Journal ``(worksheet, op, payload)`` jobs in one transaction; returns their ids."""
+        now = time.time()
+        ids = []
+        with self._db_lock, self._conn:
+            for worksheet, op, payload in jobs:
+                cur = self._conn.execute(
+                    "INSERT INTO jobs (worksheet, op, payload, created) VALUES (?, ?, ?, ?)",
+                    (worksheet, op, json.dumps(payload, default=str), now),
+                )
+                ids.append(cur.lastrowid)
+        self._wake.set()
+        return ids
+
+    def _enqueue(self, worksheet, op, payload):
+        return self._enqueue_many([(worksheet, op, payload)])[0]
+
+    @staticmethod
+    def _append_payload(row, unique):
+        payload = {"row": list(row)}
+        if unique:
+            payload["unique"] = True
+        return payload
+
+    def enqueue_append(self, worksheet, row, unique=False):
+        """With ``unique`` the row is skipped if the sheet already has its Date and Tournament Name."""
+        return self._enqueue(worksheet, APPEND, self._append_payload(row, unique))
+
+    def enqueue_appends(self, rows, unique=False) -> list:
+        """``enqueue_append`` for every ``(worksheet, row)`` of ``rows``, journaled together."""
+        return self._enqueue_many([(worksheet, APPEND, self._append_payload(row, unique)) for worksheet, row in rows])
+
+    def enqueue_replace(self, worksheet, header, rows):
+        return self._enqueue(worksheet, REPLACE, {"header": list(header), "rows": [list(r) for r in rows]})
+
+    def enqueue_patch(self, worksheet, patch):
+        """``patch`` from ``sheet_writer.frame_patch``."""
+        return self._enqueue(worksheet, PATCH, patch)
+
+    def pending_rows(self, worksheet):
+        """Rows appended for ``worksheet`` that are not on the sheet yet."""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM jobs WHERE status = 'pending' AND worksheet = ? AND op = ? ORDER BY id",
+                (worksheet, APPEND),
+            ).fetchall()
+        return [json.loads(r[0])["row"] for r in rows]
+
+    # ======================
+    # FLUSH
+    # ======================
+    def flush(self) -> int:
+        """Flush every due worksheet once; returns the number of jobs committed."""
+        with self._flush_lock:
+            return self._flush_due()
+
+    def _flush_due(self):
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT id, worksheet, op, payload, created, attempts FROM jobs "
+                "WHERE status = 'pending' ORDER BY id"
+            ).fetchall()
+        by_sheet = {}
+        for row in rows:
+            by_sheet.setdefault(row[1], []).append(row)
+
+        now = time.time()
+        with self._db_lock:
+            due = [(title, jobs) for title, jobs in by_sheet.items() if self._retry_at.get(title, 0) <= now]
+        if self.workers > 1 and len(due) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(due)), thread_name_prefix="flush") as executor:
+                return sum(executor.map(lambda item: self._flush_sheet(*item), due))
+        return sum(self._flush_sheet(title, jobs) for title, jobs in due)
+
+    @tracing.traced("queue.flush_sheet")
+    def _flush_sheet(self, title, jobs):
+        # Imported on first flush: enqueueing and stats stay free of pandas at app start
+        import sheet_writer
+
+        ids = [j[0] for j in jobs]
+        try:
+            ws = self.resolve(title)
+            if ws is None:
+                raise LookupError(f"Worksheet '{title}' not found")
+            old = sheet_writer.read_values(ws)
+            new, rejected, skipped = self._apply(sheet_writer, title, old, jobs)
+            sheet_writer.commit(ws, old, new)
+        except Exception as exc:
+            attempts = max(j[5] for j in jobs) + 1
+            if is_retryable(exc) and attempts < self.max_attempts:
+                delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+                with self._db_lock:
+                    self._retry_at[title] = time.time() + delay * (0.5 + random.random() / 2)
+                self._mark(ids, "pending", attempts, repr(exc))
+                self._count("retries")
+            else:
+                with self._db_lock:
+                    self._retry_at.pop(title, None)
+                self._mark(ids, "failed", attempts, repr(exc))
+                self._count("failed_jobs", len(ids))
+            return 0
+
+        with self._db_lock:
+            self._retry_at.pop(title, None)
+        for job_id, exc in rejected.items():
+            self._mark([job_id], "failed", 1, repr(exc))
+        if skipped:
+            self._mark(sorted(skipped), "skipped", None, None)
+        ids = [i for i in ids if i not in rejected and i not in skipped]
+        self._count("conflicts", len(rejected))
+        self._count("failed_jobs", len(rejected))
+        self._count("skipped_jobs", len(skipped))
+        if not ids:
+            return 0
+        self._mark(ids, "done", None, None)
+        latency = time.time() - min(j[4] for j in jobs)
+        with self._stats_lock:
+            self._stats["flushed_jobs"] += len(ids)
+            self._stats["commits"] += 1
+            self._stats["last_latency"] = latency
+            self._stats["max_latency"] = max(self._stats["max_latency"], latency)
+            self._stats["total_latency"] += latency * len(ids)
+        if self.on_flush is not None:
+            self.on_flush(title, new)
+        return len(ids)
+
+    def _apply(self, sheet_writer, title, old, jobs):
+        """New sheet values for ``jobs`` over ``old``, ``{job id: EditConflict}`` for patches
+        left out and the ids of unique appends skipped as already present."""
+        # The last replace wins; appends after it are added in one rebuild
+        events = sheet_writer.EVENTS if self.events is None else self.events
+        base, extra, rebuild, patched, rejected, skipped = old, [], False, False, {}, set()
+        keys = None  # tournament keys of base + extra, once a unique append needs them
+        for job_id, _, op, payload, _, _ in jobs:
+            payload = json.loads(payload)
+            if op == REPLACE:
+                base, extra, rebuild, keys = [payload["header"]] + payload["rows"], [], True, None
+            elif op == APPEND:
+                if payload.get("unique"):
+                    if keys is None:
+                        keys = sheet_writer.tournament_keys(base + extra)
+                    key = sheet_writer.tournament_keys(base, [payload["row"]])
+                    if key & keys:
+                        skipped.add(job_id)
+                        continue
+                    keys |= key
+                elif keys is not None:
+                    keys |= sheet_writer.tournament_keys(base, [payload["row"]])
+                extra.append(payload["row"])
+                rebuild = True
+            else:
+                try:
+                    base, merged = sheet_writer.apply_patch(base + extra, payload, events)
+                except sheet_writer.EditConflict as exc:
+                    rejected[job_id] = exc
+                    continue
+                extra, patched, keys = [], True, None
+                if merged:
+                    self._count("merged_patches")
+
+        if not (rebuild or patched):
+            return old, rejected, skipped
+        with self._totals_lock:
+            totals = self._totals_engine(events)
+            if rebuild:
+                totals.drop_competitor(title)
+                return sheet_writer.build_sheet(base, events, extra_rows=extra), rejected, skipped
+            # Patches only: untouched rows keep their cells and only changed rows are re-ranked for Totals
+            return sheet_writer.patched_sheet(base, totals, title), rejected, skipped
+
+    def _totals_engine(self, events):
+        if self._totals is None:
+            from totals_engine import TotalsEngine
+
+            self._totals = TotalsEngine(events)
+        return self._totals
+
+    def _mark(self, ids, status, attempts, error):
+        marks = ",".join("?" * len(ids))
+        with self._db_lock, self._conn:
+            if attempts is None:
+                self._conn.execute(f"UPDATE jobs SET status = ?, error = NULL WHERE id IN ({marks})", [status] + ids)
+            else:
+                self._conn.execute(
+                    f"UPDATE jobs SET status = ?, attempts = ?, error = ? WHERE id IN ({marks})",
+                    [status, attempts, error] + ids,
+                )
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self._stats[key] += n
+
+    # ======================
+    # WORKER
+    # ======================
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, drain=True, timeout=10.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if drain:
+            self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                time.sleep(self.interval)
+
+    def wait(self, ids, timeout=60.0) -> dict:
+        """Flush until jobs ``ids`` leave ``pending`` or ``timeout`` (None: no limit) passes,
+        in this thread unless the worker is running; returns ``job_status(ids)``."""
+        deadline = float("inf") if timeout is None else time.time() + timeout
+        while True:
+            status = self.job_status(ids)
+            now = time.time()
+            if now >= deadline or all(state != "pending" for state, _ in status.values()):
+                return status
+            if self._thread is not None and self._thread.is_alive():
+                self._wake.set()
+                time.sleep(0.01)
+                continue
+            self.flush()
+            with self._db_lock:
+                retry_at = min(self._retry_at.values(), default=now)
+            time.sleep(max(0.0, min(retry_at, deadline) - time.time()))
+
+    def wait_idle(self, timeout=30.0) -> bool:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.depth() == 0:
+                return True
+            self._wake.set()
+            time.sleep(0.01)
+        return self.depth() == 0
+
+    # ======================
+    # METRICS
+    # ======================
+    def depth(self) -> int:
+        with self._db_lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'pending'").fetchone()[0]
+
+    def job_status(self, ids) -> dict:
+        """``{id: (status, error)}`` for jobs ``ids``: pending, done, skipped or failed."""
+        ids = list(ids)
+        status = {}
+        with self._db_lock:
+            for start in range(0, len(ids), 500):
+                part = ids[start:start + 500]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(f"SELECT id, status, error FROM jobs WHERE id IN ({marks})", part)
+                status.update((job_id, (state, error)) for job_id, state, error in rows)
+        return status
+
+    def failed(self) -> list:
+        with self._db_lock:
+            return self._conn.execute(
+                "SELECT id, worksheet, op, attempts, error FROM jobs WHERE status = 'failed' ORDER BY id"
+            ).fetchall()
+
+    def retry_failed(self):
+        with self._db_lock, self._conn:
+            self._conn.execute("UPDATE jobs SET status = 'pending', attempts = 0 WHERE status = 'failed'")
+        self._wake.set()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        flushed = stats.pop("total_latency")
+        stats["avg_latency"] = flushed / stats["flushed_jobs"] if stats["flushed_jobs"] else None
+        stats["depth"] = self.depth()
+        return stats
+
+
+# ======================
+# PROCESS-WIDE QUEUE
+# ======================
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def default_queue(journal_path, resolve, **kwargs) -> WriteBehindQueue:
+    """The shared, started queue; pending jobs left in the journal are resumed."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = WriteBehindQueue(journal_path, resolve, **kwargs).start()
+        return _queue